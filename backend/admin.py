@@ -0,0 +1,55 @@
+import os
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from auth import get_current_user
+from digital_human.routing import get_routing, reload_routing, routing_watcher
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+# Admin routes are disabled unless ADMIN_TOKEN is set
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+# --------------------
+# ADMIN Dependency: a logged-in user who also holds the admin token
+# --------------------
+async def require_admin(
+    user_id: int = Depends(get_current_user),
+    x_admin_token: str | None = Header(default=None),
+) -> int:
+    if not ADMIN_TOKEN or not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user_id
+
+
+def _summary(config) -> dict:
+    return {
+        "version": config.version,
+        "triggers": {family: len(phrases) for family, phrases in config.trigger_families().items()},
+        "min_intent_confidence": config.min_intent_confidence,
+        "min_confidence_for_tool": config.min_confidence_for_tool,
+        "intent_to_tool": config.intent_to_tool,
+    }
+
+
+# --------------------
+# ROUTING CONFIG
+# --------------------
+@router.get("/routing")
+async def routing_config(user_id: int = Depends(require_admin)):
+    return {**_summary(get_routing()), "watcher": routing_watcher.metrics}
+
+
+@router.post("/routing/reload")
+async def reload_routing_config(user_id: int = Depends(require_admin)):
+    """
+    Re-reads ROUTING_CONFIG_PATH now; a broken file keeps the active config.
+    """
+    try:
+        config = await run_in_threadpool(reload_routing)
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=f"Routing config rejected: {str(e)}")
+    return _summary(config)
@@ -1,34 +1,43 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import jwt, JWTError
 from datetime import datetime, timedelta,timezone
 import bcrypt
 import secrets
 
-from database import SessionLocal
+from database import AsyncSessionLocal
 from models import User, UserConfig, MemoryStore
 from schemas import SignupRequest, LoginRequest, TokenResponse
 from utils import create_access_token, SECRET_KEY, ALGORITHM
+from constants import invalidate_user_config
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 # --------------------
 # DB Dependency
 # --------------------
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+# bcrypt is deliberately slow (CPU-bound); keep it off the event loop
+def _hash_password(password: str) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+
+
+def _check_password(password: str, password_hash: str) -> bool:
+    return bcrypt.checkpw(password.encode(), password_hash.encode())
 
 # --------------------
 # AUTH Dependency
 # --------------------
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme)) -> int:
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> int:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return int(payload["user_id"])
@@ -39,17 +48,14 @@ def get_current_user(token: str = Depends(oauth2_scheme)) -> int:
 # SIGNUP
 # --------------------
 @router.post("/signup")
-def signup(data: SignupRequest, db: Session = Depends(get_db)):
+async def signup(data: SignupRequest, db: AsyncSession = Depends(get_db)):
 
     # 1️⃣ Check existing user
-    if db.query(User).filter(User.email == data.email).first():
+    if await db.scalar(select(User).where(User.email == data.email)):
         raise HTTPException(status_code=400, detail="Email already registered")
 
     # 2️⃣ Hash password
-    hashed = bcrypt.hashpw(
-        data.password.encode(),
-        bcrypt.gensalt()
-    ).decode()
+    hashed = await run_in_threadpool(_hash_password, data.password)
 
     # 3️⃣ Create user
     user = User(
@@ -57,8 +63,8 @@ def signup(data: SignupRequest, db: Session = Depends(get_db)):
         password_hash=hashed
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     # 4️⃣ Create user config using frontend values
     config = UserConfig(
@@ -71,7 +77,11 @@ def signup(data: SignupRequest, db: Session = Depends(get_db)):
     )
 
     db.add(config)
-    db.commit()
+    await db.commit()
+
+    # The ORM hook fires at flush; drop again after commit so a read that
+    # raced the transaction cannot leave a stale entry behind.
+    invalidate_user_config(user.user_id)
 
     return {
         "message": "User created successfully",
@@ -80,7 +90,7 @@ def signup(data: SignupRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/signup")
-def signup_help():
+async def signup_help():
     return {"message": "Use POST /auth/signup"}
 
 # --------------------
@@ -101,20 +111,17 @@ def signup_help():
 #     token = create_access_token({"user_id": str(user.user_id)})
 #     return {"access_token": token, "token_type": "bearer"}
 @router.post("/login", response_model=TokenResponse)
-def login(data: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.email).first()
+async def login(data: LoginRequest, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.email == data.email))
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    if not bcrypt.checkpw(
-        data.password.encode(),
-        user.password_hash.encode()
-    ):
+    if not await run_in_threadpool(_check_password, data.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     # ✅ UPDATE LAST LOGIN
     user.last_login = datetime.now(timezone.utc)
-    db.commit()
+    await db.commit()
 
     token = create_access_token({"user_id": str(user.user_id)})
 
@@ -123,15 +130,15 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
         "token_type": "bearer"
     }
 @router.get("/login")
-def login_help():
+async def login_help():
     return {"message": "Use POST /auth/login"}
 
 # --------------------
 # FORGOT PASSWORD
 # --------------------
 @router.post("/forgot-password")
-def forgot_password(email: str, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == email).first()
+async def forgot_password(email: str, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.email == email))
 
     # Do not reveal user existence
     if not user:
@@ -140,7 +147,7 @@ def forgot_password(email: str, db: Session = Depends(get_db)):
     token = secrets.token_urlsafe(32)
     user.reset_token = token
     user.reset_token_expiry = datetime.utcnow() + timedelta(minutes=30)
-    db.commit()
+    await db.commit()
 
     reset_link = f"http://localhost:3000/reset-password/{token}"
 
@@ -153,28 +160,24 @@ def forgot_password(email: str, db: Session = Depends(get_db)):
 # RESET PASSWORD
 # --------------------
 @router.post("/reset-password")
-def reset_password(token: str, new_password: str, db: Session = Depends(get_db)):
-    user = (
-        db.query(User)
-        .filter(
+async def reset_password(token: str, new_password: str, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(
+        select(User)
+        .where(
             User.reset_token == token,
             User.reset_token_expiry > datetime.utcnow()
         )
-        .first()
     )
 
     if not user:
         raise HTTPException(status_code=400, detail="Invalid or expired token")
 
-    hashed = bcrypt.hashpw(
-        new_password.encode(),
-        bcrypt.gensalt()
-    ).decode()
+    hashed = await run_in_threadpool(_hash_password, new_password)
 
     user.password_hash = hashed
     user.reset_token = None
     user.reset_token_expiry = None
-    db.commit()
+    await db.commit()
 
     return {"message": "Password reset successful"}
 
@@ -182,13 +185,13 @@ def reset_password(token: str, new_password: str, db: Session = Depends(get_db))
 # MEMORY DEBUG
 # --------------------
 @router.get("/debug")
-def debug_memory(
+async def debug_memory(
     user_id: int = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    return (
-        db.query(MemoryStore)
-        .filter(MemoryStore.user_id == user_id)
+    result = await db.execute(
+        select(MemoryStore)
+        .where(MemoryStore.user_id == user_id)
         .order_by(MemoryStore.created_at.desc())
-        .all()
     )
+    return result.scalars().all()
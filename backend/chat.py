@@ -1,15 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
+import json
 import logging
-from database import SessionLocal
+from database import AsyncSessionLocal
 from models import ChatSession, ChatMessage
 from models import UserConfig 
 from auth import get_current_user
-from digital_human.services import run_digital_human_chat
+from digital_human.services import arun_digital_human_chat
 
-from constants import get_user_config
-from services.memory_service import cleanup_expired_memories
+from constants import aget_user_config, TOKEN_BUDGET, HISTORY_TOKEN_BUDGET, HISTORY_MAX_MESSAGES
+from services.chat_services import load_history_window
+from services.summary_service import update_session_summary
+from services.memory_queue import memory_write_queue
+from digital_human.llm.tokenizer import count_tokens
 
 
 router = APIRouter(prefix="/chat", tags=["chat"])
@@ -22,29 +28,32 @@ logging.basicConfig(
 # --------------------
 # DB Dependency
 # --------------------
-def get_db():
-    db = SessionLocal()
-    cleanup_expired_memories(db)
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+def _parse_session_id(session_id) -> uuid.UUID:
+    try:
+        return uuid.UUID(str(session_id))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid conversation_id")
 
 
 # --------------------
 # LIST SESSIONS
 # --------------------
 @router.get("/sessions")
-def list_sessions(
+async def list_sessions(
     user_id: int = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    sessions = (
-        db.query(ChatSession)
-        .filter(ChatSession.user_id == user_id)
+    result = await db.execute(
+        select(ChatSession)
+        .where(ChatSession.user_id == user_id)
         .order_by(ChatSession.created_at.desc())
-        .all()
     )
+    sessions = result.scalars().all()
 
     return [
         {
@@ -60,19 +69,19 @@ def list_sessions(
 # CHAT HISTORY
 # --------------------
 @router.get("/history/{session_id}")
-def history(
+async def history(
     session_id: str,
     user_id: int = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    messages = (
-        db.query(ChatMessage)
+    result = await db.execute(
+        select(ChatMessage)
         .join(ChatSession)
-        .filter(ChatSession.session_id == session_id)
-        .filter(ChatSession.user_id == user_id)
+        .where(ChatSession.session_id == _parse_session_id(session_id))
+        .where(ChatSession.user_id == user_id)
         .order_by(ChatMessage.created_at.asc())
-        .all()
     )
+    messages = result.scalars().all()
 
     return [
         {
@@ -85,18 +94,24 @@ def history(
 
 
 # --------------------
-# CHAT SEND MESSAGE
+# TURN PREPARATION (shared by /chat and /chat/stream)
 # --------------------
-@router.post("")
-def chat(
+async def _prepare_turn(
+    db: AsyncSession,
+    user_id: int,
     payload: dict,
-    user_id: int = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    load_history: bool = True,
 ):
-    logger.info(
-        f"📩 Chat request received | user_id={user_id} | payload_keys={list(payload.keys())}"
-    )
-    user_config = get_user_config(db, user_id)
+    """
+    Validates the payload, resolves the session, loads history and
+    stages the user message. Returns (session, user_text, chat_history).
+
+    load_history=False (enable_chat_history off) skips the history query;
+    the turn is answered from the current message alone.
+
+    Older messages are not replayed; they reach the responder through
+    session.summary (see services/summary_service.py).
+    """
     session_id = payload.get("conversation_id")
     raw_message = payload.get("message")
 
@@ -115,14 +130,12 @@ def chat(
         f"💬 User message parsed | user_id={user_id} | content='{user_text[:100]}'"
     )
 
-    if not session_id:
-        session_id = str(uuid.uuid4())
+    session_id = _parse_session_id(session_id) if session_id else uuid.uuid4()
 
-    session = (
-        db.query(ChatSession)
-        .filter(ChatSession.session_id == session_id)
-        .filter(ChatSession.user_id == user_id)
-        .first()
+    session = await db.scalar(
+        select(ChatSession)
+        .where(ChatSession.session_id == session_id)
+        .where(ChatSession.user_id == user_id)
     )
 
     if not session:
@@ -132,19 +145,22 @@ def chat(
             session_title=user_text[:50],
         )
         db.add(session)
-        db.flush()
+        await db.flush()
 
     logger.info(
         f"🧵 Chat session active | user_id={user_id} | session_id={session.session_id}"
     )
 
     # Load chat history from database BEFORE adding current message
-    previous_messages = (
-        db.query(ChatMessage)
-        .filter(ChatMessage.session_id == session.session_id)
-        .order_by(ChatMessage.created_at.asc())
-        .all()
-    )
+    # (newest-first, bounded by HISTORY_TOKEN_BUDGET / HISTORY_MAX_MESSAGES)
+    previous_messages = []
+    if load_history:
+        previous_messages = await db.run_sync(
+            load_history_window,
+            session.session_id,
+            HISTORY_TOKEN_BUDGET,
+            HISTORY_MAX_MESSAGES,
+        )
     
     # Format chat history for digital_human (List[Dict[str, str]])
     chat_history = [
@@ -162,19 +178,73 @@ def chat(
             session_id=session.session_id,
             role="user",
             content=user_text,
+            token_count=count_tokens(user_text),
         )
     )
 
+    return session, user_text, chat_history
+
+
+async def _begin_turn(user_id: int, payload: dict):
+    """
+    Short transaction #1: load context and commit the user message.
+
+    The connection goes back to the pool BEFORE the agents run, so pool
+    usage tracks DB work rather than LLM latency.
+    """
+    async with AsyncSessionLocal() as db:
+        user_config = await aget_user_config(db, user_id)
+
+        use_history = bool(user_config.get("enable_chat_history", True))
+
+        session, user_text, chat_history = await _prepare_turn(
+            db, user_id, payload, load_history=use_history
+        )
+
+        turn = {
+            "session_id": session.session_id,
+            "user_text": user_text,
+            "chat_history": chat_history,
+            "summary": session.summary if use_history else None,
+            "user_config": user_config,
+        }
+
+        await db.commit()
+
+    return turn
+
+
+async def _persist_assistant_message(session_id, content: str):
+    """
+    Short transaction #2: write the assistant message once it exists.
+    """
+    async with AsyncSessionLocal() as db:
+        db.add(
+            ChatMessage(
+                session_id=session_id,
+                role="assistant",
+                content=content,
+                token_count=count_tokens(content),
+            )
+        )
+        await db.commit()
+
+
+async def _run_agents(user_id: int, turn: dict, stream: bool = False):
     logger.info(
-        f"🧠 Digital Human invoked | user_id={user_id} | session_id={session.session_id}"
+        f"🧠 Digital Human invoked | user_id={user_id} | session_id={turn['session_id']}"
     )
 
     # Call digital_human service
     try:
-        agent_result = run_digital_human_chat(
-            user_input=user_text,
-            chat_history=chat_history,
-            token_budget=4000,
+        result = await arun_digital_human_chat(
+            user_input=turn["user_text"],
+            chat_history=turn["chat_history"],
+            token_budget=TOKEN_BUDGET,
+            stream=stream,
+            conversation_summary=turn["summary"],
+            user_config=turn["user_config"],
+            user_id=user_id,
         )
     except Exception as e:
         logger.error(
@@ -186,29 +256,46 @@ def chat(
             detail=f"Error processing message: {str(e)}"
         )
 
+    # Persisted by the write-behind worker, off the response path
+    if result.get("memory_intent"):
+        memory_write_queue.enqueue(user_id, result["memory_intent"])
 
+    return result
 
 
+# --------------------
+# CHAT SEND MESSAGE
+# --------------------
+@router.post("")
+async def chat(
+    payload: dict,
+    background_tasks: BackgroundTasks,
+    user_id: int = Depends(get_current_user),
+):
     logger.info(
-        f"🤖 Agent response ready | memory_intent={agent_result.get('memory_intent')} | rag_used={agent_result.get('rag_used')}"
+        f"📩 Chat request received | user_id={user_id} | payload_keys={list(payload.keys())}"
     )
 
+    # No DB connection is held while the agents run
+    turn = await _begin_turn(user_id, payload)
+    session_id = turn["session_id"]
 
-    db.add(
-        ChatMessage(
-            session_id=session.session_id,
-            role="assistant",
-            content=agent_result["response"],
-        )
+    agent_result = await _run_agents(user_id, turn)
+
+    logger.info(
+        f"🤖 Agent response ready | memory_intent={agent_result.get('memory_intent')} | rag_used={agent_result.get('rag_used')}"
     )
-    
 
-    db.commit()
+    await _persist_assistant_message(session_id, agent_result["response"])
 
     logger.info(
-        f"✅ Chat persisted | user_id={user_id} | session_id={session.session_id}"
+        f"✅ Chat persisted | user_id={user_id} | session_id={session_id}"
     )
 
+    # Runs after the response is sent: adds no latency to this turn
+    if turn["user_config"].get("enable_chat_history", True):
+        background_tasks.add_task(update_session_summary, session_id, AsyncSessionLocal)
+
     # return {
     #     "session_id": str(session.session_id),
     #     "response": agent_result["response"],
@@ -216,9 +303,95 @@ def chat(
     #     "rag_used": agent_result.get("rag_used", False),
     # }
     return {
-        "session_id": str(session.session_id),
+        "session_id": str(session_id),
         "response": agent_result["response"],
         "memory_intent": agent_result.get("memory_intent"),
         "rag_used": agent_result.get("rag_used", False),
+        "routing_version": agent_result.get("routing_version"),
     }
 
+
+# --------------------
+# CHAT STREAM (Server-Sent Events)
+# --------------------
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _stream_events(user_id: int, session_id, agent_result: dict):
+    """
+    Forwards responder tokens as SSE events:
+    meta -> token* -> done (or error).
+
+    The assistant message is persisted only when the stream completes.
+    On client disconnect the upstream OpenAI stream is closed, so no
+    more tokens are generated or billed.
+    """
+    tokens = agent_result["stream"]
+    response_text = ""
+    completed = False
+
+    try:
+        yield _sse("meta", {
+            "session_id": str(session_id),
+            "memory_intent": agent_result.get("memory_intent"),
+            "rag_used": agent_result.get("rag_used", False),
+            "routing_version": agent_result.get("routing_version"),
+        })
+
+        async for token in tokens:
+            response_text += token
+            yield _sse("token", {"content": token})
+
+        await _persist_assistant_message(session_id, response_text)
+        completed = True
+
+        logger.info(
+            f"✅ Chat stream persisted | user_id={user_id} | session_id={session_id}"
+        )
+        yield _sse("done", {"session_id": str(session_id)})
+
+    except Exception as e:
+        logger.error(
+            f"❌ Chat stream error | user_id={user_id} | error={str(e)}",
+            exc_info=True
+        )
+        yield _sse("error", {"detail": "Error processing message"})
+
+    finally:
+        await tokens.aclose()
+        if not completed:
+            logger.info(
+                f"🔌 Chat stream aborted | user_id={user_id} | session_id={session_id} | chars_sent={len(response_text)}"
+            )
+
+
+@router.post("/stream")
+async def chat_stream(
+    payload: dict,
+    background_tasks: BackgroundTasks,
+    user_id: int = Depends(get_current_user),
+):
+    logger.info(
+        f"📩 Chat stream request received | user_id={user_id} | payload_keys={list(payload.keys())}"
+    )
+
+    # Session + user message are committed before the first token is sent
+    turn = await _begin_turn(user_id, payload)
+    session_id = turn["session_id"]
+
+    agent_result = await _run_agents(user_id, turn, stream=True)
+
+    # Runs once the stream has finished
+    if turn["user_config"].get("enable_chat_history", True):
+        background_tasks.add_task(update_session_summary, session_id, AsyncSessionLocal)
+
+    return StreamingResponse(
+        _stream_events(user_id, session_id, agent_result),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+        background=background_tasks,
+    )
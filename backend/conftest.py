@@ -0,0 +1,122 @@
+"""
+Shared test fakes for backend/tests and digital_human/tests.
+"""
+import os
+import re
+import json
+from types import SimpleNamespace
+
+import pytest
+
+# OpenAI clients are created at import time; tests never reach the network.
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+
+class FakeCompletions:
+    """
+    Stand-in for client.chat.completions.
+    Records every call so tests can count LLM round trips.
+    """
+
+    def __init__(self, reply="stub answer", reasoning=None):
+        self.reply = reply
+        self.reasoning = reasoning or {
+            "intent_type": "information_request",
+            "topic": "redis",
+            "confidence": 0.9,
+        }
+        self.calls = []
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        system = kwargs["messages"][0]["content"]
+
+        if _is_reasoning(kwargs):
+            content = json.dumps(self.reasoning)
+        else:
+            content = self.reply
+
+        if kwargs.get("stream"):
+            return iter(
+                SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+                for token in re.findall(r"\S+\s*", content)
+            )
+
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+        )
+
+    def responder_calls(self):
+        return [c for c in self.calls if not _is_reasoning(c) and not _is_summary(c)]
+
+    def summary_calls(self):
+        return [c for c in self.calls if _is_summary(c)]
+
+
+def _is_reasoning(call: dict) -> bool:
+    return "reasoning engine" in call["messages"][0]["content"]
+
+
+def _is_summary(call: dict) -> bool:
+    return "running summary" in call["messages"][0]["content"]
+
+
+class FakeAsyncStream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.chunks)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeAsyncCompletions:
+    """
+    Async twin of FakeCompletions; shares its call log.
+    """
+
+    def __init__(self, completions: FakeCompletions):
+        self.completions = completions
+        self.streams = []
+
+    async def create(self, **kwargs):
+        response = self.completions.create(**kwargs)
+        if kwargs.get("stream"):
+            stream = FakeAsyncStream(response)
+            self.streams.append(stream)
+            return stream
+        return response
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    from digital_human.agents.reasoning_agent import agent as reasoning_module
+    from digital_human.agents.responder_agent import agent as responder_module
+    from digital_human.agents.summary_agent import agent as summary_module
+    from digital_human.agents.responder_agent import cache as response_cache_module
+    from digital_human.agents.reasoning_agent import cache as intent_cache_module
+    from digital_human.cache import InMemoryBackend
+
+    completions = FakeCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    async_completions = FakeAsyncCompletions(completions)
+    async_client = SimpleNamespace(chat=SimpleNamespace(completions=async_completions))
+    completions.async_completions = async_completions
+
+    for module in (reasoning_module, responder_module, summary_module):
+        monkeypatch.setattr(module, "client", client)
+        monkeypatch.setattr(module, "async_client", async_client)
+
+    # Cached answers must not leak between tests
+    monkeypatch.setattr(response_cache_module, "response_cache", response_cache_module.ResponseCache())
+    monkeypatch.setattr(intent_cache_module, "intent_cache", InMemoryBackend())
+    return completions
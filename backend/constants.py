@@ -46,7 +46,11 @@
 
 # constants.py
 
+import os
+from sqlalchemy import event
+
 from models import UserConfig
+from digital_human.cache import CacheBackend, InMemoryBackend, RedisBackend
 
 DEFAULT_USER_CONFIG = {
     "enable_memory": True,
@@ -58,14 +62,39 @@ DEFAULT_USER_CONFIG = {
     "max_tokens": 2048,
 }
 
-USER_CONFIG_CACHE = {}
+# --------------------
+# User config cache (bounded LRU + TTL)
+# --------------------
+USER_CONFIG_CACHE_MAX_SIZE = int(os.getenv("USER_CONFIG_CACHE_MAX_SIZE", "50000"))
+USER_CONFIG_CACHE_TTL_SECONDS = float(os.getenv("USER_CONFIG_CACHE_TTL_SECONDS", "300"))
 
+# REDIS_URL set -> one cache shared by all workers (invalidations included);
+# otherwise a per-process cache whose staleness is bounded by the TTL.
+_redis_url = os.getenv("REDIS_URL")
+
+USER_CONFIG_CACHE: CacheBackend = (
+    RedisBackend(_redis_url, prefix="user_config", ttl_seconds=USER_CONFIG_CACHE_TTL_SECONDS)
+    if _redis_url
+    else InMemoryBackend(max_size=USER_CONFIG_CACHE_MAX_SIZE, ttl_seconds=USER_CONFIG_CACHE_TTL_SECONDS)
+)
+
+
+def configure_user_config_cache(backend: CacheBackend):
+    """
+    Swap the cache backend (tests, or a shared backend at startup).
+    """
+    global USER_CONFIG_CACHE
+    USER_CONFIG_CACHE = backend
 
-def get_user_config(db, user_id: int) -> dict:
-    # 1️⃣ Return from cache (DICT ONLY)
-    if user_id in USER_CONFIG_CACHE:
-        return USER_CONFIG_CACHE[user_id]
 
+def invalidate_user_config(user_id: int):
+    """
+    Call after ANY write to a user's UserConfig row.
+    """
+    USER_CONFIG_CACHE.delete(str(user_id))
+
+
+def _load_user_config(db, user_id: int) -> dict:
     # 2️⃣ Fetch from DB
     config = (
         db.query(UserConfig)
@@ -84,7 +113,7 @@ def get_user_config(db, user_id: int) -> dict:
         db.refresh(config)
 
     # 4️⃣ ORM ➜ DICT (CRITICAL STEP)
-    config_dict = {
+    return {
         "enable_memory": bool(config.enable_memory),
         "enable_multichat": bool(config.enable_multichat),
         "enable_chat_history": bool(config.enable_chat_history),
@@ -94,8 +123,53 @@ def get_user_config(db, user_id: int) -> dict:
         "max_tokens": int(config.max_tokens),
     }
 
+
+def get_user_config(db, user_id: int) -> dict:
+    # 1️⃣ Return from cache (DICT ONLY)
+    cached = USER_CONFIG_CACHE.get(str(user_id))
+    if cached is not None:
+        return cached
+
+    config_dict = _load_user_config(db, user_id)
+
     # 5️⃣ Cache SAFE dict
-    USER_CONFIG_CACHE[user_id] = config_dict
+    USER_CONFIG_CACHE.set(str(user_id), config_dict)
 
     return config_dict
 
+
+async def aget_user_config(db, user_id: int) -> dict:
+    """
+    Async variant for an AsyncSession: the cache round trips stay off
+    the event loop (a shared backend is a network call), only the DB
+    load goes through run_sync.
+    """
+    cached = await USER_CONFIG_CACHE.aget(str(user_id))
+    if cached is not None:
+        return cached
+
+    config_dict = await db.run_sync(_load_user_config, user_id)
+    await USER_CONFIG_CACHE.aset(str(user_id), config_dict)
+
+    return config_dict
+
+
+# --------------------
+# Invalidation hooks: any ORM write to UserConfig drops the cached dict
+# --------------------
+@event.listens_for(UserConfig, "after_insert")
+@event.listens_for(UserConfig, "after_update")
+@event.listens_for(UserConfig, "after_delete")
+def _invalidate_on_write(mapper, connection, target):
+    invalidate_user_config(target.user_id)
+
+
+# --------------------
+# Chat history window
+# --------------------
+TOKEN_BUDGET = 4000
+
+# Share of TOKEN_BUDGET spent on replayed history, and a hard row cap.
+# The responder enforces TOKEN_BUDGET on the final prompt (build_messages).
+HISTORY_TOKEN_BUDGET = TOKEN_BUDGET // 2
+HISTORY_MAX_MESSAGES = 50
@@ -2,6 +2,7 @@ import os
 from pathlib import Path
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 try:
     from dotenv import load_dotenv
@@ -24,3 +25,32 @@ engine = create_engine(DATABASE_URL, connect_args=connect_args) if connect_args
 
 SessionLocal = sessionmaker(bind=engine)
 Base = declarative_base()
+
+
+# --------------------
+# Async engine (request handlers)
+# --------------------
+def to_async_url(url: str) -> str:
+    """
+    Maps a sync DATABASE_URL onto its async driver:
+    postgresql -> asyncpg, sqlite -> aiosqlite.
+    """
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    for prefix in ("postgresql+psycopg2:", "postgresql:", "postgres:"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg:" + url[len(prefix):]
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+
+async_engine = (
+    create_async_engine(ASYNC_DATABASE_URL)
+    if ASYNC_DATABASE_URL.startswith("sqlite")
+    else create_async_engine(ASYNC_DATABASE_URL, pool_size=20, max_overflow=10, pool_pre_ping=True)
+)
+
+# expire_on_commit=False: attributes stay readable after commit without
+# an implicit (and in async, illegal) lazy refresh.
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
@@ -1,18 +1,17 @@
 from digital_human.graph.state import AgentState
-from digital_human.config.settings import MEMORY_TRIGGERS, MIN_INTENT_CONFIDENCE
+from digital_human.routing import get_routing, match_state
 from .extractor import extract_memory_intent
 
 
 def memory_agent(state: AgentState) -> AgentState:
-    user_input = state.user_input.lower()
+    hits = match_state(state)
 
-    trigger_found = any(trigger in user_input for trigger in MEMORY_TRIGGERS)
-    if not trigger_found:
+    if "memory" not in hits:
         return state
 
-    memory_intent = extract_memory_intent(user_input)
+    memory_intent = extract_memory_intent(state.user_input, hits)
 
-    if memory_intent and memory_intent["confidence"] >= MIN_INTENT_CONFIDENCE:
+    if memory_intent and memory_intent["confidence"] >= get_routing().min_intent_confidence:
         state.memory_intent = memory_intent
         state.needs_memory = True
 
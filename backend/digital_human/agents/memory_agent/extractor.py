@@ -1,3 +1,6 @@
+from digital_human.routing import get_routing, match_triggers
+
+
 # def extract_memory_intent(user_input: str) -> dict:
 #     if "goal" in user_input.lower():
 #         return {
@@ -16,21 +19,30 @@
 #     return None
 
 
-def extract_memory_intent(user_input: str):
-    if "goal is" in user_input:
-        return {
-            "action": "save",
-            "key": "goal",
-            "value": user_input.split("goal is")[-1].strip(),
-            "confidence": 0.9
-        }
-
-    if "prefer" in user_input:
-        return {
-            "action": "save",
-            "key": "preference",
-            "value": user_input.split("prefer")[-1].strip(),
-            "confidence": 0.85
-        }
+EXTRACTION_CONFIDENCE = {
+    "goal": 0.9,
+    "preference": 0.85,
+}
+
+
+def extract_memory_intent(user_input: str, hits: dict | None = None):
+    """
+    The value is whatever follows the LAST "memory_value:<key>" trigger.
+    hits: the request's trigger hits (AgentState.trigger_hits), matched
+    here when not given.
+    """
+    if hits is None:
+        hits = match_triggers(user_input)
+
+    for key in get_routing().memory_extraction_triggers:
+        found = hits.get(f"memory_value:{key}")
+        if found:
+            _, _, end = found[-1]
+            return {
+                "action": "save",
+                "key": key,
+                "value": user_input.lower()[end:].strip(),
+                "confidence": EXTRACTION_CONFIDENCE.get(key, 0.8)
+            }
 
     return None
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import os
+import re
+
+from digital_human.graph.state import AgentState
+from digital_human.integrations import get_memory_loader
+from digital_human.llm.tokenizer import count_tokens
+
+logger = logging.getLogger("memory_recall")
+
+MEMORY_TOP_K = int(os.getenv("MEMORY_TOP_K", "5"))
+MEMORY_MAX_CONTEXT_TOKENS = int(os.getenv("MEMORY_MAX_CONTEXT_TOKENS", "300"))
+# score = RELEVANCE_WEIGHT * keyword overlap + (1 - RELEVANCE_WEIGHT) * confidence
+MEMORY_RELEVANCE_WEIGHT = float(os.getenv("MEMORY_RELEVANCE_WEIGHT", "0.7"))
+# Below this a memory is left out; with the default weights a memory
+# sharing no keyword with the input never makes it
+MEMORY_MIN_SCORE = float(os.getenv("MEMORY_MIN_SCORE", "0.3"))
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "the", "and", "for", "are", "was", "you", "your", "with", "what", "how",
+    "that", "this", "from", "have", "has", "can", "should", "would", "about",
+    "into", "does", "did", "not", "but", "all", "any", "its", "our", "they",
+    "them", "then", "than", "there", "which", "who", "why", "when", "where",
+}
+
+
+def keywords(text: str) -> set:
+    return {w for w in _WORD.findall((text or "").lower()) if len(w) > 2 and w not in _STOPWORDS}
+
+
+def rank_memories(query: str, memories: list, k: int = MEMORY_TOP_K) -> list:
+    """
+    Best k memories for `query`, as [{"type", "content", "confidence"}].
+    Overlap is the share of the query's keywords found in the memory
+    (type included, so "my goal" recalls the "goal" memory).
+    """
+    query_words = keywords(query)
+    if not query_words:
+        return []
+
+    scored = []
+    for memory in memories:
+        words = keywords(f"{memory.get('memory_type', '')} {memory.get('memory_content', '')}")
+        overlap = len(query_words & words) / len(query_words)
+        confidence = memory.get("confidence_score")
+        confidence = 0.5 if confidence is None else confidence
+
+        score = MEMORY_RELEVANCE_WEIGHT * overlap + (1 - MEMORY_RELEVANCE_WEIGHT) * confidence
+        if overlap and score >= MEMORY_MIN_SCORE:
+            scored.append((score, memory))
+
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [
+        {
+            "type": memory.get("memory_type"),
+            "content": memory.get("memory_content"),
+            "confidence": memory.get("confidence_score"),
+        }
+        for _, memory in scored[:k]
+    ]
+
+
+def memory_recall_agent(state: AgentState) -> AgentState:
+    """
+    Memory Recall
+    -------------
+    Injects the user's most relevant stored memories (via the registered
+    memory loader, cached per user) into retrieved_memories, within
+    MEMORY_MAX_CONTEXT_TOKENS. Never blocks the answer on failure.
+    """
+    loader = get_memory_loader()
+    if loader is None or state.user_id is None or not state.feature_enabled("enable_memory"):
+        return state
+
+    try:
+        memories = loader(state.user_id)
+    except Exception:
+        logger.exception("❌ Memory recall failed, continuing without memories")
+        return state
+
+    kept, used = [], 0
+    for memory in rank_memories(state.user_input, memories):
+        tokens = count_tokens(f"{memory['type']}: {memory['content']}")
+        if used + tokens > MEMORY_MAX_CONTEXT_TOKENS:
+            continue
+        used += tokens
+        kept.append(memory)
+
+    if kept:
+        state.retrieved_memories = kept
+        state.used_memory = True
+    return state
+
+
+async def amemory_recall_agent(state: AgentState) -> AgentState:
+    """
+    Async variant: the loader may hit the database, so it runs off the loop.
+    """
+    return await asyncio.to_thread(memory_recall_agent, state)
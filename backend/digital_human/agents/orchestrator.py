@@ -1,7 +1,7 @@
 # digital_human/agents/orchestrator.py
 
 from digital_human.graph.state import AgentState
-from digital_human.config.settings import MEMORY_TRIGGERS, TOOL_TRIGGERS
+from digital_human.routing import match_state
 
 
 def orchestrator_agent(state: AgentState) -> AgentState:
@@ -20,17 +20,18 @@ def orchestrator_agent(state: AgentState) -> AgentState:
     - state.needs_reasoning
     - state.needs_memory
     - state.needs_tools
+    - state.trigger_hits (one pass over the input, reused downstream)
     """
 
-    text = state.user_input.lower().strip()
+    hits = match_state(state)
 
     # 1️⃣ Reasoning always runs (Phase 1)
     state.needs_reasoning = True
 
     # 2️⃣ Memory routing (semantic hint only)
-    state.needs_memory = any(trigger in text for trigger in MEMORY_TRIGGERS)
+    state.needs_memory = "memory" in hits
 
     # 3️⃣ Tool / RAG routing (semantic hint only)
-    state.needs_tools = any(trigger in text for trigger in TOOL_TRIGGERS)
+    state.needs_tools = "tool" in hits
 
     return state
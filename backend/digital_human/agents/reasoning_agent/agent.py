@@ -3,41 +3,49 @@
 from digital_human.graph.state import AgentState
 from digital_human.agents.reasoning_agent.prompts import REASONING_PROMPT
 from digital_human.agents.reasoning_agent.schemas import ReasoningOutput
+from digital_human.agents.reasoning_agent import classifier
+from digital_human.agents.reasoning_agent.cache import (
+    get_cached_intent,
+    cache_intent,
+    aget_cached_intent,
+    acache_intent,
+)
+from digital_human.routing import match_state
+from digital_human.llm.openai_client import async_client
 from openai import OpenAI
+from typing import Optional
 import json
 
 client = OpenAI()
 
 
-def reasoning_agent(state: AgentState) -> AgentState:
+def build_reasoning_request(state: AgentState) -> dict:
     """
-    Reasoning Agent
-    ----------------
-    Uses OpenAI to infer user intent and confidence.
+    Completion kwargs shared by the sync and async reasoning agents.
     """
-
     prompt = REASONING_PROMPT + f'\nUser message:\n"{state.user_input}"'
 
-
-
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
+    return {
+        "model": "gpt-4o-mini",
+        "messages": [
             {"role": "system", "content": "You are a precise reasoning engine."},
             {"role": "user", "content": prompt}
         ],
-        temperature=0.2
-    )
+        "temperature": 0.2,
+    }
 
-    content = response.choices[0].message.content
 
+def apply_reasoning_output(state: AgentState, content: str) -> bool:
+    """
+    Returns True when the LLM answer parsed (and is worth caching).
+    """
     try:
         parsed = ReasoningOutput(**json.loads(content))
     except Exception:
         # Safe fallback
         state.intent = {"type": "general_chat"}
         state.intent_confidence = 0.3
-        return state
+        return False
 
     state.intent = {
         "type": parsed.intent_type,
@@ -45,4 +53,74 @@ def reasoning_agent(state: AgentState) -> AgentState:
     }
     state.intent_confidence = parsed.confidence
 
+    classifier.log_llm_intent(state.user_input, state.intent, parsed.confidence)
+
+    return True
+
+
+def apply_classified_intent(state: AgentState) -> bool:
+    """
+    Rule / local-model stages. Returns True when they decided the intent.
+    """
+    intent = classifier.intent_classifier.classify(state.user_input, match_state(state))
+    if intent is None:
+        return False
+
+    state.intent = {"type": intent["type"], "topic": intent["topic"]}
+    state.intent_confidence = intent["confidence"]
+    return True
+
+
+def apply_cached_intent(state: AgentState, cached: Optional[dict]) -> bool:
+    """
+    An earlier LLM answer for the same (normalized) input.
+    """
+    if cached is None:
+        return False
+
+    state.intent = cached["intent"]
+    state.intent_confidence = cached["confidence"]
+    return True
+
+
+def apply_fast_intent(state: AgentState) -> bool:
+    """
+    Tries the rule / local-model stages, then earlier LLM answers for
+    the same (normalized) input. Returns True when the intent was
+    decided without the LLM.
+    """
+    return apply_classified_intent(state) or apply_cached_intent(state, get_cached_intent(state.user_input))
+
+
+def reasoning_agent(state: AgentState) -> AgentState:
+    """
+    Reasoning Agent
+    ----------------
+    Uses OpenAI to infer user intent and confidence, unless the
+    fast path (classifier.py) or the intent cache already knows it.
+    """
+    if apply_fast_intent(state):
+        return state
+
+    response = client.chat.completions.create(**build_reasoning_request(state))
+
+    if apply_reasoning_output(state, response.choices[0].message.content):
+        cache_intent(state.user_input, state.intent, state.intent_confidence)
+    return state
+
+
+async def areasoning_agent(state: AgentState) -> AgentState:
+    """
+    Async Reasoning Agent (used by the async graph via ainvoke).
+    The intent cache is read and written through its async methods.
+    """
+    if apply_classified_intent(state):
+        return state
+    if apply_cached_intent(state, await aget_cached_intent(state.user_input)):
+        return state
+
+    response = await async_client.chat.completions.create(**build_reasoning_request(state))
+
+    if apply_reasoning_output(state, response.choices[0].message.content):
+        await acache_intent(state.user_input, state.intent, state.intent_confidence)
     return state
@@ -0,0 +1,68 @@
+# reasoning_agent/cache.py
+
+"""
+Memoized LLM intent classifications.
+
+Keyed on the normalized user input (case, whitespace and punctuation
+folded), so "Explain Redis persistence?" and "explain  redis persistence"
+share one entry. With REDIS_URL set the entries are shared by all
+workers; otherwise a per-process LRU is used.
+"""
+import hashlib
+import os
+import re
+from typing import Optional
+
+from digital_human.cache import CacheBackend, InMemoryBackend, RedisBackend
+
+INTENT_CACHE_MAX_SIZE = int(os.getenv("INTENT_CACHE_MAX_SIZE", "20000"))
+INTENT_CACHE_TTL_SECONDS = float(os.getenv("INTENT_CACHE_TTL_SECONDS", "86400"))
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_SPACE = re.compile(r"\s+")
+
+_redis_url = os.getenv("REDIS_URL")
+
+intent_cache: CacheBackend = (
+    RedisBackend(_redis_url, prefix="intent", ttl_seconds=INTENT_CACHE_TTL_SECONDS)
+    if _redis_url
+    else InMemoryBackend(max_size=INTENT_CACHE_MAX_SIZE, ttl_seconds=INTENT_CACHE_TTL_SECONDS)
+)
+
+
+def configure_intent_cache(backend: CacheBackend) -> None:
+    """
+    Swap the cache backend (tests, or a shared backend at startup).
+    """
+    global intent_cache
+    intent_cache = backend
+
+
+def normalize_input(text: str) -> str:
+    text = _PUNCTUATION.sub(" ", text.lower())
+    return _SPACE.sub(" ", text).strip()
+
+
+def _key(text: str) -> str:
+    # Hashed so long messages don't become long Redis keys
+    return hashlib.sha256(normalize_input(text).encode("utf-8")).hexdigest()
+
+
+def get_cached_intent(text: str) -> Optional[dict]:
+    """
+    Returns {"intent": {...}, "confidence": float} or None.
+    """
+    return intent_cache.get(_key(text))
+
+
+def cache_intent(text: str, intent: dict, confidence: float) -> None:
+    intent_cache.set(_key(text), {"intent": intent, "confidence": confidence})
+
+
+# Event-loop variants (a shared backend is a network round trip)
+async def aget_cached_intent(text: str) -> Optional[dict]:
+    return await intent_cache.aget(_key(text))
+
+
+async def acache_intent(text: str, intent: dict, confidence: float) -> None:
+    await intent_cache.aset(_key(text), {"intent": intent, "confidence": confidence})
@@ -0,0 +1,301 @@
+# reasoning_agent/classifier.py
+
+"""
+Tiered intent classifier that runs BEFORE the reasoning LLM.
+
+Stage 1 - rules: greetings and the specific triggers of config/settings.py
+Stage 2 - local model: multinomial Naive Bayes trained on logged LLM labels
+Stage 3 - LLM: only when neither stage reaches FAST_INTENT_MIN_CONFIDENCE
+
+Training data is the JSONL the reasoning agent appends to INTENT_LOG_PATH,
+one {"text", "intent_type", "topic", "confidence"} object per line:
+
+    python -m digital_human.agents.reasoning_agent.classifier train intents.jsonl model.json
+    python -m digital_human.agents.reasoning_agent.classifier eval intents.jsonl model.json
+"""
+import json
+import math
+import os
+import re
+import sys
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from digital_human.config.settings import (
+    GREETING_MESSAGES,
+    FAST_INTENT_MIN_CONFIDENCE,
+)
+from digital_human.routing import get_routing, match_triggers
+
+INTENT_MODEL_PATH = os.getenv("INTENT_MODEL_PATH")
+INTENT_LOG_PATH = os.getenv("INTENT_LOG_PATH")
+
+RULE_CONFIDENCE = 0.9
+# Matched only generic triggers ("how", "what is"): left to the next stage
+GENERIC_RULE_CONFIDENCE = 0.5
+GREETING_CONFIDENCE = 0.95
+
+_WORD = re.compile(r"[a-z0-9']+")
+_GREETINGS = {" ".join(_WORD.findall(g)) for g in GREETING_MESSAGES}
+_TOPIC_FILLER = {"is", "are", "to", "for", "the", "a", "an", "of", "about", "between", "me"}
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def _topic_after(words: List[str], trigger: List[str]) -> Optional[str]:
+    for i in range(len(words) - len(trigger) + 1):
+        if words[i:i + len(trigger)] == trigger:
+            rest = words[i + len(trigger):]
+            while rest and rest[0] in _TOPIC_FILLER:
+                rest = rest[1:]
+            return " ".join(rest[:6]) or None
+    return None
+
+
+# --------------------------------------------------
+# Stage 1: rules
+# --------------------------------------------------
+def rule_classify(text: str, hits: Optional[dict] = None) -> Optional[dict]:
+    """
+    Returns an intent only when the triggers are unambiguous:
+    one intent family matched (information_request may be overridden
+    by a more specific family). Conflicts go to the next stage.
+
+    Confidence reflects how specific the match is: a match made only of
+    generic triggers ("how are you doing today?") scores
+    GENERIC_RULE_CONFIDENCE, too low to skip the next stages.
+
+    hits: the request's trigger hits (AgentState.trigger_hits), matched
+    here when not given.
+    """
+    words = _words(text)
+    if not words:
+        return None
+
+    if " ".join(words) in _GREETINGS:
+        return {"type": "general_chat", "topic": None, "confidence": GREETING_CONFIDENCE}
+
+    if hits is None:
+        hits = match_triggers(text)
+
+    matched: Dict[str, List[str]] = {
+        family[len("intent:"):]: [phrase for phrase, _, _ in found]
+        for family, found in hits.items()
+        if family.startswith("intent:")
+    }
+
+    if len(matched) > 1:
+        matched.pop("information_request", None)
+    if len(matched) != 1:
+        return None
+
+    intent_type, phrases = next(iter(matched.items()))
+    generic = {" ".join(p.lower().split()) for p in get_routing().generic_intent_triggers}
+    specific = [phrase for phrase in phrases if phrase not in generic]
+
+    return {
+        "type": intent_type,
+        "topic": _topic_after(words, (specific or phrases)[0].split()),
+        "confidence": RULE_CONFIDENCE if specific else GENERIC_RULE_CONFIDENCE,
+    }
+
+
+# --------------------------------------------------
+# Stage 2: local model
+# --------------------------------------------------
+def _features(text: str) -> List[str]:
+    words = _words(text)
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+class NaiveBayesIntentModel:
+    """
+    Multinomial Naive Bayes over unigrams + bigrams (Laplace smoothing).
+    Pure Python; a few thousand logged intents train in milliseconds.
+    """
+
+    def __init__(self, alpha: float = 1.0):
+        self.alpha = alpha
+        self.class_counts: Counter = Counter()
+        self.feature_counts: Dict[str, Counter] = defaultdict(Counter)
+        self.vocabulary: set = set()
+
+    def fit(self, examples: Iterable[Tuple[str, str]]) -> "NaiveBayesIntentModel":
+        for text, label in examples:
+            features = _features(text)
+            self.class_counts[label] += 1
+            self.feature_counts[label].update(features)
+            self.vocabulary.update(features)
+        return self
+
+    def predict(self, text: str) -> Tuple[Optional[str], float]:
+        """
+        Returns (label, posterior probability of that label).
+        """
+        if not self.class_counts:
+            return None, 0.0
+
+        total = sum(self.class_counts.values())
+        vocab_size = len(self.vocabulary) or 1
+        features = [f for f in _features(text) if f in self.vocabulary]
+
+        scores = {}
+        for label, count in self.class_counts.items():
+            counts = self.feature_counts[label]
+            denom = sum(counts.values()) + self.alpha * vocab_size
+            score = math.log(count / total)
+            for feature in features:
+                score += math.log((counts[feature] + self.alpha) / denom)
+            scores[label] = score
+
+        best = max(scores, key=scores.get)
+        norm = sum(math.exp(s - scores[best]) for s in scores.values())
+        return best, 1.0 / norm
+
+    def to_dict(self) -> dict:
+        return {
+            "alpha": self.alpha,
+            "class_counts": dict(self.class_counts),
+            "feature_counts": {k: dict(v) for k, v in self.feature_counts.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "NaiveBayesIntentModel":
+        model = cls(alpha=data.get("alpha", 1.0))
+        model.class_counts = Counter(data["class_counts"])
+        for label, counts in data["feature_counts"].items():
+            model.feature_counts[label] = Counter(counts)
+            model.vocabulary.update(counts)
+        return model
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: str) -> "NaiveBayesIntentModel":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+# --------------------------------------------------
+# Tiers
+# --------------------------------------------------
+class TieredIntentClassifier:
+    """
+    classify() returns an intent dict {"type", "topic", "confidence",
+    "source"} from the cheap stages, or None when the LLM must decide.
+    """
+
+    def __init__(
+        self,
+        model: Optional[NaiveBayesIntentModel] = None,
+        threshold: float = FAST_INTENT_MIN_CONFIDENCE,
+    ):
+        self.model = model
+        self.threshold = threshold
+        self.stats = {"rules": 0, "model": 0, "llm": 0}
+
+    def classify(self, text: str, hits: Optional[dict] = None) -> Optional[dict]:
+        intent = rule_classify(text, hits)
+        if intent and intent["confidence"] >= self.threshold:
+            self.stats["rules"] += 1
+            return {**intent, "source": "rules"}
+
+        if self.model is not None:
+            label, confidence = self.model.predict(text)
+            if label and confidence >= self.threshold:
+                self.stats["model"] += 1
+                return {"type": label, "topic": None, "confidence": confidence, "source": "model"}
+
+        self.stats["llm"] += 1
+        return None
+
+    @property
+    def hit_rate(self) -> float:
+        total = sum(self.stats.values())
+        return (self.stats["rules"] + self.stats["model"]) / total if total else 0.0
+
+
+def load_examples(path: str) -> List[Tuple[str, str]]:
+    """
+    Reads logged intents (JSONL) as (text, intent_type) pairs.
+    """
+    examples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                examples.append((row["text"], row["intent_type"]))
+    return examples
+
+
+def log_llm_intent(text: str, intent: dict, confidence: float) -> None:
+    """
+    Appends an LLM label to INTENT_LOG_PATH (training data for stage 2).
+    """
+    if not INTENT_LOG_PATH:
+        return
+    row = {
+        "text": text,
+        "intent_type": intent.get("type"),
+        "topic": intent.get("topic"),
+        "confidence": confidence,
+    }
+    with open(INTENT_LOG_PATH, "a", encoding="utf-8") as f:
+        f.write(json.dumps(row) + "\n")
+
+
+def evaluate(classifier: TieredIntentClassifier, examples: Iterable[Tuple[str, str]]) -> dict:
+    """
+    Hit-rate of the cheap stages and their accuracy against the LLM labels.
+    """
+    total = hits = correct = 0
+    for text, llm_label in examples:
+        total += 1
+        intent = classifier.classify(text)
+        if intent is None:
+            continue
+        hits += 1
+        correct += intent["type"] == llm_label
+
+    return {
+        "total": total,
+        "hits": hits,
+        "hit_rate": hits / total if total else 0.0,
+        "accuracy": correct / hits if hits else 0.0,
+    }
+
+
+def _default_classifier() -> TieredIntentClassifier:
+    model = None
+    if INTENT_MODEL_PATH and os.path.exists(INTENT_MODEL_PATH):
+        model = NaiveBayesIntentModel.load(INTENT_MODEL_PATH)
+    return TieredIntentClassifier(model=model)
+
+
+intent_classifier = _default_classifier()
+
+
+def main(argv=None):
+    argv = argv if argv is not None else sys.argv[1:]
+    if len(argv) != 3 or argv[0] not in ("train", "eval"):
+        print("usage: classifier (train|eval) <intents.jsonl> <model.json>")
+        return 2
+
+    command, data_path, model_path = argv
+    examples = load_examples(data_path)
+
+    if command == "train":
+        NaiveBayesIntentModel().fit(examples).save(model_path)
+        print(f"trained on {len(examples)} examples -> {model_path}")
+    else:
+        classifier = TieredIntentClassifier(model=NaiveBayesIntentModel.load(model_path))
+        print(json.dumps(evaluate(classifier, examples)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
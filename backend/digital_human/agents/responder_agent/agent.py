@@ -1,7 +1,9 @@
 from typing import List, Dict
 from digital_human.graph.state import AgentState
-from digital_human.llm.openai_client import client
+from digital_human.llm.openai_client import client, async_client
+from digital_human.llm.tokenizer import count_tokens
 from digital_human.agents.responder_agent.prompts import SYSTEM_PROMPT
+from digital_human.agents.responder_agent import cache as response_cache
 
 
 # --------------------------------------------------
@@ -27,11 +29,12 @@ def build_messages(state: AgentState) -> List[Dict[str, str]]:
             "content": f"User intent: {state.intent}"
         })
 
-    #  Memory grounding (if recall is added later)
+    #  Memory grounding (memory_recall_agent: top-k, token-capped)
     if getattr(state, "retrieved_memories", None):
+        memories = "\n".join(f"- {m['type']}: {m['content']}" for m in state.retrieved_memories)
         messages.append({
             "role": "system",
-            "content": f"Relevant user memories: {state.retrieved_memories}"
+            "content": f"Relevant user memories:\n{memories}"
         })
 
     #  Tool grounding
@@ -44,6 +47,31 @@ def build_messages(state: AgentState) -> List[Dict[str, str]]:
             )
         })
 
+    #  Earlier conversation (folded into a rolling summary)
+    if getattr(state, "conversation_summary", None):
+        messages.append({
+            "role": "system",
+            "content": f"Summary of the earlier conversation: {state.conversation_summary}"
+        })
+
+    #  Recent conversation: newest turns that still fit state.token_budget
+    used = sum(count_tokens(m["content"]) for m in messages) + count_tokens(state.user_input)
+    history = []
+
+    for turn in reversed(state.chat_history):
+        if turn.get("role") not in ("user", "assistant"):
+            continue
+        tokens = count_tokens(turn["content"])
+        if used + tokens > state.token_budget:
+            break
+        used += tokens
+        history.append({
+            "role": turn["role"],
+            "content": turn["content"]
+        })
+
+    messages.extend(reversed(history))
+
     # User message (last)
     messages.append({
         "role": "user",
@@ -53,6 +81,36 @@ def build_messages(state: AgentState) -> List[Dict[str, str]]:
     return messages
 
 
+# --------------------------------------------------
+# Helper: completion kwargs (sync + async, blocking + streaming)
+# --------------------------------------------------
+def build_completion_request(state: AgentState, stream: bool = False) -> dict:
+    request = {
+        "model": "gpt-4o-mini",
+        "messages": build_messages(state),
+        "temperature": 0.4,
+    }
+    if stream:
+        request["stream"] = True
+
+    # Per-user output cap
+    max_tokens = state.user_config.get("max_tokens")
+    if max_tokens:
+        request["max_tokens"] = int(max_tokens)
+
+    return request
+
+
+def _finalize(state: AgentState, response_text: str) -> AgentState:
+    state.final_response = response_text
+
+    # Flags for backend / frontend analytics
+    state.used_tools = bool(getattr(state, "tool_results", None))
+    state.used_memory = bool(getattr(state, "memory_intent", None))
+
+    return state
+
+
 # --------------------------------------------------
 # LangGraph Responder Node (NON-STREAMING)
 # --------------------------------------------------
@@ -66,21 +124,41 @@ def responder_node(state: AgentState) -> AgentState:
     - MUST NOT yield
     """
 
-    messages = build_messages(state)
+    request = build_completion_request(state)
+    cache = response_cache.response_cache
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=messages,
-        temperature=0.4
-    )
+    cached = cache.lookup(state, request) if cache else None
+    if cached is not None:
+        return _finalize(state, cached)
 
-    state.final_response = response.choices[0].message.content
+    response = client.chat.completions.create(**request)
+    content = response.choices[0].message.content
 
-    # Flags for backend / frontend analytics
-    state.used_tools = bool(getattr(state, "tool_results", None))
-    state.used_memory = bool(getattr(state, "memory_intent", None))
+    if cache:
+        cache.store(state, request, content)
 
-    return state
+    return _finalize(state, content)
+
+
+async def aresponder_node(state: AgentState) -> AgentState:
+    """
+    Async variant of responder_node (same rules).
+    """
+
+    request = build_completion_request(state)
+    cache = response_cache.response_cache
+
+    cached = await cache.alookup(state, request) if cache else None
+    if cached is not None:
+        return _finalize(state, cached)
+
+    response = await async_client.chat.completions.create(**request)
+    content = response.choices[0].message.content
+
+    if cache:
+        await cache.astore(state, request, content)
+
+    return _finalize(state, content)
 
 
 # --------------------------------------------------
@@ -96,23 +174,67 @@ def responder_stream(state: AgentState):
     - Used only by CLI / Backend / SSE / WebSocket
     """
 
-    messages = build_messages(state)
+    request = build_completion_request(state, stream=True)
+    cache = response_cache.response_cache
 
-    stream = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=messages,
-        temperature=0.4,
-        stream=True
-    )
+    cached = cache.lookup(state, request) if cache else None
+    if cached is not None:
+        state.final_response = cached
+        yield cached
+        return
+
+    stream = client.chat.completions.create(**request)
 
     full_response = ""
 
-    for chunk in stream:
-        delta = chunk.choices[0].delta
-        if delta and delta.content:
-            token = delta.content
-            full_response += token
-            yield token  
+    try:
+        for chunk in stream:
+            delta = chunk.choices[0].delta
+            if delta and delta.content:
+                token = delta.content
+                full_response += token
+                yield token
+    finally:
+        # Also runs on close() (client disconnect): stops upstream generation
+        stream.close()
+
+    # Save final response back into state (only complete answers are cached)
+    state.final_response = full_response
+    if cache:
+        cache.store(state, request, full_response)
+
+
+async def aresponder_stream(state: AgentState):
+    """
+    Async streaming responder (async generator).
+    Same rules as responder_stream.
+    """
+
+    request = build_completion_request(state, stream=True)
+    cache = response_cache.response_cache
+
+    cached = await cache.alookup(state, request) if cache else None
+    if cached is not None:
+        state.final_response = cached
+        yield cached
+        return
+
+    stream = await async_client.chat.completions.create(**request)
+
+    full_response = ""
 
-    # Save final response back into state
+    try:
+        async for chunk in stream:
+            delta = chunk.choices[0].delta
+            if delta and delta.content:
+                token = delta.content
+                full_response += token
+                yield token
+    finally:
+        # Also runs on aclose() (client disconnect): stops upstream generation
+        await stream.close()
+
+    # Save final response back into state (only complete answers are cached)
     state.final_response = full_response
+    if cache:
+        await cache.astore(state, request, full_response)
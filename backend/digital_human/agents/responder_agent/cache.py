@@ -0,0 +1,214 @@
+# responder_agent/cache.py
+
+"""
+Two-tier response cache in front of the responder.
+
+Tier 1 - exact: hash of the normalized completion request
+Tier 2 - semantic: cosine similarity of the user message embedding,
+         only among entries built from the same context (system prompts,
+         intent type, tool results, summary, history)
+
+Prompts that carry per-user context (memories, history, summary) are
+scoped to state.user_id; without a user_id such turns are not cached.
+
+The backend lifespan enables tier 2 with the shared embedding service
+(RESPONSE_CACHE_SEMANTIC=0 keeps exact matching only). An embedding
+failure only costs the semantic tier, never the answer.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+from typing import Callable, List, Optional, Sequence
+
+from digital_human.cache import CacheBackend, InMemoryBackend, TTLCache
+from digital_human.graph.state import AgentState
+
+logger = logging.getLogger("response_cache")
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+RESPONSE_CACHE_SEMANTIC = os.getenv("RESPONSE_CACHE_SEMANTIC", "1") == "1"
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "600"))
+RESPONSE_CACHE_MAX_SIZE = int(os.getenv("RESPONSE_CACHE_MAX_SIZE", "5000"))
+SEMANTIC_MIN_SIMILARITY = float(os.getenv("RESPONSE_CACHE_MIN_SIMILARITY", "0.92"))
+
+# Candidates kept per context for the semantic scan
+SEMANTIC_MAX_PER_CONTEXT = 50
+
+_SPACE = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    return _SPACE.sub(" ", text).strip().lower()
+
+
+def _digest(payload) -> str:
+    raw = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def cache_scope(state: AgentState) -> Optional[str]:
+    """
+    "global" when the prompt is user-independent, "user:<id>" when it
+    carries personal context, None when it must not be cached.
+    """
+    personal = bool(
+        state.retrieved_memories
+        or state.chat_history
+        or state.conversation_summary
+    )
+    if not personal:
+        return "global"
+    if state.user_id is None:
+        return None
+    return f"user:{state.user_id}"
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        embed_fn: Optional[Callable[[str], List[float]]] = None,
+        min_similarity: float = SEMANTIC_MIN_SIMILARITY,
+        ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS,
+        max_size: int = RESPONSE_CACHE_MAX_SIZE,
+    ):
+        self.backend = backend or InMemoryBackend(max_size=max_size, ttl_seconds=ttl_seconds)
+        self.embed_fn = embed_fn
+        self.min_similarity = min_similarity
+        self.ttl_seconds = ttl_seconds
+        # context key -> [(embedding, exact key)], bounded like the exact tier
+        self._semantic = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "stores": 0, "semantic_errors": 0}
+
+    # ---------------- keys ----------------
+    def _keys(self, state: AgentState, request: dict):
+        scope = cache_scope(state)
+        if scope is None:
+            return None, None
+
+        messages = [
+            {"role": m["role"], "content": _normalize(m["content"])}
+            for m in request["messages"]
+        ]
+        params = {k: v for k, v in request.items() if k not in ("messages", "stream")}
+        exact_key = f"{scope}:{_digest([params, messages])}"
+
+        # Context = everything but the question itself; the intent topic
+        # and echoed queries vary with phrasing, so they are left out.
+        question = _normalize(state.user_input)
+        context = [
+            m["content"].replace(question, "<query>")
+            for m in messages[:-1]
+            if not m["content"].startswith("user intent:")
+        ]
+        intent_type = (state.intent or {}).get("type")
+        context_key = f"{scope}:{_digest([params, intent_type, context])}"
+
+        return exact_key, context_key
+
+    # ---------------- lookup / store ----------------
+    def lookup(self, state: AgentState, request: dict) -> Optional[str]:
+        exact_key, context_key = self._keys(state, request)
+        if exact_key is None:
+            self.stats["misses"] += 1
+            return None
+
+        response = self.backend.get(exact_key)
+        if response is not None:
+            self.stats["exact_hits"] += 1
+            return response
+
+        if self.embed_fn is not None:
+            try:
+                response = self._semantic_lookup(state, context_key)
+            except Exception:
+                self.stats["semantic_errors"] += 1
+                logger.exception("❌ Semantic cache lookup failed, treating as a miss")
+                response = None
+            if response is not None:
+                self.stats["semantic_hits"] += 1
+                return response
+
+        self.stats["misses"] += 1
+        return None
+
+    def _semantic_lookup(self, state: AgentState, context_key: str) -> Optional[str]:
+        candidates = self._semantic.get(context_key)
+        if not candidates:
+            return None
+
+        query = self.embed_fn(_normalize(state.user_input))
+        best_key, best_score = None, self.min_similarity
+        for embedding, exact_key in candidates:
+            score = _cosine(query, embedding)
+            if score >= best_score:
+                best_key, best_score = exact_key, score
+
+        return self.backend.get(best_key) if best_key else None
+
+    def store(self, state: AgentState, request: dict, response: str) -> None:
+        exact_key, context_key = self._keys(state, request)
+        if exact_key is None or not response:
+            return
+
+        self.backend.set(exact_key, response, self.ttl_seconds)
+        self.stats["stores"] += 1
+
+        if self.embed_fn is not None:
+            try:
+                embedding = self.embed_fn(_normalize(state.user_input))
+            except Exception:
+                self.stats["semantic_errors"] += 1
+                logger.exception("❌ Semantic cache store failed, exact entry kept")
+                return
+            candidates = list(self._semantic.get(context_key) or [])
+            candidates.append((embedding, exact_key))
+            self._semantic.set(context_key, candidates[-SEMANTIC_MAX_PER_CONTEXT:])
+
+    async def alookup(self, state: AgentState, request: dict) -> Optional[str]:
+        # The embedding call may block; keep it off the event loop
+        if self.embed_fn is None:
+            return self.lookup(state, request)
+        return await asyncio.to_thread(self.lookup, state, request)
+
+    async def astore(self, state: AgentState, request: dict, response: str) -> None:
+        if self.embed_fn is None:
+            return self.store(state, request, response)
+        await asyncio.to_thread(self.store, state, request, response)
+
+    @property
+    def semantic(self) -> bool:
+        return self.embed_fn is not None
+
+    @property
+    def hit_rate(self) -> float:
+        hits = self.stats["exact_hits"] + self.stats["semantic_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    def clear(self) -> None:
+        self.backend.clear()
+        self._semantic.clear()
+
+
+response_cache: Optional[ResponseCache] = ResponseCache() if RESPONSE_CACHE_ENABLED else None
+
+
+def configure_response_cache(cache: Optional[ResponseCache]) -> None:
+    """
+    Swaps the process-wide cache (e.g. to add an embed_fn or a shared
+    backend); None disables caching.
+    """
+    global response_cache
+    response_cache = cache
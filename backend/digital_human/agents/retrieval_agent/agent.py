@@ -0,0 +1,146 @@
+# agents/retrieval_agent/agent.py
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from digital_human.graph.state import AgentState
+from digital_human.integrations import get_retriever, get_async_retriever, get_reranker
+from digital_human.llm.tokenizer import count_tokens
+
+logger = logging.getLogger("retrieval_agent")
+
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "4"))
+# Candidates fetched per kept document when a reranker is registered
+RAG_RERANK_CANDIDATES = int(os.getenv("RAG_RERANK_CANDIDATES", "3"))
+RAG_MAX_CONTEXT_TOKENS = int(os.getenv("RAG_MAX_CONTEXT_TOKENS", "1200"))
+# Whole retrieval stage (embed + search + rerank); past it the turn
+# continues without RAG context
+RAG_LATENCY_BUDGET_MS = float(os.getenv("RAG_LATENCY_BUDGET_MS", "800"))
+
+# Sync graph: retrieval runs here so it can be abandoned on timeout
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="rag")
+
+
+def should_retrieve(state: AgentState) -> bool:
+    return (
+        state.needs_tools
+        and state.feature_enabled("enable_rag")
+        and state.user_id is not None
+        and (get_retriever() is not None or get_async_retriever() is not None)
+    )
+
+
+def _candidates(reranker) -> int:
+    return RAG_TOP_K * RAG_RERANK_CANDIDATES if reranker else RAG_TOP_K
+
+
+def _search(state: AgentState, deadline: float) -> list:
+    """
+    Retriever + optional reranker; the reranker is skipped when the
+    budget is already spent.
+    """
+    reranker = get_reranker()
+
+    documents = get_retriever()(state.user_id, state.user_input, _candidates(reranker))
+
+    if reranker and documents and time.monotonic() < deadline:
+        documents = reranker(state.user_input, documents)
+
+    return documents[:RAG_TOP_K]
+
+
+async def _asearch(state: AgentState, deadline: float) -> list:
+    """
+    _search on the async retriever when one is registered (its embedding
+    call joins the micro-batch of concurrent requests); otherwise the
+    sync retriever in a worker thread.
+    """
+    aretriever = get_async_retriever()
+    if aretriever is None:
+        return await asyncio.to_thread(_search, state, deadline)
+
+    reranker = get_reranker()
+
+    documents = await aretriever(state.user_id, state.user_input, _candidates(reranker))
+
+    if reranker and documents and time.monotonic() < deadline:
+        documents = await asyncio.to_thread(reranker, state.user_input, documents)
+
+    return documents[:RAG_TOP_K]
+
+
+def apply_documents(state: AgentState, documents: list) -> AgentState:
+    """
+    Fills tool_results with as many documents as fit RAG_MAX_CONTEXT_TOKENS.
+    """
+    kept, used = [], 0
+    for doc in documents:
+        content = doc.get("content") or ""
+        tokens = count_tokens(content)
+        if not content or used + tokens > RAG_MAX_CONTEXT_TOKENS:
+            continue
+        used += tokens
+
+        metadata = doc.get("metadata") or {}
+        kept.append({
+            "title": metadata.get("title") or metadata.get("source_id"),
+            "content": content,
+            "source": metadata.get("source") or metadata.get("path"),
+            "score": doc.get("score"),
+        })
+
+    if kept:
+        state.tool_results = {"documents": kept, "query_used": state.user_input, "source": "rag"}
+        state.rag_used = True
+    return state
+
+
+def retrieval_agent(state: AgentState) -> AgentState:
+    """
+    Retrieval Agent
+    ---------------
+    Top-k search over the user's own corpus (VectorDBRAG via the
+    registered retriever). Never blocks the answer: on timeout or error
+    the turn falls back to the tool path.
+    """
+    if not should_retrieve(state) or get_retriever() is None:
+        return state
+
+    budget = RAG_LATENCY_BUDGET_MS / 1000
+    future = _executor.submit(_search, state, time.monotonic() + budget)
+    try:
+        documents = future.result(timeout=budget)
+    except FutureTimeout:
+        logger.warning(f"⏱️ Retrieval over budget ({RAG_LATENCY_BUDGET_MS:.0f} ms), continuing without RAG")
+        return state
+    except Exception:
+        logger.exception("❌ Retrieval failed, continuing without RAG")
+        return state
+
+    return apply_documents(state, documents)
+
+
+async def aretrieval_agent(state: AgentState) -> AgentState:
+    """
+    Async variant (same budget and fallback).
+    """
+    if not should_retrieve(state):
+        return state
+
+    budget = RAG_LATENCY_BUDGET_MS / 1000
+    try:
+        documents = await asyncio.wait_for(
+            _asearch(state, time.monotonic() + budget),
+            timeout=budget,
+        )
+    except asyncio.TimeoutError:
+        logger.warning(f"⏱️ Retrieval over budget ({RAG_LATENCY_BUDGET_MS:.0f} ms), continuing without RAG")
+        return state
+    except Exception:
+        logger.exception("❌ Retrieval failed, continuing without RAG")
+        return state
+
+    return apply_documents(state, documents)
@@ -0,0 +1,43 @@
+# summary_agent/agent.py
+
+from typing import List, Dict, Optional
+from digital_human.llm.openai_client import client, async_client
+from digital_human.agents.summary_agent.prompts import SUMMARY_PROMPT
+
+SUMMARY_MAX_WORDS = 250
+
+
+def build_summary_request(previous_summary: Optional[str], messages: List[Dict[str, str]]) -> dict:
+    """
+    Completion kwargs for folding `messages` into `previous_summary`.
+    Only the new messages are sent; the summary is never rebuilt
+    from the full history.
+    """
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+
+    return {
+        "model": "gpt-4o-mini",
+        "messages": [
+            {"role": "system", "content": SUMMARY_PROMPT.format(max_words=SUMMARY_MAX_WORDS)},
+            {
+                "role": "user",
+                "content": (
+                    f"Existing summary:\n{previous_summary or '(none)'}\n\n"
+                    f"New messages:\n{transcript}"
+                ),
+            },
+        ],
+        "temperature": 0.2,
+    }
+
+
+def summarize_messages(previous_summary: Optional[str], messages: List[Dict[str, str]]) -> str:
+    response = client.chat.completions.create(**build_summary_request(previous_summary, messages))
+    return response.choices[0].message.content.strip()
+
+
+async def asummarize_messages(previous_summary: Optional[str], messages: List[Dict[str, str]]) -> str:
+    response = await async_client.chat.completions.create(
+        **build_summary_request(previous_summary, messages)
+    )
+    return response.choices[0].message.content.strip()
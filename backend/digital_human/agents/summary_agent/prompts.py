@@ -0,0 +1,10 @@
+SUMMARY_PROMPT = """
+You maintain a running summary of a conversation between a user and an AI assistant.
+
+Rules:
+- Merge the new messages into the existing summary.
+- Keep facts, decisions, user goals and preferences, and open questions.
+- Drop greetings, filler and anything already superseded.
+- Write in third person, plain prose, at most {max_words} words.
+- Return ONLY the updated summary.
+"""
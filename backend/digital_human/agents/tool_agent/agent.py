@@ -2,10 +2,7 @@
 
 from digital_human.graph.state import AgentState
 from digital_human.agents.tool_agent.schemas import ToolRequest
-from digital_human.agents.tool_agent.rules import INTENT_TO_TOOL
-
-
-MIN_CONFIDENCE_FOR_TOOL = 0.6
+from digital_human.routing import get_routing
 
 
 def tool_agent(state: AgentState) -> AgentState:
@@ -20,16 +17,18 @@ def tool_agent(state: AgentState) -> AgentState:
     if not state.needs_tools:
         return state
 
-    if state.intent_confidence is None or state.intent_confidence < MIN_CONFIDENCE_FOR_TOOL:
+    routing = get_routing()
+
+    if state.intent_confidence is None or state.intent_confidence < routing.min_confidence_for_tool:
         return state
 
     intent_type = state.intent.get("type")
 
-    if intent_type not in INTENT_TO_TOOL:
+    if intent_type not in routing.intent_to_tool:
         return state
 
     # ---------- Decision Layer ----------
-    tool_name = INTENT_TO_TOOL[intent_type]
+    tool_name = routing.intent_to_tool[intent_type]
 
     # ---------- Parameter Construction ----------
     query = state.user_input
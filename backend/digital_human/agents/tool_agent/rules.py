@@ -4,3 +4,5 @@ INTENT_TO_TOOL = {
     "information_request": "web_search",
     "comparison_request": "web_search",
 }
+
+MIN_CONFIDENCE_FOR_TOOL = 0.6
@@ -0,0 +1,216 @@
+# digital_human/cache.py
+
+"""
+Bounded caches shared by the backend and the agents.
+
+- TTLCache: in-process LRU + TTL, O(1) get/set, thread-safe
+- CacheBackend: interface for pluggable (possibly shared) backends
+- InMemoryBackend: per-process backend (also the test fake)
+- RedisBackend: shared across workers; needs the optional `redis` package
+
+Code on the event loop uses the backends' async methods (aget / aset /
+adelete): RedisBackend runs them in a worker thread, so a cache round
+trip never blocks the other in-flight requests.
+"""
+import asyncio
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    LRU cache with a per-entry time-to-live.
+
+    Every operation is O(1): entries live in an OrderedDict ordered by
+    recency, so eviction pops the oldest end. Expired entries are
+    dropped lazily when read or when they reach the LRU end.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        ttl_seconds: Optional[float] = 300,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+
+            if entry is _MISSING:
+                self.stats["misses"] += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self._clock():
+                del self._data[key]
+                self.stats["expirations"] += 1
+                self.stats["misses"] += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = self._clock() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._data.pop(key, _MISSING) is not _MISSING
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+
+# --------------------------------------------------
+# Pluggable backends
+# --------------------------------------------------
+class CacheBackend:
+    """
+    Minimal key/value interface. Keys are strings; values must be
+    JSON-serialisable so that shared backends can store them.
+    """
+
+    def get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    # In-process backends answer without I/O; network backends override
+    # these to keep the event loop free
+    async def aget(self, key: str) -> Any:
+        return self.get(key)
+
+    async def aset(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        self.set(key, value, ttl_seconds)
+
+    async def adelete(self, key: str) -> None:
+        self.delete(key)
+
+
+class InMemoryBackend(CacheBackend):
+    """
+    Per-process backend on top of TTLCache.
+    Used by default, and as the in-process fake of shared backends in tests.
+    """
+
+    def __init__(self, max_size: int = 10_000, ttl_seconds: Optional[float] = 300, clock=time.monotonic):
+        self.cache = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds, clock=clock)
+
+    @property
+    def stats(self) -> dict:
+        return self.cache.stats
+
+    def get(self, key: str) -> Any:
+        return self.cache.get(key)
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        self.cache.set(key, value, ttl_seconds)
+
+    def delete(self, key: str) -> None:
+        self.cache.delete(key)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+
+class RedisBackend(CacheBackend):
+    """
+    Shared backend: every worker sees the same entries and invalidations.
+    Size is bounded by Redis' own maxmemory / eviction policy.
+    """
+
+    def __init__(self, url: str, prefix: str, ttl_seconds: Optional[float] = 300):
+        if redis is None:
+            raise RuntimeError("RedisBackend requires the `redis` package")
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        self.stats = {"hits": 0, "misses": 0}
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def get(self, key: str) -> Any:
+        raw = self.client.get(self._key(key))
+        if raw is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        payload = json.dumps(value)
+        if ttl is None:
+            self.client.set(self._key(key), payload)
+        else:
+            self.client.set(self._key(key), payload, px=int(ttl * 1000))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self._key(key))
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(f"{self.prefix}:*"):
+            self.client.delete(key)
+
+    # The client is synchronous: from the event loop every round trip
+    # runs in a worker thread
+    async def aget(self, key: str) -> Any:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        await asyncio.to_thread(self.set, key, value, ttl_seconds)
+
+    async def adelete(self, key: str) -> None:
+        await asyncio.to_thread(self.delete, key)
@@ -22,3 +22,58 @@ TOOL_TRIGGERS = [
 
 # Confidence thresholds
 MIN_INTENT_CONFIDENCE = 0.6
+
+# --------------------------------------------------
+# Fast-path intent classifier (reasoning_agent/classifier.py)
+# --------------------------------------------------
+# Whole-message small talk, answered without the reasoning LLM
+GREETING_MESSAGES = [
+    "hi",
+    "hello",
+    "hey",
+    "hi there",
+    "hello there",
+    "good morning",
+    "good afternoon",
+    "good evening",
+    "how are you",
+    "thanks",
+    "thank you",
+    "thanks a lot",
+    "ok",
+    "okay",
+    "cool",
+    "great",
+    "bye",
+    "goodbye",
+]
+
+# Intent -> triggers (built from MEMORY_TRIGGERS / TOOL_TRIGGERS).
+# information_request is the generic label: any other match overrides it.
+INTENT_TRIGGERS = {
+    "comparison_request": ["compare", "difference", "versus", "vs"],
+    "information_request": ["what is", "how", "explain", "find", "search"],
+    "learning_goal": ["my goal", "i am preparing", "i want to learn"],
+    "user_preference": ["i prefer", "from now on"],
+}
+
+# Triggers too generic to decide an intent alone ("how are you doing",
+# "what is your name"): a rule match made only of these scores below
+# FAST_INTENT_MIN_CONFIDENCE, so the local model / LLM decides
+GENERIC_INTENT_TRIGGERS = ["what is", "how"]
+
+# Below this confidence the reasoning LLM is called
+FAST_INTENT_MIN_CONFIDENCE = 0.8
+
+# --------------------------------------------------
+# Trigger matcher (digital_human/triggers.py)
+# Defaults: ROUTING_CONFIG_PATH overrides them at runtime (digital_human/routing.py)
+# --------------------------------------------------
+# memory_agent/extractor.py: memory key -> phrases the value follows
+MEMORY_EXTRACTION_TRIGGERS = {
+    "goal": ["goal is"],
+    "preference": ["prefer"],
+}
+
+# Whole-word matching: "how" no longer fires inside "show"
+TRIGGER_WORD_BOUNDARIES = True
@@ -1,7 +1,7 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from digital_human.service import run_digital_human_chat
+from digital_human.services import run_digital_human_chat
 
 
 def run_cli():
@@ -1,44 +1,267 @@
 # executors/tool_executor.py
 
-def execute_tool(tool_request: dict) -> dict:
+"""
+Tool execution engine.
+
+Tools are registered by name with their own limits:
+
+- timeout_seconds: deadline for one call, waiting for a slot included;
+  a tool that overruns it is dropped (no result), the turn goes on
+- max_concurrency: calls of that tool in flight at once (per event loop)
+- cache_ttl_seconds: successful results are cached by
+  (tool, normalized parameters) for this long; 0 disables caching
+
+Several tool_requests run concurrently through asyncio (aexecute_many /
+as_completed). execute_tool() is the synchronous wrapper used by the
+sync graph.
+
+Sync tool functions run in a dedicated thread pool, so an overrunning
+call is abandoned, never waited for (its thread finishes in the
+background). Executors stay deterministic: NO LLM, NO reasoning.
+"""
+import asyncio
+import copy
+import inspect
+import json
+import logging
+import os
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from digital_human.cache import TTLCache
+
+logger = logging.getLogger("tool_executor")
+
+TOOL_TIMEOUT_SECONDS = float(os.getenv("TOOL_TIMEOUT_SECONDS", "3"))
+TOOL_MAX_CONCURRENCY = int(os.getenv("TOOL_MAX_CONCURRENCY", "8"))
+TOOL_CACHE_TTL_SECONDS = float(os.getenv("TOOL_CACHE_TTL_SECONDS", "300"))
+TOOL_CACHE_MAX_SIZE = int(os.getenv("TOOL_CACHE_MAX_SIZE", "1000"))
+
+# Sync tools run here so an overrunning call can be abandoned
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="tool")
+
+
+class Tool:
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[Dict[str, Any]], Any],
+        timeout_seconds: float = TOOL_TIMEOUT_SECONDS,
+        max_concurrency: int = TOOL_MAX_CONCURRENCY,
+        cache_ttl_seconds: float = TOOL_CACHE_TTL_SECONDS,
+    ):
+        if timeout_seconds <= 0 or max_concurrency <= 0:
+            raise ValueError("timeout_seconds and max_concurrency must be positive")
+
+        self.name = name
+        self.fn = fn
+        self.timeout_seconds = timeout_seconds
+        self.max_concurrency = max_concurrency
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.is_async = inspect.iscoroutinefunction(fn)
+
+
+def normalize_parameters(parameters: Optional[Dict[str, Any]]) -> str:
     """
-    Tool Executor (Mock)
-    -------------------
-    Represents Team A execution layer.
-    Executes tool requests deterministically.
-    NO LLM, NO reasoning.
-    """
-
-    if not tool_request:
-        return {}
-
-    tool_name = tool_request.get("tool_name")
-    parameters = tool_request.get("parameters", {})
-
-    # -----------------------------
-    # Web Search (Mock)
-    # -----------------------------
-    if tool_name == "web_search":
-        query = parameters.get("query", "")
-
-        # Mocked response
-        return {
-            "documents": [
-                {
-                    "title": "Redis Persistence Overview",
-                    "content": (
-                        "Redis persistence allows data to be saved to disk using "
-                        "RDB snapshots and AOF logs."
-                    ),
-                    "source": "redis.io"
-                }
-            ],
-            "query_used": query
+    Canonical form of a tool's parameters for the result cache: keys
+    sorted, strings lowercased with whitespace collapsed, so
+    " Redis  persistence" and "redis persistence" share an entry.
+    """
+    def normalize(value):
+        if isinstance(value, str):
+            return " ".join(value.lower().split())
+        if isinstance(value, dict):
+            return {str(k): normalize(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [normalize(v) for v in value]
+        return value
+
+    return json.dumps(normalize(parameters or {}), sort_keys=True, default=str)
+
+
+class ToolExecutor:
+    def __init__(self, cache_size: int = TOOL_CACHE_MAX_SIZE, clock: Callable[[], float] = time.monotonic):
+        self.cache_size = cache_size
+        self._clock = clock
+        self._tools: Dict[str, Tool] = {}
+        # tool name -> TTLCache of normalized parameters -> result
+        self._caches: Dict[str, TTLCache] = {}
+        # asyncio.Semaphore is bound to its loop: one set per running loop
+        self._semaphores: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+        self.metrics = {
+            "calls": 0,
+            "cache_hits": 0,
+            "timeouts": 0,
+            "errors": 0,
         }
 
-    # -----------------------------
-    # Unknown tool
-    # -----------------------------
+    # --------------------------------------------------
+    # Registry
+    # --------------------------------------------------
+    def register(self, name: str, fn: Callable[[Dict[str, Any]], Any], **limits) -> Tool:
+        """
+        Registers (or replaces) `name`. `fn(parameters) -> dict` may be
+        sync or async; `limits` are Tool's keyword arguments.
+        """
+        tool = Tool(name, fn, **limits)
+        self._tools[name] = tool
+        self._caches[name] = TTLCache(max_size=self.cache_size, ttl_seconds=tool.cache_ttl_seconds, clock=self._clock)
+        for per_loop in self._semaphores.values():
+            per_loop.pop(name, None)
+        return tool
+
+    def unregister(self, name: str) -> None:
+        self._tools.pop(name, None)
+        self._caches.pop(name, None)
+
+    def get(self, name: str) -> Optional[Tool]:
+        return self._tools.get(name)
+
+    @property
+    def tools(self) -> List[str]:
+        return list(self._tools)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """
+        Drops cached results of `name`, or of every tool.
+        """
+        for tool_name, cache in self._caches.items():
+            if name is None or tool_name == name:
+                cache.clear()
+
+    # --------------------------------------------------
+    # Execution
+    # --------------------------------------------------
+    def _semaphore(self, tool: Tool) -> asyncio.Semaphore:
+        per_loop = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        if tool.name not in per_loop:
+            per_loop[tool.name] = asyncio.Semaphore(tool.max_concurrency)
+        return per_loop[tool.name]
+
+    async def _call(self, tool: Tool, parameters: Dict[str, Any]) -> Any:
+        async with self._semaphore(tool):
+            if tool.is_async:
+                return await tool.fn(parameters)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_executor, tool.fn, parameters)
+
+    async def aexecute(self, tool_request: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Runs one tool_request ({"tool_name", "parameters"}). Returns its
+        result, or None when the tool overran its deadline or failed.
+        Unknown tools return {"error": ...}.
+        """
+        if not tool_request:
+            return {}
+
+        tool_name = tool_request.get("tool_name")
+        parameters = tool_request.get("parameters") or {}
+
+        tool = self._tools.get(tool_name)
+        if tool is None:
+            return {"error": f"Unsupported tool: {tool_name}"}
+
+        cache = self._caches[tool_name] if tool.cache_ttl_seconds > 0 else None
+        key = normalize_parameters(parameters)
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                self.metrics["cache_hits"] += 1
+                return copy.deepcopy(cached)
+
+        self.metrics["calls"] += 1
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self._call(tool, parameters), timeout=tool.timeout_seconds)
+        except asyncio.TimeoutError:
+            self.metrics["timeouts"] += 1
+            logger.warning(f"⏱️ Tool dropped, over its {tool.timeout_seconds:.2f}s deadline | tool={tool_name}")
+            return None
+        except Exception as e:
+            self.metrics["errors"] += 1
+            logger.error(f"❌ Tool failed | tool={tool_name} | error={str(e)}", exc_info=True)
+            return None
+
+        logger.info(f"🔧 Tool executed | tool={tool_name} | ms={(time.perf_counter() - started) * 1000:.1f}")
+        if cache is not None and result is not None:
+            cache.set(key, copy.deepcopy(result))
+        return result
+
+    async def as_completed(self, tool_requests: List[Dict[str, Any]]) -> AsyncIterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Runs every request concurrently and yields (request, result) as
+        each one completes; dropped requests are skipped.
+        """
+        async def run(request):
+            return request, await self.aexecute(request)
+
+        for future in asyncio.as_completed([run(request) for request in tool_requests]):
+            request, result = await future
+            if result is not None:
+                yield request, result
+
+    async def aexecute_many(self, tool_requests: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        [(request, result), ...] in completion order. Takes as long as
+        the slowest tool's deadline at most.
+        """
+        return [item async for item in self.as_completed(tool_requests)]
+
+    def execute(self, tool_request: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Synchronous wrapper (call from a thread without a running loop).
+        A dropped tool yields {}.
+        """
+        return asyncio.run(self.aexecute(tool_request)) or {}
+
+
+# --------------------------------------------------
+# Built-in tools
+# --------------------------------------------------
+def web_search(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Web Search (Mock)
+    -----------------
+    Represents Team A execution layer.
+    """
+    query = parameters.get("query", "")
+
+    # Mocked response
     return {
-        "error": f"Unsupported tool: {tool_name}"
+        "documents": [
+            {
+                "title": "Redis Persistence Overview",
+                "content": (
+                    "Redis persistence allows data to be saved to disk using "
+                    "RDB snapshots and AOF logs."
+                ),
+                "source": "redis.io"
+            }
+        ],
+        "query_used": query
     }
+
+
+# Shared instance used by the graph
+tool_executor = ToolExecutor()
+tool_executor.register("web_search", web_search)
+
+
+def execute_tool(tool_request: dict) -> dict:
+    """
+    Tool Executor
+    -------------
+    Executes one tool request through the shared engine (cached, bounded
+    by the tool's deadline). NO LLM, NO reasoning.
+    """
+    return tool_executor.execute(tool_request)
+
+
+async def aexecute_tool(tool_request: dict) -> dict:
+    """
+    Async variant of execute_tool.
+    """
+    return await tool_executor.aexecute(tool_request) or {}
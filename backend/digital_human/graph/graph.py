@@ -1,3 +1,4 @@
+import inspect
 from langgraph.graph import StateGraph, END
 from digital_human.graph.state import AgentState
 
@@ -5,15 +6,17 @@ from digital_human.graph.state import AgentState
 # Agent imports (LangGraph-safe only)
 # --------------------
 from digital_human.agents.orchestrator import orchestrator_agent
-from digital_human.agents.reasoning_agent.agent import reasoning_agent
+from digital_human.agents.reasoning_agent.agent import reasoning_agent, areasoning_agent
 from digital_human.agents.memory_agent.agent import memory_agent
+from digital_human.agents.memory_agent.recall import memory_recall_agent, amemory_recall_agent
+from digital_human.agents.retrieval_agent.agent import retrieval_agent, aretrieval_agent
 from digital_human.agents.tool_agent.agent import tool_agent
-from digital_human.agents.responder_agent.agent import responder_node
+from digital_human.agents.responder_agent.agent import responder_node, aresponder_node
 
 # --------------------
 # Executors
 # --------------------
-from digital_human.executors.tool_executor import execute_tool
+from digital_human.executors.tool_executor import execute_tool, aexecute_tool
 
 
 # --------------------------------------------------
@@ -22,52 +25,157 @@ from digital_human.executors.tool_executor import execute_tool
 def tool_execution_node(state: AgentState) -> AgentState:
     """
     Executes tool requests decided by Tool Agent.
+    A tool over its deadline leaves tool_results empty.
     """
     if state.tool_request:
         state.tool_results = execute_tool(state.tool_request)
     return state
 
 
+async def atool_execution_node(state: AgentState) -> AgentState:
+    """
+    Async variant: runs on the graph's own loop.
+    """
+    if state.tool_request:
+        state.tool_results = await aexecute_tool(state.tool_request)
+    return state
+
+
+# --------------------------------------------------
+# Parallel branches
+# --------------------------------------------------
+# Each branch that runs in the same step writes ONLY the fields it owns,
+# so LangGraph can merge the updates without conflicting writes.
+REASONING_FIELDS = ("intent", "intent_confidence")
+MEMORY_FIELDS = ("memory_intent", "needs_memory")
+RETRIEVAL_FIELDS = ("tool_results", "rag_used")
+RECALL_FIELDS = ("retrieved_memories", "used_memory")
+
+
+def owned_fields(node, fields):
+    """
+    Wraps an agent so it works on a private copy of the state and
+    returns only `fields` as its update.
+    """
+    if inspect.iscoroutinefunction(node):
+        async def run(state: AgentState) -> dict:
+            result = await node(state.model_copy())
+            return {field: getattr(result, field) for field in fields}
+    else:
+        def run(state: AgentState) -> dict:
+            result = node(state.model_copy())
+            return {field: getattr(result, field) for field in fields}
+
+    run.__name__ = getattr(node, "__name__", "node")
+    return run
+
+
+def planning_join(state: AgentState) -> dict:
+    """
+    Fan-in point: runs once every parallel branch has finished.
+    """
+    return {}
+
+
+# --------------------------------------------------
+# Routing (honours the per-user feature flags)
+# --------------------------------------------------
+def route_fan_out(state: AgentState) -> list:
+    branches = ["reasoning"]
+    if state.feature_enabled("enable_memory"):
+        branches.append("memory")
+        if state.user_id is not None:
+            branches.append("recall")
+    if state.needs_tools and state.feature_enabled("enable_rag"):
+        branches.append("retrieval")
+    return branches
+
+
+def route_after_join(state: AgentState, after_planning: str) -> str:
+    # Documents from the user's own corpus replace the web tool
+    if state.rag_used:
+        return after_planning
+    if state.needs_tools and state.feature_enabled("enable_tool"):
+        return "tool_agent"
+    return after_planning
+
+
 # --------------------------------------------------
 # Build LangGraph
 # --------------------------------------------------
-def build_graph():
+def build_graph(include_responder: bool = True, async_nodes: bool = False):
+    """
+    Builds the Digital Human graph.
+
+        orchestrator -> (reasoning || memory || recall || retrieval) -> join
+                     -> tool_agent -> tool_executor -> responder
+
+    Reasoning, memory, recall and retrieval don't depend on each other,
+    so they run in the same step; the critical path is the slowest of them.
+    Retrieval is bounded by its own latency budget.
+
+    include_responder=False compiles a planning-only graph that stops
+    after tool execution, so the caller can make the single responder
+    call itself (streaming or blocking).
+
+    async_nodes=True wires the AsyncOpenAI-backed nodes; that graph must
+    be run with ainvoke.
+    """
     graph = StateGraph(AgentState)
+    after_planning = "responder" if include_responder else END
+    reasoning = areasoning_agent if async_nodes else reasoning_agent
 
     # -------- Nodes --------
     graph.add_node("orchestrator", orchestrator_agent)
-    graph.add_node("reasoning", reasoning_agent)
-    graph.add_node("memory", memory_agent)
+    graph.add_node("reasoning", owned_fields(reasoning, REASONING_FIELDS))
+    graph.add_node("memory", owned_fields(memory_agent, MEMORY_FIELDS))
+    graph.add_node(
+        "retrieval",
+        owned_fields(aretrieval_agent if async_nodes else retrieval_agent, RETRIEVAL_FIELDS),
+    )
+    graph.add_node(
+        "recall",
+        owned_fields(amemory_recall_agent if async_nodes else memory_recall_agent, RECALL_FIELDS),
+    )
+    graph.add_node("join", planning_join)
     graph.add_node("tool_agent", tool_agent)
-    graph.add_node("tool_executor", tool_execution_node)
-    graph.add_node("responder", responder_node)  # ⚠️ NON-streaming only
+    graph.add_node("tool_executor", atool_execution_node if async_nodes else tool_execution_node)
+    if include_responder:
+        graph.add_node("responder", aresponder_node if async_nodes else responder_node)  # ⚠️ NON-streaming only
 
     # -------- Entry --------
     graph.set_entry_point("orchestrator")
 
-    # -------- Core Flow --------
-    graph.add_edge("orchestrator", "reasoning")
-    graph.add_edge("reasoning", "memory")
+    # -------- Fan-out / fan-in --------
+    graph.add_conditional_edges("orchestrator", route_fan_out, ["reasoning", "memory", "recall", "retrieval"])
+    graph.add_edge("reasoning", "join")
+    graph.add_edge("memory", "join")
+    graph.add_edge("recall", "join")
+    graph.add_edge("retrieval", "join")
 
     # -------- Conditional Routing --------
     graph.add_conditional_edges(
-        "memory",
-        lambda state: "tool_agent" if state.needs_tools else "responder"
+        "join",
+        lambda state: route_after_join(state, after_planning),
+        ["tool_agent", after_planning],
     )
 
     graph.add_edge("tool_agent", "tool_executor")
-    graph.add_edge("tool_executor", "responder")
+    graph.add_edge("tool_executor", after_planning)
 
     # -------- End --------
-    graph.add_edge("responder", END)
+    if include_responder:
+        graph.add_edge("responder", END)
 
     return graph.compile()
 
 
 # --------------------------------------------------
-# Compiled graph (singleton)
+# Compiled graphs (singletons)
 # --------------------------------------------------
 digital_human_graph = build_graph()
+digital_human_planner = build_graph(include_responder=False)
+digital_human_async_planner = build_graph(include_responder=False, async_nodes=True)
 
 
 # --------------------------------------------------
@@ -82,3 +190,21 @@ def run_digital_human(state: AgentState):
     Streaming is handled OUTSIDE this function.
     """
     return digital_human_graph.invoke(state)
+
+
+def plan_digital_human(state: AgentState) -> AgentState:
+    """
+    Runs every stage EXCEPT the responder.
+
+    The returned AgentState carries intent, memory and tool results,
+    ready for exactly one responder call (responder_node or
+    responder_stream).
+    """
+    return AgentState(**digital_human_planner.invoke(state))
+
+
+async def aplan_digital_human(state: AgentState) -> AgentState:
+    """
+    Async variant of plan_digital_human.
+    """
+    return AgentState(**await digital_human_async_planner.ainvoke(state))
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 
 
 class AgentState(BaseModel):
@@ -7,10 +7,18 @@ class AgentState(BaseModel):
     # Request / Session
     # --------------------------------------------------
     request_id: str
+    user_id: Optional[int] = None
     user_input: str
     chat_history: List[Dict[str, str]]
     token_budget: int
 
+    # Rolling summary of messages that fell out of the history window
+    conversation_summary: Optional[str] = None
+
+    # Per-user feature flags (constants.get_user_config); missing flags
+    # count as enabled
+    user_config: Dict[str, Any] = {}
+
     # --------------------------------------------------
     # Orchestrator routing flags (MUST be bool, not Optional)
     # --------------------------------------------------
@@ -18,6 +26,12 @@ class AgentState(BaseModel):
     needs_memory: bool = False
     needs_tools: bool = False
 
+    # digital_human/triggers.py hits for user_input, matched once by the
+    # orchestrator: family -> [(phrase, start, end), ...]
+    trigger_hits: Optional[Dict[str, List[Tuple[str, int, int]]]] = None
+    # Version of the routing config (digital_human/routing.py) that routed this turn
+    routing_version: Optional[str] = None
+
     # --------------------------------------------------
     # Reasoning Agent output
     # --------------------------------------------------
@@ -36,6 +50,9 @@ class AgentState(BaseModel):
     tool_request: Optional[Dict[str, Any]] = None
     tool_results: Optional[Dict[str, Any]] = None
 
+    # True when tool_results came from the user's RAG corpus
+    rag_used: bool = False
+
     # --------------------------------------------------
     # Final response
     # --------------------------------------------------
@@ -46,3 +63,6 @@ class AgentState(BaseModel):
     # --------------------------------------------------
     used_tools: bool = False
     used_memory: bool = False
+
+    def feature_enabled(self, flag: str) -> bool:
+        return bool(self.user_config.get(flag, True))
@@ -0,0 +1,61 @@
+# digital_human/integrations.py
+
+"""
+Extension points the backend fills in at startup.
+
+digital_human never imports the backend (DB models, sessions); the
+backend registers plain callables here instead (see main.py).
+
+- retriever(user_id, query, k) -> [{"content", "metadata", "score"}, ...]
+- async_retriever: the same as a coroutine, preferred by the async graph
+  (its query embeddings are micro-batched with concurrent requests)
+- reranker(query, documents) -> documents, best first
+- memory_loader(user_id) -> [{"memory_type", "memory_content", "confidence_score"}, ...]
+"""
+from typing import Awaitable, Callable, List, Optional
+
+Retriever = Callable[[int, str, int], List[dict]]
+AsyncRetriever = Callable[[int, str, int], Awaitable[List[dict]]]
+Reranker = Callable[[str, List[dict]], List[dict]]
+MemoryLoader = Callable[[int], List[dict]]
+
+_retriever: Optional[Retriever] = None
+_async_retriever: Optional[AsyncRetriever] = None
+_reranker: Optional[Reranker] = None
+_memory_loader: Optional[MemoryLoader] = None
+
+
+def register_retriever(retriever: Optional[Retriever]) -> None:
+    global _retriever
+    _retriever = retriever
+
+
+def get_retriever() -> Optional[Retriever]:
+    return _retriever
+
+
+def register_async_retriever(retriever: Optional[AsyncRetriever]) -> None:
+    global _async_retriever
+    _async_retriever = retriever
+
+
+def get_async_retriever() -> Optional[AsyncRetriever]:
+    return _async_retriever
+
+
+def register_reranker(reranker: Optional[Reranker]) -> None:
+    global _reranker
+    _reranker = reranker
+
+
+def get_reranker() -> Optional[Reranker]:
+    return _reranker
+
+
+def register_memory_loader(loader: Optional[MemoryLoader]) -> None:
+    global _memory_loader
+    _memory_loader = loader
+
+
+def get_memory_loader() -> Optional[MemoryLoader]:
+    return _memory_loader
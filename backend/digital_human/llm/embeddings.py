@@ -0,0 +1,269 @@
+# digital_human/llm/embeddings.py
+
+"""
+Embedding layer shared by RAG and semantic memory.
+
+EmbeddingService wraps a batch embed function (openai_client.embed_texts
+by default) with:
+
+- content-hash dedup: key = sha256(model + text); a text is embedded once
+- a two-level cache: in-process LRU, then a persistent sqlite3 table, so
+  re-ingestion and repeated queries never re-embed. Both hold float32
+  arrays (6 KB per 1536-d vector, vs ~49 KB as a list of Python floats);
+  the public methods return plain lists
+- async micro-batching: concurrent aembed() calls that arrive within
+  batch_window_ms share one API call (and identical texts one slot)
+
+FakeEmbedder is a deterministic, offline embed function for tests.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from digital_human.cache import TTLCache
+from digital_human.llm.openai_client import EMBEDDING_MODEL, embed_texts
+
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "embedding_cache.sqlite3")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "10"))
+# In-process LRU entries (float32: ~60 MB per worker at 1536 dims)
+EMBEDDING_MEMORY_CACHE_SIZE = int(os.getenv("EMBEDDING_MEMORY_CACHE_SIZE", "10000"))
+
+# SQLite's default limit on bound parameters is 999
+_SQLITE_IN_CHUNK = 500
+
+
+def content_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def _as_array(vector: Sequence[float]) -> np.ndarray:
+    return np.asarray(vector, dtype=np.float32)
+
+
+class PersistentEmbeddingCache:
+    """
+    key -> float32 vector, in a local sqlite3 file. Opened on first use.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            conn = self._connection()
+            for i in range(0, len(keys), _SQLITE_IN_CHUNK):
+                chunk = keys[i:i + _SQLITE_IN_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, model: str, items: Dict[str, Sequence[float]]) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, vector) VALUES (?, ?, ?)",
+                [
+                    (key, model, _as_array(vector).tobytes())
+                    for key, vector in items.items()
+                ],
+            )
+            conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class EmbeddingService:
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        model: str = EMBEDDING_MODEL,
+        cache_path: Optional[str] = EMBEDDING_CACHE_PATH,
+        max_batch_size: int = EMBEDDING_BATCH_SIZE,
+        batch_window_ms: float = EMBEDDING_BATCH_WINDOW_MS,
+        memory_cache_size: int = EMBEDDING_MEMORY_CACHE_SIZE,
+    ):
+        self.embed_fn = embed_fn
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window_ms / 1000
+        self.memory = TTLCache(max_size=memory_cache_size, ttl_seconds=None)
+        self.disk = PersistentEmbeddingCache(cache_path) if cache_path else None
+
+        # Micro-batching state (lives on the running event loop)
+        self._pending: Dict[str, tuple] = {}
+        self._flush_handle = None
+        self._flush_tasks: set = set()
+
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "api_calls": 0}
+
+    # ---------------- sync ----------------
+    def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        """
+        Vectors in input order; each distinct uncached text is sent once,
+        in batches of max_batch_size.
+        """
+        keys = [content_key(self.model, t) for t in texts]
+        vectors = self._lookup_many(dict(zip(keys, texts)))
+
+        missing = {k: t for k, t in zip(keys, texts) if k not in vectors}
+        if missing:
+            vectors.update(self._embed_and_store(missing))
+
+        return [vectors[k].tolist() for k in keys]
+
+    def embed(self, text: str) -> List[float]:
+        return self.embed_many([text])[0]
+
+    def _lookup_many(self, items: Dict[str, str]) -> Dict[str, np.ndarray]:
+        found = {}
+        for key in items:
+            vector = self.memory.get(key)
+            if vector is not None:
+                found[key] = vector
+                self.stats["memory_hits"] += 1
+
+        remaining = [k for k in items if k not in found]
+        if remaining and self.disk is not None:
+            from_disk = self.disk.get_many(remaining)
+            for key, vector in from_disk.items():
+                self.memory.set(key, vector)
+            found.update(from_disk)
+            self.stats["disk_hits"] += len(from_disk)
+
+        self.stats["misses"] += len(items) - len(found)
+        return found
+
+    def _embed_and_store(self, items: Dict[str, str]) -> Dict[str, np.ndarray]:
+        keys, texts = list(items.keys()), list(items.values())
+        result = {}
+
+        for i in range(0, len(texts), self.max_batch_size):
+            batch_keys = keys[i:i + self.max_batch_size]
+            vectors = self.embed_fn(texts[i:i + self.max_batch_size])
+            self.stats["api_calls"] += 1
+            result.update(zip(batch_keys, (_as_array(v) for v in vectors)))
+
+        for key, vector in result.items():
+            self.memory.set(key, vector)
+        if self.disk is not None:
+            self.disk.put_many(self.model, result)
+        return result
+
+    # ---------------- async (micro-batched) ----------------
+    async def aembed(self, text: str) -> List[float]:
+        key = content_key(self.model, text)
+
+        vector = self.memory.get(key)
+        if vector is not None:
+            self.stats["memory_hits"] += 1
+            return vector.tolist()
+
+        loop = asyncio.get_running_loop()
+        entry = self._pending.get(key)
+        if entry is None:
+            future = loop.create_future()
+            self._pending[key] = (text, future)
+
+            if len(self._pending) >= self.max_batch_size:
+                self._start_flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_window, self._start_flush)
+        else:
+            future = entry[1]
+
+        # shield: one cancelled caller must not cancel the shared result
+        return (await asyncio.shield(future)).tolist()
+
+    async def aembed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        return list(await asyncio.gather(*(self.aembed(t) for t in texts)))
+
+    def _start_flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.ensure_future(self._flush(batch))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self, batch: Dict[str, tuple]) -> None:
+        texts = {key: text for key, (text, _) in batch.items()}
+        try:
+            # Cache lookups and the API call are blocking: off the loop
+            vectors = await asyncio.to_thread(self._resolve, texts)
+        except Exception as e:
+            for _, future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, (_, future) in batch.items():
+            if not future.done():
+                future.set_result(vectors[key])
+
+    def _resolve(self, items: Dict[str, str]) -> Dict[str, np.ndarray]:
+        vectors = self._lookup_many(items)
+        missing = {k: t for k, t in items.items() if k not in vectors}
+        if missing:
+            vectors.update(self._embed_and_store(missing))
+        return vectors
+
+
+# --------------------------------------------------
+# Offline fake
+# --------------------------------------------------
+class FakeEmbedder:
+    """
+    Deterministic embed function (hashed bag of words, L2-normalised):
+    texts sharing words get similar vectors. Records every call.
+    """
+
+    def __init__(self, dim: int = 1536):
+        self.dim = dim
+        self.calls: List[List[str]] = []
+
+    def __call__(self, texts: List[str]) -> List[List[float]]:
+        self.calls.append(list(texts))
+        return [self.vector(t) for t in texts]
+
+    def vector(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in re.findall(r"\w+", text.lower()):
+            digest = hashlib.md5(word.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dim
+            vector[index] += 1.0 if digest[4] % 2 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+
+embedding_service = EmbeddingService(embed_fn=embed_texts)
@@ -1,8 +1,11 @@
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 import os
 
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+# Async client: awaiting a completion does not pin a worker thread
+async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
 
 def chat_completion(messages, temperature=0.3):
     response = client.chat.completions.create(
@@ -11,3 +14,14 @@ def chat_completion(messages, temperature=0.3):
         temperature=temperature,
     )
     return response.choices[0].message.content
+
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+
+
+def embed_texts(texts, model=EMBEDDING_MODEL):
+    """
+    One embeddings call for a batch of texts; vectors come back in input order.
+    """
+    response = client.embeddings.create(model=model, input=list(texts))
+    return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
@@ -0,0 +1,44 @@
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+MODEL = "gpt-4o-mini"
+
+# Per-message framing overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(MODEL)
+    except Exception:
+        # Unknown model or encoding not downloadable (offline)
+        return None
+
+
+def count_tokens(text: str | None) -> int:
+    """
+    Token count of a message as billed by the chat model.
+    Falls back to ~4 characters per token without tiktoken.
+    """
+    text = text or ""
+    encoding = _encoding()
+
+    if encoding is not None:
+        return len(encoding.encode(text)) + MESSAGE_OVERHEAD_TOKENS
+
+    return (len(text) + 3) // 4 + MESSAGE_OVERHEAD_TOKENS
+
+
+def warm_tokenizer() -> bool:
+    """
+    Loads (and on first use downloads) the BPE file up front.
+    Blocking: call at startup, off the event loop.
+    """
+    return _encoding() is not None
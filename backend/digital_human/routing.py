@@ -0,0 +1,230 @@
+# digital_human/routing.py
+
+"""
+Hot-reloadable routing configuration.
+
+Triggers, confidence thresholds and the intent -> tool map default to the
+constants in config/settings.py and tool_agent/rules.py. Setting
+ROUTING_CONFIG_PATH to a JSON file overrides any of them without a
+redeploy (see config/routing.example.json):
+
+    {"version": "2024-w18", "tool_triggers": ["how", "explain"], "min_confidence_for_tool": 0.7}
+
+A reload parses, validates and compiles the new config completely, then
+replaces the active one with a single assignment: requests see either the
+old or the new config, never a mix, and a broken file keeps the old one.
+Reading the active config is one attribute lookup.
+
+Reloads come from RoutingConfigWatcher (polls the file's mtime, started
+in the backend lifespan) or from reload_routing() (the admin endpoint).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, PrivateAttr, field_validator
+
+from digital_human.config.settings import (
+    MEMORY_TRIGGERS,
+    TOOL_TRIGGERS,
+    INTENT_TRIGGERS,
+    GENERIC_INTENT_TRIGGERS,
+    MEMORY_EXTRACTION_TRIGGERS,
+    MIN_INTENT_CONFIDENCE,
+    TRIGGER_WORD_BOUNDARIES,
+)
+from digital_human.agents.tool_agent.rules import INTENT_TO_TOOL, MIN_CONFIDENCE_FOR_TOOL
+from digital_human.triggers import Hit, TriggerMatcher
+
+logger = logging.getLogger("routing")
+
+ROUTING_CONFIG_PATH = os.getenv("ROUTING_CONFIG_PATH")
+ROUTING_CONFIG_WATCH_INTERVAL_SECONDS = float(os.getenv("ROUTING_CONFIG_WATCH_INTERVAL_SECONDS", "5"))
+
+
+class RoutingConfig(BaseModel):
+    version: str = "builtin"
+
+    memory_triggers: List[str] = MEMORY_TRIGGERS
+    tool_triggers: List[str] = TOOL_TRIGGERS
+    intent_triggers: Dict[str, List[str]] = INTENT_TRIGGERS
+    generic_intent_triggers: List[str] = GENERIC_INTENT_TRIGGERS
+    memory_extraction_triggers: Dict[str, List[str]] = MEMORY_EXTRACTION_TRIGGERS
+    word_boundaries: bool = TRIGGER_WORD_BOUNDARIES
+
+    min_intent_confidence: float = MIN_INTENT_CONFIDENCE
+    min_confidence_for_tool: float = MIN_CONFIDENCE_FOR_TOOL
+    intent_to_tool: Dict[str, str] = INTENT_TO_TOOL
+
+    model_config = {"extra": "forbid", "frozen": True}
+
+    _matcher: TriggerMatcher = PrivateAttr()
+
+    @field_validator("min_intent_confidence", "min_confidence_for_tool")
+    @classmethod
+    def _probability(cls, value: float) -> float:
+        if not 0.0 <= value <= 1.0:
+            raise ValueError("must be between 0 and 1")
+        return value
+
+    def model_post_init(self, __context) -> None:
+        # Compiled once per config, never per request
+        self._matcher = TriggerMatcher(self.trigger_families(), word_boundaries=self.word_boundaries)
+
+    def trigger_families(self) -> Dict[str, List[str]]:
+        return {
+            "memory": self.memory_triggers,
+            "tool": self.tool_triggers,
+            **{f"memory_value:{key}": phrases for key, phrases in self.memory_extraction_triggers.items()},
+            **{f"intent:{intent}": phrases for intent, phrases in self.intent_triggers.items()},
+        }
+
+    @property
+    def matcher(self) -> TriggerMatcher:
+        return self._matcher
+
+
+def load_routing_config(path: str) -> RoutingConfig:
+    """
+    Parses and compiles `path`; keys it leaves out keep their defaults.
+    Without a "version" key the version is a hash of the file.
+    Raises (OSError, ValueError) on unreadable or invalid files.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    data = json.loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a JSON object")
+    data.setdefault("version", hashlib.sha256(raw).hexdigest()[:12])
+    return RoutingConfig(**data)
+
+
+_active = RoutingConfig()
+
+
+def get_routing() -> RoutingConfig:
+    return _active
+
+
+def configure_routing(config: RoutingConfig) -> None:
+    """
+    Atomic swap (tests, or a config built elsewhere).
+    """
+    global _active
+    _active = config
+
+
+def reload_routing(path: Optional[str] = None) -> RoutingConfig:
+    """
+    Loads `path` (default ROUTING_CONFIG_PATH; the built-in defaults
+    when neither is set) and swaps it in. On error the active config
+    stays and the exception propagates.
+    """
+    path = path or ROUTING_CONFIG_PATH
+    config = load_routing_config(path) if path else RoutingConfig()
+    configure_routing(config)
+    logger.info(f"🔀 Routing config loaded | version={config.version} | path={path}")
+    return config
+
+
+# --------------------------------------------------
+# Per-request matching (the active config's compiled matcher)
+# --------------------------------------------------
+def match_triggers(text: str) -> Dict[str, List[Hit]]:
+    return _active.matcher.match(text)
+
+
+def match_state(state) -> Dict[str, List[Hit]]:
+    """
+    The trigger hits for state.user_input, computed on first use and
+    cached on the state together with the config version that produced
+    them.
+    """
+    if state.trigger_hits is None:
+        config = _active
+        state.trigger_hits = config.matcher.match(state.user_input)
+        state.routing_version = config.version
+    return state.trigger_hits
+
+
+# --------------------------------------------------
+# File watcher
+# --------------------------------------------------
+class RoutingConfigWatcher:
+    """
+    Polls the config file's mtime and reloads on change. Polling (one
+    stat() per interval) needs no extra dependency and works on every
+    filesystem, including mounted ConfigMaps.
+    """
+
+    def __init__(self, path: Optional[str] = ROUTING_CONFIG_PATH, interval_seconds: float = ROUTING_CONFIG_WATCH_INTERVAL_SECONDS):
+        self.path = path
+        self.interval_seconds = interval_seconds
+        self._mtime: Optional[float] = None
+        self._task: asyncio.Task | None = None
+
+        self.metrics = {
+            "reloads": 0,
+            "errors": 0,
+            "last_error": None,
+        }
+
+    def check(self) -> bool:
+        """
+        Reloads when the file changed since the last check. Returns True
+        when a new config was swapped in.
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError as e:
+            self._record_error(e)
+            return False
+
+        if mtime == self._mtime:
+            return False
+
+        try:
+            reload_routing(self.path)
+        except Exception as e:
+            self._record_error(e)
+            return False
+        finally:
+            # A broken file is not retried until it changes again
+            self._mtime = mtime
+
+        self.metrics["reloads"] += 1
+        return True
+
+    def _record_error(self, error: Exception) -> None:
+        self.metrics["errors"] += 1
+        self.metrics["last_error"] = str(error)
+        logger.error(f"❌ Routing config reload failed | path={self.path} | error={str(error)}")
+
+    async def run_forever(self):
+        while True:
+            await asyncio.to_thread(self.check)
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> Optional[asyncio.Task]:
+        if not self.path or self.interval_seconds <= 0:
+            return None
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_forever())
+        return self._task
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+routing_watcher = RoutingConfigWatcher()
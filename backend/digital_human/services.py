@@ -1,34 +1,106 @@
 import uuid
 from digital_human.graph.state import AgentState
-from digital_human.graph.graph import run_digital_human
-from digital_human.agents.responder_agent.agent import responder_stream
+from digital_human.graph.graph import plan_digital_human, aplan_digital_human
+from digital_human.agents.responder_agent.agent import (
+    responder_node,
+    responder_stream,
+    aresponder_node,
+    aresponder_stream,
+)
 
 
 def run_digital_human_chat(
     user_input: str,
     chat_history: list | None = None,
     token_budget: int = 4000,
+    stream: bool = False,
+    conversation_summary: str | None = None,
+    user_config: dict | None = None,
+    user_id: int | None = None,
 ):
+    """
+    Plans the turn with LangGraph, then makes exactly ONE responder call.
+
+    stream=False -> "response" holds the full answer (blocking call)
+    stream=True  -> "stream" is a token generator; the caller consumes it
+
+    user_config carries the per-user feature flags; the graph skips the
+    memory / tool stages that are switched off.
+    """
+    state = _initial_state(
+        user_input, chat_history, token_budget, conversation_summary, user_config, user_id
+    )
+
+    # Run LangGraph (planning only, responder excluded)
+    state = plan_digital_human(state)
+
+    result = _result(state)
+
+    if stream:
+        result["stream"] = responder_stream(state)
+        return result
+
+    state = responder_node(state)
+    result["response"] = state.final_response
+    return result
+
+
+async def arun_digital_human_chat(
+    user_input: str,
+    chat_history: list | None = None,
+    token_budget: int = 4000,
+    stream: bool = False,
+    conversation_summary: str | None = None,
+    user_config: dict | None = None,
+    user_id: int | None = None,
+):
+    """
+    Async variant of run_digital_human_chat (AsyncOpenAI + ainvoke).
+
+    stream=True -> "stream" is an async token generator
+    """
+    state = _initial_state(
+        user_input, chat_history, token_budget, conversation_summary, user_config, user_id
+    )
+
+    state = await aplan_digital_human(state)
+
+    result = _result(state)
+
+    if stream:
+        result["stream"] = aresponder_stream(state)
+        return result
+
+    state = await aresponder_node(state)
+    result["response"] = state.final_response
+    return result
+
+
+def _initial_state(
+    user_input: str,
+    chat_history: list | None,
+    token_budget: int,
+    conversation_summary: str | None = None,
+    user_config: dict | None = None,
+    user_id: int | None = None,
+) -> AgentState:
     if chat_history is None:
         chat_history = []
 
-    state = AgentState(
+    return AgentState(
         request_id=str(uuid.uuid4()),
+        user_id=user_id,
         user_input=user_input,
         chat_history=chat_history,
         token_budget=token_budget,
+        conversation_summary=conversation_summary,
+        user_config=user_config or {},
     )
 
-    # Run LangGraph
-    run_digital_human(state)
-
-    # Collect streamed response
-    response_text = ""
-    for token in responder_stream(state):
-        response_text += token
 
+def _result(state: AgentState) -> dict:
     return {
-        "response": response_text,
         "memory_intent": state.memory_intent,
-        "rag_used": getattr(state, "rag_used", False),
+        "rag_used": state.rag_used,
+        "routing_version": state.routing_version,
     }
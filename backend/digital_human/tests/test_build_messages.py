@@ -0,0 +1,49 @@
+from digital_human.graph.state import AgentState
+from digital_human.agents.responder_agent.agent import build_messages
+
+
+def test_summary_and_history_precede_user_message():
+    state = AgentState(
+        request_id="1",
+        user_input="And what about AOF?",
+        chat_history=[
+            {"role": "user", "content": "Explain Redis persistence"},
+            {"role": "assistant", "content": "Redis uses RDB snapshots."},
+        ],
+        token_budget=4000,
+        conversation_summary="The user is preparing for Redis interviews.",
+    )
+
+    messages = build_messages(state)
+
+    assert {
+        "role": "system",
+        "content": "Summary of the earlier conversation: The user is preparing for Redis interviews.",
+    } in messages
+    assert messages[-3:] == [
+        {"role": "user", "content": "Explain Redis persistence"},
+        {"role": "assistant", "content": "Redis uses RDB snapshots."},
+        {"role": "user", "content": "And what about AOF?"},
+    ]
+
+
+def test_no_summary_message_without_summary():
+    state = AgentState(request_id="1", user_input="hi", chat_history=[], token_budget=4000)
+
+    assert not any("Summary of the earlier" in m["content"] for m in build_messages(state))
+
+
+def test_token_budget_drops_oldest_history_first():
+    history = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"turn {i} " + "word " * 100}
+        for i in range(6)
+    ]
+    full = AgentState(request_id="1", user_input="next", chat_history=history, token_budget=100_000)
+    tight = AgentState(request_id="1", user_input="next", chat_history=history, token_budget=600)
+
+    full_history = [m for m in build_messages(full) if m["role"] != "system"][:-1]
+    tight_history = [m for m in build_messages(tight) if m["role"] != "system"][:-1]
+
+    assert len(full_history) == 6
+    assert 0 < len(tight_history) < 6
+    assert tight_history == full_history[-len(tight_history):]
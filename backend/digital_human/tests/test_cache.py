@@ -0,0 +1,123 @@
+import asyncio
+import threading
+
+import pytest
+
+from digital_human.cache import TTLCache, InMemoryBackend, RedisBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = TTLCache(max_size=2, ttl_seconds=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")          # a is now most recent
+    cache.set("c", 3)       # evicts b
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+    assert cache.stats["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(max_size=10, ttl_seconds=5, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 4.9
+    assert cache.get("a") == 1
+
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert cache.stats["expirations"] == 1
+    assert len(cache) == 0
+
+
+def test_per_entry_ttl_overrides_default():
+    clock = FakeClock()
+    cache = TTLCache(max_size=10, ttl_seconds=100, clock=clock)
+    cache.set("short", 1, ttl_seconds=1)
+
+    clock.now = 2
+    assert "short" not in cache
+
+
+def test_delete_and_stats():
+    backend = InMemoryBackend(max_size=10)
+    backend.set("k", {"v": 1})
+
+    assert backend.get("k") == {"v": 1}
+    backend.delete("k")
+    assert backend.get("k") is None
+    assert backend.stats["hits"] == 1
+    assert backend.stats["misses"] == 1
+
+
+def test_max_size_must_be_positive():
+    with pytest.raises(ValueError):
+        TTLCache(max_size=0)
+
+
+class FakeRedisClient:
+    """
+    Records the thread of every round trip.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.get_ident())
+        return self.data.get(key)
+
+    def set(self, key, value, px=None):
+        self.threads.append(threading.get_ident())
+        self.data[key] = value
+
+    def delete(self, key):
+        self.threads.append(threading.get_ident())
+        self.data.pop(key, None)
+
+
+def test_redis_backend_async_calls_stay_off_the_event_loop():
+    # Built without __init__: the `redis` package is optional
+    backend = RedisBackend.__new__(RedisBackend)
+    backend.client = FakeRedisClient()
+    backend.prefix = "test"
+    backend.ttl_seconds = 60
+    backend.stats = {"hits": 0, "misses": 0}
+
+    async def round_trips():
+        await backend.aset("k", {"v": 1})
+        value = await backend.aget("k")
+        await backend.adelete("k")
+        return threading.get_ident(), value
+
+    loop_thread, value = asyncio.run(round_trips())
+
+    assert value == {"v": 1}
+    assert "test:k" not in backend.client.data
+    assert len(backend.client.threads) == 3
+    assert loop_thread not in backend.client.threads
+
+
+def test_in_memory_backend_async_methods():
+    backend = InMemoryBackend()
+
+    async def round_trips():
+        await backend.aset("k", 1)
+        first = await backend.aget("k")
+        await backend.adelete("k")
+        return first, await backend.aget("k")
+
+    assert asyncio.run(round_trips()) == (1, None)
@@ -0,0 +1,104 @@
+import asyncio
+
+import numpy as np
+
+from digital_human.llm.embeddings import EmbeddingService, FakeEmbedder, content_key
+
+
+def _service(tmp_path, embedder, **kwargs):
+    return EmbeddingService(embed_fn=embedder, cache_path=str(tmp_path / "emb.sqlite3"), **kwargs)
+
+
+def test_content_hash_includes_model():
+    assert content_key("a", "redis") != content_key("b", "redis")
+    assert content_key("a", "redis") == content_key("a", "redis")
+
+
+def test_duplicates_are_embedded_once(tmp_path):
+    embedder = FakeEmbedder(dim=8)
+    service = _service(tmp_path, embedder)
+
+    vectors = service.embed_many(["redis", "kafka", "redis"])
+    service.embed("kafka")
+
+    assert embedder.calls == [["redis", "kafka"]]
+    assert vectors[0] == vectors[2]
+
+
+def test_memory_cache_holds_float32_arrays(tmp_path):
+    service = _service(tmp_path, FakeEmbedder(dim=1536))
+
+    vector = service.embed("redis")
+    cached = service.memory.get(content_key(service.model, "redis"))
+
+    assert isinstance(vector, list) and isinstance(vector[0], float)
+    assert cached.dtype == np.float32 and cached.nbytes == 1536 * 4
+    assert asyncio.run(service.aembed("redis")) == vector
+
+
+def test_vectors_persist_across_processes(tmp_path):
+    first = FakeEmbedder(dim=8)
+    _service(tmp_path, first).embed_many(["redis persistence", "kafka"])
+
+    second = FakeEmbedder(dim=8)
+    restarted = _service(tmp_path, second)
+    vectors = restarted.embed_many(["redis persistence", "kafka", "postgres"])
+
+    assert second.calls == [["postgres"]]
+    assert restarted.stats["disk_hits"] == 2
+    assert np.allclose(vectors[0], first.vector("redis persistence"))
+
+
+def test_large_inputs_are_split_into_api_batches(tmp_path):
+    embedder = FakeEmbedder(dim=8)
+    _service(tmp_path, embedder, max_batch_size=3).embed_many([f"t{i}" for i in range(7)])
+
+    assert [len(c) for c in embedder.calls] == [3, 3, 1]
+
+
+def test_concurrent_requests_share_one_call(tmp_path):
+    embedder = FakeEmbedder(dim=8)
+    service = _service(tmp_path, embedder, batch_window_ms=20)
+
+    async def main():
+        return await asyncio.gather(
+            service.aembed("redis"),
+            service.aembed("kafka"),
+            service.aembed("redis"),
+            service.aembed("postgres"),
+        )
+
+    vectors = asyncio.run(main())
+
+    assert len(embedder.calls) == 1
+    assert sorted(embedder.calls[0]) == ["kafka", "postgres", "redis"]
+    assert vectors[0] == vectors[2]
+
+
+def test_full_batch_flushes_without_waiting(tmp_path):
+    embedder = FakeEmbedder(dim=8)
+    service = _service(tmp_path, embedder, max_batch_size=2, batch_window_ms=10_000)
+
+    async def main():
+        return await asyncio.wait_for(service.aembed_many(["a", "b"]), timeout=2)
+
+    assert len(asyncio.run(main())) == 2
+
+
+def test_api_errors_reach_every_waiter(tmp_path):
+    def failing(texts):
+        raise RuntimeError("rate limited")
+
+    service = _service(tmp_path, failing)
+
+    async def main():
+        return await asyncio.gather(service.aembed("a"), service.aembed("b"), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(main()))
+
+
+def test_fake_embedder_is_similarity_preserving():
+    embedder = FakeEmbedder()
+    a, b, c = (np.array(embedder.vector(t)) for t in ("redis persistence", "redis persistence aof", "kafka"))
+
+    assert a @ b > a @ c
@@ -0,0 +1,48 @@
+from digital_human.services import run_digital_human_chat
+
+
+def _responder_text(fake_openai, index=0):
+    messages = fake_openai.responder_calls()[index]["messages"]
+    return " ".join(m["content"] for m in messages)
+
+
+def test_all_features_enabled_by_default(fake_openai):
+    result = run_digital_human_chat("Remember my goal is to learn Redis")
+    assert result["memory_intent"] is not None
+
+    run_digital_human_chat("Explain Redis persistence")
+    assert "Redis Persistence Overview" in _responder_text(fake_openai, -1)
+    assert "max_tokens" not in fake_openai.responder_calls()[-1]
+
+
+def test_disabled_memory_skips_memory_node(fake_openai):
+    result = run_digital_human_chat(
+        "Remember my goal is to learn Redis",
+        user_config={"enable_memory": False},
+    )
+
+    assert result["memory_intent"] is None
+
+
+def test_disabled_memory_keeps_tool_routing(fake_openai):
+    run_digital_human_chat(
+        "Explain Redis persistence",
+        user_config={"enable_memory": False},
+    )
+
+    assert "Redis Persistence Overview" in _responder_text(fake_openai)
+
+
+def test_disabled_tools_skip_tool_execution(fake_openai):
+    run_digital_human_chat(
+        "Explain Redis persistence",
+        user_config={"enable_tool": False},
+    )
+
+    assert "Redis Persistence Overview" not in _responder_text(fake_openai)
+
+
+def test_max_tokens_caps_responder(fake_openai):
+    run_digital_human_chat("hello", user_config={"max_tokens": 256})
+
+    assert fake_openai.responder_calls()[0]["max_tokens"] == 256
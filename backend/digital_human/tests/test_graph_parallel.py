@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+from digital_human.graph import graph as graph_module
+from digital_human.graph.state import AgentState
+
+LATENCY = {"reasoning": 0.2, "memory": 0.2}
+SEQUENTIAL_PATH = sum(LATENCY.values())
+
+
+def _state(**kwargs):
+    return AgentState(
+        request_id="1",
+        user_input="Remember my goal is Redis",
+        chat_history=[],
+        token_budget=4000,
+        **kwargs,
+    )
+
+
+def _stub_nodes(monkeypatch, calls):
+    def reasoning(state):
+        calls.append("reasoning")
+        time.sleep(LATENCY["reasoning"])
+        state.intent = {"type": "learning_goal", "topic": "redis"}
+        state.intent_confidence = 0.9
+        return state
+
+    async def areasoning(state):
+        calls.append("reasoning")
+        await asyncio.sleep(LATENCY["reasoning"])
+        state.intent = {"type": "learning_goal", "topic": "redis"}
+        state.intent_confidence = 0.9
+        return state
+
+    def memory(state):
+        calls.append("memory")
+        time.sleep(LATENCY["memory"])
+        state.memory_intent = {"action": "save", "key": "goal", "value": "redis"}
+        state.needs_memory = True
+        # Fields a branch doesn't own are never merged back
+        state.intent = {"type": "clobbered"}
+        return state
+
+    def tool(state):
+        calls.append("tool_agent")
+        return state
+
+    monkeypatch.setattr(graph_module, "reasoning_agent", reasoning)
+    monkeypatch.setattr(graph_module, "areasoning_agent", areasoning)
+    monkeypatch.setattr(graph_module, "memory_agent", memory)
+    monkeypatch.setattr(graph_module, "tool_agent", tool)
+
+
+def test_parallel_branches_merge_and_shorten_critical_path(monkeypatch):
+    calls = []
+    _stub_nodes(monkeypatch, calls)
+    planner = graph_module.build_graph(include_responder=False)
+    planner.invoke(_state())  # warm up the executor pool
+
+    start = time.perf_counter()
+    state = AgentState(**planner.invoke(_state()))
+    elapsed = time.perf_counter() - start
+
+    print(f"\nsequential critical path {SEQUENTIAL_PATH:.2f}s, parallel {elapsed:.2f}s")
+    assert elapsed < SEQUENTIAL_PATH * 0.8
+    assert state.intent == {"type": "learning_goal", "topic": "redis"}
+    assert state.memory_intent["key"] == "goal"
+    assert sorted(calls) == ["memory", "memory", "reasoning", "reasoning"]
+
+
+def test_async_graph_runs_branches_concurrently(monkeypatch):
+    calls = []
+    _stub_nodes(monkeypatch, calls)
+    planner = graph_module.build_graph(include_responder=False, async_nodes=True)
+
+    start = time.perf_counter()
+    state = AgentState(**asyncio.run(planner.ainvoke(_state())))
+    elapsed = time.perf_counter() - start
+
+    print(f"\nsequential critical path {SEQUENTIAL_PATH:.2f}s, async parallel {elapsed:.2f}s")
+    assert elapsed < SEQUENTIAL_PATH * 0.8
+    assert state.intent["type"] == "learning_goal"
+    assert state.memory_intent["key"] == "goal"
+
+
+def test_join_runs_tool_agent_once(monkeypatch):
+    calls = []
+    _stub_nodes(monkeypatch, calls)
+    planner = graph_module.build_graph(include_responder=False)
+
+    planner.invoke(AgentState(
+        request_id="1",
+        user_input="Explain Redis persistence",
+        chat_history=[],
+        token_budget=4000,
+    ))
+
+    assert sorted(calls) == ["memory", "reasoning", "tool_agent"]
+
+
+def test_disabled_memory_branch_still_reaches_tools(monkeypatch):
+    calls = []
+    _stub_nodes(monkeypatch, calls)
+    planner = graph_module.build_graph(include_responder=False)
+
+    planner.invoke(AgentState(
+        request_id="1",
+        user_input="Explain Redis persistence",
+        chat_history=[],
+        token_budget=4000,
+        user_config={"enable_memory": False},
+    ))
+
+    assert calls == ["reasoning", "tool_agent"]
@@ -0,0 +1,53 @@
+import asyncio
+
+from digital_human.cache import InMemoryBackend
+from digital_human.graph.state import AgentState
+from digital_human.agents.reasoning_agent import cache as cache_module
+from digital_human.agents.reasoning_agent.agent import reasoning_agent, areasoning_agent
+from digital_human.agents.reasoning_agent.cache import configure_intent_cache, normalize_input
+
+
+def _state(text):
+    return AgentState(request_id="1", user_input=text, chat_history=[], token_budget=4000)
+
+
+def test_normalization_folds_case_whitespace_and_punctuation():
+    assert normalize_input("  Redis   CLUSTER resharding?! ") == "redis cluster resharding"
+
+
+def test_repeated_input_skips_the_llm(fake_openai):
+    first = reasoning_agent(_state("Redis cluster resharding"))
+    second = reasoning_agent(_state("redis  cluster, resharding?"))
+
+    assert len(fake_openai.calls) == 1
+    assert second.intent == first.intent
+    assert second.intent_confidence == 0.9
+    assert cache_module.intent_cache.stats["hits"] == 1
+
+
+def test_async_agent_shares_the_cache(fake_openai):
+    reasoning_agent(_state("Redis cluster resharding"))
+    state = asyncio.run(areasoning_agent(_state("Redis cluster resharding")))
+
+    assert state.intent["type"] == "information_request"
+    assert len(fake_openai.calls) == 1
+
+
+def test_unparseable_output_is_not_cached(fake_openai):
+    fake_openai.reasoning = "not json"
+
+    reasoning_agent(_state("Redis cluster resharding"))
+    reasoning_agent(_state("Redis cluster resharding"))
+
+    assert len(fake_openai.calls) == 2
+
+
+def test_entries_expire(fake_openai):
+    now = [0.0]
+    configure_intent_cache(InMemoryBackend(ttl_seconds=60, clock=lambda: now[0]))
+
+    reasoning_agent(_state("Redis cluster resharding"))
+    now[0] = 61
+    reasoning_agent(_state("Redis cluster resharding"))
+
+    assert len(fake_openai.calls) == 2
@@ -0,0 +1,100 @@
+import json
+import os
+
+from digital_human.graph.state import AgentState
+from digital_human.agents.reasoning_agent import agent as reasoning_module
+from digital_human.agents.reasoning_agent import classifier
+from digital_human.agents.reasoning_agent.classifier import (
+    NaiveBayesIntentModel,
+    TieredIntentClassifier,
+    evaluate,
+    load_examples,
+    rule_classify,
+)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "intents.jsonl")
+
+# Paraphrases that no rule matches, labelled by the LLM
+HELD_OUT = [
+    ("please always keep answers brief", "user_preference"),
+    ("tell me a funny joke", "general_chat"),
+    ("I am studying for a Kafka interview", "learning_goal"),
+    ("which is better, Kafka or Pulsar", "comparison_request"),
+    ("use simple words with me", "user_preference"),
+]
+
+
+def _state(text):
+    return AgentState(request_id="1", user_input=text, chat_history=[], token_budget=4000)
+
+
+def test_rules_cover_greetings_and_unambiguous_triggers():
+    assert rule_classify("Thanks!")["type"] == "general_chat"
+    assert rule_classify("Compare Redis and Memcached")["type"] == "comparison_request"
+    assert rule_classify("Explain Redis persistence")["topic"] == "redis persistence"
+    # Conflicting families are left to the next stage
+    assert rule_classify("Remember I prefer to explain how Redis works, my goal") is None
+
+
+def test_generic_triggers_alone_fall_through_to_the_llm():
+    fast_path = TieredIntentClassifier()
+    for text in ("how are you doing today?", "how was your weekend", "what is your name?"):
+        assert rule_classify(text)["confidence"] < fast_path.threshold
+        assert fast_path.classify(text) is None
+
+    # A specific trigger next to a generic one still decides
+    assert fast_path.classify("how do I compare Redis and Memcached")["type"] == "comparison_request"
+
+
+def test_rules_hit_rate_and_accuracy_against_llm_labels():
+    report = evaluate(TieredIntentClassifier(), load_examples(FIXTURE))
+
+    # Generic "how" / "what is" questions are left to the LLM
+    assert report["hit_rate"] >= 0.55
+    assert report["accuracy"] == 1.0
+
+
+def test_local_model_answers_what_rules_miss():
+    model = NaiveBayesIntentModel().fit(load_examples(FIXTURE))
+    rules_only = evaluate(TieredIntentClassifier(), HELD_OUT)
+    tiered = evaluate(TieredIntentClassifier(model=model), HELD_OUT)
+
+    assert rules_only["hits"] == 0
+    assert tiered["hit_rate"] >= 0.8
+    assert tiered["accuracy"] == 1.0
+
+
+def test_model_round_trips_through_json(tmp_path):
+    model = NaiveBayesIntentModel().fit(load_examples(FIXTURE))
+    path = tmp_path / "model.json"
+    model.save(str(path))
+
+    assert NaiveBayesIntentModel.load(str(path)).predict("tell me a funny joke") == model.predict(
+        "tell me a funny joke"
+    )
+
+
+def test_chit_chat_with_generic_trigger_is_not_routed_to_a_tool(fake_openai):
+    fake_openai.reasoning = {"intent_type": "general_chat", "topic": None, "confidence": 0.9}
+    state = reasoning_module.reasoning_agent(_state("how are you doing today?"))
+
+    assert len(fake_openai.calls) == 1
+    assert state.intent["type"] == "general_chat"
+
+
+def test_confident_fast_path_skips_the_llm(fake_openai):
+    state = reasoning_module.reasoning_agent(_state("hi"))
+
+    assert state.intent["type"] == "general_chat"
+    assert fake_openai.calls == []
+
+
+def test_low_confidence_falls_back_to_llm_and_logs_label(fake_openai, monkeypatch, tmp_path):
+    log = tmp_path / "intents.jsonl"
+    monkeypatch.setattr(classifier, "INTENT_LOG_PATH", str(log))
+
+    state = reasoning_module.reasoning_agent(_state("Redis cluster resharding"))
+
+    assert len(fake_openai.calls) == 1
+    assert state.intent["type"] == "information_request"
+    assert json.loads(log.read_text())["text"] == "Redis cluster resharding"
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from digital_human import integrations
+from digital_human.agents.memory_agent import recall
+from digital_human.agents.memory_agent.recall import rank_memories
+from digital_human.services import run_digital_human_chat, arun_digital_human_chat
+
+MEMORIES = [
+    {"memory_type": "goal", "memory_content": "pass the AWS solutions architect exam", "confidence_score": 0.9},
+    {"memory_type": "preference", "memory_content": "short answers with code samples", "confidence_score": 0.85},
+    {"memory_type": "pet", "memory_content": "a cat named Miso", "confidence_score": 0.6},
+]
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    calls = []
+
+    def fake(user_id):
+        calls.append(user_id)
+        return list(MEMORIES)
+
+    monkeypatch.setattr(integrations, "_memory_loader", fake)
+    return calls
+
+
+def _responder_text(fake_openai):
+    return " ".join(m["content"] for m in fake_openai.responder_calls()[0]["messages"])
+
+
+def test_rank_prefers_overlap_then_confidence():
+    ranked = rank_memories("what should I study for my AWS exam goal", MEMORIES)
+
+    assert [m["type"] for m in ranked] == ["goal"]
+    assert rank_memories("tell me about cats", MEMORIES) == []
+
+    tied = [
+        {"memory_type": "note", "memory_content": "likes kafka", "confidence_score": 0.3},
+        {"memory_type": "note", "memory_content": "uses kafka", "confidence_score": 0.9},
+    ]
+    assert [m["content"] for m in rank_memories("kafka", tied)] == ["uses kafka", "likes kafka"]
+
+
+def test_top_k_and_token_cap(monkeypatch):
+    many = [
+        {"memory_type": "note", "memory_content": f"kafka fact {i} " + "word " * 40, "confidence_score": 0.9}
+        for i in range(10)
+    ]
+    assert len(rank_memories("kafka", many, k=3)) == 3
+
+    monkeypatch.setattr(integrations, "_memory_loader", lambda user_id: many)
+    monkeypatch.setattr(recall, "MEMORY_MAX_CONTEXT_TOKENS", 100)
+    state = recall.memory_recall_agent(
+        recall.AgentState(request_id="r", user_id=1, user_input="kafka", chat_history=[], token_budget=4000)
+    )
+
+    assert 1 <= len(state.retrieved_memories) < recall.MEMORY_TOP_K
+    assert state.used_memory is True
+
+
+def test_graph_injects_relevant_memories(fake_openai, loader):
+    run_digital_human_chat("Plan my week around the AWS exam goal", user_id=7)
+
+    assert loader == [7]
+    text = _responder_text(fake_openai)
+    assert "- goal: pass the AWS solutions architect exam" in text
+    assert "Miso" not in text
+
+
+def test_async_graph_recalls_too(fake_openai, loader):
+    asyncio.run(arun_digital_human_chat("Plan my week around the AWS exam goal", user_id=7))
+
+    assert "pass the AWS solutions architect exam" in _responder_text(fake_openai)
+
+
+def test_gated_by_enable_memory_and_user(fake_openai, loader):
+    run_digital_human_chat("AWS exam goal", user_id=7, user_config={"enable_memory": False})
+    run_digital_human_chat("AWS exam goal")
+
+    assert loader == []
+
+
+def test_loader_failure_does_not_block_the_answer(fake_openai, monkeypatch):
+    def broken(user_id):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(integrations, "_memory_loader", broken)
+
+    result = run_digital_human_chat("AWS exam goal", user_id=7)
+
+    assert result["response"] == "stub answer"
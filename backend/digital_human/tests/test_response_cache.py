@@ -0,0 +1,130 @@
+import asyncio
+
+from digital_human.cache import InMemoryBackend
+from digital_human.graph.state import AgentState
+from digital_human.agents.responder_agent import cache as cache_module
+from digital_human.agents.responder_agent.agent import (
+    responder_node,
+    responder_stream,
+    aresponder_node,
+)
+from digital_human.agents.responder_agent.cache import ResponseCache
+from digital_human.llm.embeddings import EmbeddingService, FakeEmbedder
+
+VOCAB = ["redis", "persistence", "explain", "describe", "kafka", "partitions"]
+
+
+def _embed(text):
+    words = text.replace("?", "").split()
+    return [float(words.count(w)) for w in VOCAB]
+
+
+def _state(text, **kwargs):
+    kwargs.setdefault("chat_history", [])
+    return AgentState(request_id="1", user_input=text, token_budget=4000, **kwargs)
+
+
+def test_exact_tier_ignores_case_and_whitespace(fake_openai):
+    assert responder_node(_state("Explain Redis persistence")).final_response == "stub answer"
+    assert responder_node(_state("  explain   redis PERSISTENCE ")).final_response == "stub answer"
+
+    cache = cache_module.response_cache
+    assert len(fake_openai.responder_calls()) == 1
+    assert cache.stats["exact_hits"] == 1
+    assert cache.stats["misses"] == 1
+    assert cache.hit_rate == 0.5
+
+
+def test_semantic_tier_matches_paraphrases_in_same_context(fake_openai, monkeypatch):
+    monkeypatch.setattr(cache_module, "response_cache", ResponseCache(embed_fn=_embed, min_similarity=0.8))
+
+    responder_node(_state("explain redis persistence"))
+    responder_node(_state("describe redis persistence"))   # cosine 0.67: miss
+    responder_node(_state("redis persistence explain?"))   # same words: hit
+    responder_node(_state("explain kafka partitions"))
+
+    assert len(fake_openai.responder_calls()) == 3
+    assert cache_module.response_cache.stats["semantic_hits"] == 1
+
+
+def test_semantic_tier_on_the_embedding_service(fake_openai, monkeypatch):
+    # As wired in the backend lifespan: embed_fn=embedding_service.embed
+    embedder = FakeEmbedder()
+    service = EmbeddingService(embed_fn=embedder, cache_path=None)
+    monkeypatch.setattr(cache_module, "response_cache", ResponseCache(embed_fn=service.embed))
+
+    responder_node(_state("explain redis persistence"))
+    responder_node(_state("redis persistence, explain"))
+
+    assert len(fake_openai.responder_calls()) == 1
+    assert cache_module.response_cache.stats["semantic_hits"] == 1
+    # One embedding per distinct question
+    assert service.stats["api_calls"] == 2
+
+
+def test_embedding_failure_only_disables_the_semantic_tier(fake_openai, monkeypatch):
+    def broken(text):
+        raise RuntimeError("embeddings down")
+
+    monkeypatch.setattr(cache_module, "response_cache", ResponseCache(embed_fn=broken))
+
+    assert responder_node(_state("explain redis persistence")).final_response == "stub answer"
+    assert responder_node(_state("explain redis persistence")).final_response == "stub answer"
+
+    cache = cache_module.response_cache
+    assert len(fake_openai.responder_calls()) == 1
+    assert cache.stats["exact_hits"] == 1
+    assert cache.stats["semantic_errors"] == 1
+
+
+def test_semantic_tier_never_crosses_context(fake_openai, monkeypatch):
+    monkeypatch.setattr(cache_module, "response_cache", ResponseCache(embed_fn=_embed, min_similarity=0.8))
+
+    responder_node(_state("explain redis persistence", intent={"type": "information_request"}))
+    responder_node(_state("redis persistence explain", intent={"type": "learning_goal"}))
+
+    assert len(fake_openai.responder_calls()) == 2
+
+
+def test_personal_context_is_scoped_per_user(fake_openai):
+    history = [{"role": "user", "content": "I use Redis 7"}]
+
+    responder_node(_state("Explain persistence", chat_history=history))                 # no user: skipped
+    responder_node(_state("Explain persistence", chat_history=history, user_id=1))
+    responder_node(_state("Explain persistence", chat_history=history, user_id=2))
+    responder_node(_state("Explain persistence", chat_history=history, user_id=1))
+
+    assert len(fake_openai.responder_calls()) == 3
+    assert cache_module.response_cache.stats["exact_hits"] == 1
+
+
+def test_entries_expire_after_ttl(fake_openai, monkeypatch):
+    now = [0.0]
+    backend = InMemoryBackend(ttl_seconds=60, clock=lambda: now[0])
+    monkeypatch.setattr(cache_module, "response_cache", ResponseCache(backend=backend, ttl_seconds=60))
+
+    responder_node(_state("Explain Redis persistence"))
+    now[0] = 61
+    responder_node(_state("Explain Redis persistence"))
+
+    assert len(fake_openai.responder_calls()) == 2
+
+
+def test_stream_serves_cached_answer_and_caches_only_complete_streams(fake_openai):
+    fake_openai.reply = "a b c"
+
+    aborted = responder_stream(_state("Explain Redis persistence"))
+    next(aborted)
+    aborted.close()
+
+    assert "".join(responder_stream(_state("Explain Redis persistence"))) == "a b c"
+    assert "".join(responder_stream(_state("Explain Redis persistence"))) == "a b c"
+    assert len(fake_openai.responder_calls()) == 2
+
+
+def test_async_responder_shares_the_cache(fake_openai):
+    responder_node(_state("Explain Redis persistence"))
+    state = asyncio.run(aresponder_node(_state("Explain Redis persistence")))
+
+    assert state.final_response == "stub answer"
+    assert len(fake_openai.responder_calls()) == 1
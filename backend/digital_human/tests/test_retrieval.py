@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+import pytest
+
+from digital_human import integrations
+from digital_human.agents.retrieval_agent import agent as retrieval_module
+from digital_human.services import run_digital_human_chat, arun_digital_human_chat
+
+DOCS = [
+    {"content": "AOF logs every write.", "metadata": {"title": "AOF", "source": "notes"}, "score": 0.9},
+    {"content": "RDB takes snapshots.", "metadata": {"title": "RDB", "source": "notes"}, "score": 0.8},
+]
+
+
+@pytest.fixture
+def retriever(monkeypatch):
+    calls = []
+
+    def fake(user_id, query, k):
+        calls.append((user_id, query, k))
+        return list(DOCS)
+
+    monkeypatch.setattr(integrations, "_retriever", fake)
+    monkeypatch.setattr(integrations, "_reranker", None)
+    return calls
+
+
+def _responder_text(fake_openai):
+    return " ".join(m["content"] for m in fake_openai.responder_calls()[0]["messages"])
+
+
+def test_user_corpus_replaces_the_web_tool(fake_openai, retriever):
+    result = run_digital_human_chat("Explain Redis persistence", user_id=7)
+
+    assert result["rag_used"] is True
+    assert retriever == [(7, "Explain Redis persistence", retrieval_module.RAG_TOP_K)]
+    text = _responder_text(fake_openai)
+    assert "AOF logs every write." in text
+    assert "Redis Persistence Overview" not in text
+
+
+def test_async_graph_retrieves_too(fake_openai, retriever):
+    result = asyncio.run(arun_digital_human_chat("Explain Redis persistence", user_id=7))
+
+    assert result["rag_used"] is True
+
+
+def test_async_graph_prefers_the_async_retriever(fake_openai, retriever, monkeypatch):
+    async_calls = []
+
+    async def fake(user_id, query, k):
+        async_calls.append((user_id, query, k))
+        return list(DOCS)
+
+    monkeypatch.setattr(integrations, "_async_retriever", fake)
+
+    assert asyncio.run(arun_digital_human_chat("Explain Redis persistence", user_id=7))["rag_used"] is True
+    assert async_calls == [(7, "Explain Redis persistence", retrieval_module.RAG_TOP_K)]
+    assert retriever == []
+
+    # The sync graph keeps using the sync retriever
+    assert run_digital_human_chat("Explain Redis persistence", user_id=7)["rag_used"] is True
+    assert len(retriever) == 1
+
+
+def test_gated_by_enable_rag_and_needs_tools(fake_openai, retriever):
+    off = run_digital_human_chat("Explain Redis persistence", user_id=7, user_config={"enable_rag": False})
+    chat = run_digital_human_chat("hello", user_id=7)
+
+    assert off["rag_used"] is False
+    assert chat["rag_used"] is False
+    assert retriever == []
+
+
+def test_slow_retrieval_falls_back_within_budget(fake_openai, monkeypatch):
+    monkeypatch.setattr(retrieval_module, "RAG_LATENCY_BUDGET_MS", 50)
+    monkeypatch.setattr(integrations, "_retriever", lambda *a: time.sleep(1) or DOCS)
+
+    start = time.perf_counter()
+    result = run_digital_human_chat("Explain Redis persistence", user_id=7)
+    elapsed = time.perf_counter() - start
+
+    assert result["rag_used"] is False
+    assert elapsed < 0.5
+    # Falls back to the tool path
+    assert "Redis Persistence Overview" in _responder_text(fake_openai)
+
+
+def test_failing_retriever_does_not_fail_the_turn(fake_openai, monkeypatch):
+    def broken(*args):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(integrations, "_retriever", broken)
+
+    assert run_digital_human_chat("Explain Redis persistence", user_id=7)["response"] == "stub answer"
+
+
+def test_reranker_and_context_cap(fake_openai, retriever, monkeypatch):
+    monkeypatch.setattr(integrations, "_reranker", lambda query, docs: list(reversed(docs)))
+    monkeypatch.setattr(retrieval_module, "RAG_MAX_CONTEXT_TOKENS", 12)
+
+    run_digital_human_chat("Explain Redis persistence", user_id=7)
+
+    assert retriever[0][2] == retrieval_module.RAG_TOP_K * retrieval_module.RAG_RERANK_CANDIDATES
+    text = _responder_text(fake_openai)
+    assert "RDB takes snapshots." in text
+    assert "AOF logs every write." not in text
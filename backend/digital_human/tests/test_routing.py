@@ -0,0 +1,88 @@
+import json
+import os
+
+import pytest
+
+from digital_human import routing
+from digital_human.routing import RoutingConfig, RoutingConfigWatcher, get_routing, reload_routing
+from digital_human.services import run_digital_human_chat
+
+
+@pytest.fixture(autouse=True)
+def restore_routing():
+    active = get_routing()
+    yield
+    routing.configure_routing(active)
+
+
+def _write(path, data):
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+def test_file_overrides_defaults(tmp_path):
+    path = _write(tmp_path / "routing.json", {"version": "w18", "tool_triggers": ["explain"]})
+
+    config = reload_routing(path)
+
+    assert get_routing() is config
+    assert config.version == "w18"
+    assert config.tool_triggers == ["explain"]
+    assert config.memory_triggers == RoutingConfig().memory_triggers
+    assert "tool" not in config.matcher.match("how does it work")
+
+
+def test_version_defaults_to_a_content_hash(tmp_path):
+    first = reload_routing(_write(tmp_path / "a.json", {"min_intent_confidence": 0.7}))
+    second = reload_routing(_write(tmp_path / "b.json", {"min_intent_confidence": 0.8}))
+
+    assert len(first.version) == 12
+    assert first.version != second.version
+
+
+@pytest.mark.parametrize("data", [
+    {"min_intent_confidence": 3},
+    {"tool_triggers": "how"},
+    {"unknown_key": 1},
+    ["not", "an", "object"],
+])
+def test_invalid_files_keep_the_active_config(tmp_path, data):
+    active = get_routing()
+
+    with pytest.raises(ValueError):
+        reload_routing(_write(tmp_path / "bad.json", data))
+
+    assert get_routing() is active
+
+
+def test_routing_follows_the_swapped_config(fake_openai, tmp_path):
+    before = run_digital_human_chat("Explain Redis persistence")
+
+    reload_routing(_write(tmp_path / "routing.json", {"version": "no-tools", "intent_to_tool": {}}))
+    after = run_digital_human_chat("Explain Redis persistence")
+
+    assert before["routing_version"] == "builtin"
+    assert after["routing_version"] == "no-tools"
+    responder_prompts = [" ".join(m["content"] for m in call["messages"]) for call in fake_openai.responder_calls()]
+    assert "Redis Persistence Overview" in responder_prompts[0]
+    assert "Redis Persistence Overview" not in responder_prompts[1]
+
+
+def test_watcher_reloads_on_change_only(tmp_path):
+    path = _write(tmp_path / "routing.json", {"version": "v1"})
+    watcher = RoutingConfigWatcher(path, interval_seconds=1)
+
+    assert watcher.check() is True
+    assert watcher.check() is False
+    assert get_routing().version == "v1"
+
+    _write(tmp_path / "routing.json", {"version": "v2"})
+    os.utime(path, (0, 1))
+    assert watcher.check() is True
+    assert get_routing().version == "v2"
+
+    (tmp_path / "routing.json").write_text("{broken")
+    os.utime(path, (0, 2))
+    assert watcher.check() is False
+    assert get_routing().version == "v2"
+    assert watcher.metrics == {"reloads": 2, "errors": 1, "last_error": watcher.metrics["last_error"]}
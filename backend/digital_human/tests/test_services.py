@@ -0,0 +1,46 @@
+import asyncio
+
+from digital_human.services import run_digital_human_chat, arun_digital_human_chat
+
+
+def test_blocking_mode_makes_one_responder_call(fake_openai):
+    result = run_digital_human_chat("Explain Redis persistence")
+
+    assert result["response"] == "stub answer"
+    assert len(fake_openai.responder_calls()) == 1
+    assert len(fake_openai.calls) == 1  # intent from the fast path, no reasoning call
+
+
+def test_streaming_mode_makes_one_responder_call(fake_openai):
+    result = run_digital_human_chat("Explain Redis persistence", stream=True)
+
+    assert "".join(result["stream"]) == "stub answer"
+    assert len(fake_openai.responder_calls()) == 1
+    assert fake_openai.responder_calls()[0]["stream"] is True
+
+
+def test_responder_receives_planned_state(fake_openai):
+    run_digital_human_chat("Explain Redis persistence")
+
+    messages = fake_openai.responder_calls()[0]["messages"]
+    contents = " ".join(m["content"] for m in messages)
+
+    assert "User intent" in contents
+    assert "Redis Persistence Overview" in contents
+
+
+def test_async_blocking_mode_makes_one_responder_call(fake_openai):
+    result = asyncio.run(arun_digital_human_chat("Explain Redis persistence"))
+
+    assert result["response"] == "stub answer"
+    assert len(fake_openai.responder_calls()) == 1
+    assert len(fake_openai.calls) == 1
+
+
+def test_async_streaming_mode_makes_one_responder_call(fake_openai):
+    async def collect():
+        result = await arun_digital_human_chat("Explain Redis persistence", stream=True)
+        return [token async for token in result["stream"]]
+
+    assert "".join(asyncio.run(collect())) == "stub answer"
+    assert len(fake_openai.responder_calls()) == 1
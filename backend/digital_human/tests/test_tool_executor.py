@@ -0,0 +1,170 @@
+import asyncio
+import time
+
+import pytest
+
+from digital_human.executors import tool_executor as tool_executor_module
+from digital_human.executors.tool_executor import ToolExecutor, execute_tool, normalize_parameters
+from digital_human.graph import graph as graph_module
+from digital_human.graph.state import AgentState
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _request(tool_name, query="redis"):
+    return {"tool_name": tool_name, "parameters": {"query": query, "top_k": 5}}
+
+
+def _slow_tool(name, latency, calls):
+    async def tool(parameters):
+        calls.append(name)
+        await asyncio.sleep(latency)
+        return {"tool": name, "query_used": parameters["query"]}
+    return tool
+
+
+def test_requests_run_concurrently_and_complete_in_order_of_latency():
+    executor = ToolExecutor()
+    calls = []
+    for name, latency in (("slow", 0.3), ("medium", 0.2), ("fast", 0.1)):
+        executor.register(name, _slow_tool(name, latency, calls))
+
+    started = time.perf_counter()
+    results = asyncio.run(executor.aexecute_many([_request("slow"), _request("medium"), _request("fast")]))
+    elapsed = time.perf_counter() - started
+
+    print(f"\nsequential 0.60s, concurrent {elapsed:.2f}s")
+    assert [result["tool"] for _, result in results] == ["fast", "medium", "slow"]
+    assert elapsed < 0.5
+
+
+def test_tool_over_its_deadline_is_dropped():
+    executor = ToolExecutor()
+    calls = []
+    executor.register("stuck", _slow_tool("stuck", 5, calls), timeout_seconds=0.1)
+    executor.register("fast", _slow_tool("fast", 0.01, calls))
+
+    started = time.perf_counter()
+    results = asyncio.run(executor.aexecute_many([_request("stuck"), _request("fast")]))
+
+    assert time.perf_counter() - started < 1
+    assert [result["tool"] for _, result in results] == ["fast"]
+    assert executor.metrics["timeouts"] == 1
+
+
+def test_sync_tool_over_deadline_does_not_block_the_wrapper():
+    executor = ToolExecutor()
+
+    def blocking(parameters):
+        time.sleep(1)
+        return {"late": True}
+
+    executor.register("blocking", blocking, timeout_seconds=0.1)
+
+    started = time.perf_counter()
+    assert executor.execute(_request("blocking")) == {}
+    assert time.perf_counter() - started < 0.5
+
+
+def test_failing_tool_is_dropped_and_not_cached():
+    executor = ToolExecutor()
+    attempts = []
+
+    def flaky(parameters):
+        attempts.append(1)
+        raise RuntimeError("upstream down")
+
+    executor.register("flaky", flaky)
+
+    assert executor.execute(_request("flaky")) == {}
+    assert executor.execute(_request("flaky")) == {}
+    assert len(attempts) == 2
+    assert executor.metrics["errors"] == 2
+
+
+def test_concurrency_limit_per_tool():
+    executor = ToolExecutor(cache_size=10)
+    in_flight, peak = [0], [0]
+
+    async def limited(parameters):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        await asyncio.sleep(0.05)
+        in_flight[0] -= 1
+        return {"query_used": parameters["query"]}
+
+    executor.register("limited", limited, max_concurrency=2)
+    results = asyncio.run(executor.aexecute_many([_request("limited", f"q{i}") for i in range(6)]))
+
+    assert len(results) == 6
+    assert peak[0] == 2
+
+
+def test_results_cached_by_normalized_parameters_with_ttl():
+    clock = FakeClock()
+    executor = ToolExecutor(clock=clock)
+    calls = []
+    executor.register("search", _slow_tool("search", 0, calls), cache_ttl_seconds=60)
+
+    first = executor.execute(_request("search", "Redis  persistence"))
+    first["mutated"] = True
+    second = executor.execute({"tool_name": "search", "parameters": {"top_k": 5, "query": " redis persistence"}})
+
+    assert calls == ["search"]
+    assert "mutated" not in second
+    assert executor.metrics["cache_hits"] == 1
+
+    clock.now = 61
+    executor.execute(_request("search", "redis persistence"))
+    assert calls == ["search", "search"]
+
+
+def test_cache_disabled_with_zero_ttl():
+    executor = ToolExecutor()
+    calls = []
+    executor.register("live", _slow_tool("live", 0, calls), cache_ttl_seconds=0)
+
+    executor.execute(_request("live"))
+    executor.execute(_request("live"))
+    assert calls == ["live", "live"]
+
+
+def test_normalize_parameters():
+    assert normalize_parameters({"b": 1, "a": " Hello   World "}) == normalize_parameters({"a": "hello world", "b": 1})
+    assert normalize_parameters(None) == normalize_parameters({})
+
+
+def test_invalid_limits_rejected():
+    with pytest.raises(ValueError):
+        ToolExecutor().register("bad", lambda parameters: {}, timeout_seconds=0)
+
+
+def test_execute_tool_keeps_its_contract():
+    assert execute_tool({}) == {}
+    assert execute_tool({"tool_name": "nope", "parameters": {}}) == {"error": "Unsupported tool: nope"}
+
+    result = execute_tool(_request("web_search", "Explain Redis persistence"))
+    assert result["query_used"] == "Explain Redis persistence"
+    assert result["documents"]
+
+
+def test_async_graph_node_drops_slow_tool(monkeypatch):
+    executor = ToolExecutor()
+    executor.register("web_search", _slow_tool("web_search", 5, []), timeout_seconds=0.1)
+    monkeypatch.setattr(tool_executor_module, "tool_executor", executor)
+
+    state = AgentState(
+        request_id="1",
+        user_input="Explain Redis",
+        chat_history=[],
+        token_budget=4000,
+        tool_request=_request("web_search"),
+    )
+    state = asyncio.run(graph_module.atool_execution_node(state))
+    assert state.tool_results == {}
@@ -0,0 +1,85 @@
+import random
+import time
+
+from digital_human.routing import get_routing
+from digital_human.agents.memory_agent.extractor import extract_memory_intent
+from digital_human.services import run_digital_human_chat
+from digital_human.triggers import TriggerMatcher
+
+
+def _phrases(hits, family):
+    return [phrase for phrase, _, _ in hits.get(family, [])]
+
+
+def test_whole_words_only():
+    matcher = TriggerMatcher({"tool": ["how", "what is"]})
+
+    assert matcher.match("Show me the weather") == {}
+    assert matcher.match("what island") == {}
+    assert _phrases(matcher.match("So, HOW does it work?"), "tool") == ["how"]
+
+
+def test_substring_mode():
+    matcher = TriggerMatcher({"tool": ["how"]}, word_boundaries=False)
+
+    assert _phrases(matcher.match("show me"), "tool") == ["how"]
+
+
+def test_one_pass_reports_every_family_and_overlap():
+    matcher = TriggerMatcher({
+        "memory": ["remember", "my goal"],
+        "value": ["goal is"],
+        "info": ["what", "what is"],
+    })
+
+    hits = matcher.match("Remember: my goal   is Rust. What is ownership?")
+
+    assert _phrases(hits, "memory") == ["remember", "my goal"]
+    assert hits["value"] == [("goal is", 13, 22)]
+    assert _phrases(hits, "info") == ["what is", "what"]
+
+
+def test_extractor_uses_the_last_value_trigger():
+    intent = extract_memory_intent("My goal is X, no wait, my goal is learn Rust")
+
+    assert intent == {"action": "save", "key": "goal", "value": "learn rust", "confidence": 0.9}
+    assert extract_memory_intent("I preferred tea") is None
+
+
+def test_input_is_matched_once_per_request(fake_openai, monkeypatch):
+    calls = []
+    matcher = get_routing().matcher
+    original = matcher.match
+    monkeypatch.setattr(matcher, "match", lambda text: calls.append(text) or original(text))
+
+    result = run_digital_human_chat("Remember that my goal is learn Rust")
+
+    assert calls == ["Remember that my goal is learn Rust"]
+    assert result["memory_intent"]["value"] == "learn rust"
+
+
+def test_matches_naive_scan_and_scales():
+    rng = random.Random(0)
+    vocabulary = [f"w{i}" for i in range(2000)]
+    families = {
+        f"family_{f}": [" ".join(rng.sample(vocabulary, rng.randint(1, 3))) for _ in range(100)]
+        for f in range(5)
+    }
+    messages = [" ".join(rng.sample(vocabulary, 30)) for _ in range(200)]
+    matcher = TriggerMatcher(families)
+
+    def naive(text):
+        padded = f" {text} "
+        return {f for f, phrases in families.items() if any(f" {p} " in padded for p in phrases)}
+
+    started = time.perf_counter()
+    expected = [naive(m) for m in messages]
+    naive_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    found = [set(matcher.match(m)) for m in messages]
+    compiled_seconds = time.perf_counter() - started
+
+    print(f"\n500 phrases x 200 messages: naive={naive_seconds * 1000:.1f}ms compiled={compiled_seconds * 1000:.1f}ms")
+    assert found == expected
+    assert compiled_seconds < naive_seconds
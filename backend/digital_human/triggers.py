@@ -0,0 +1,124 @@
+# digital_human/triggers.py
+
+"""
+Compiled multi-pattern trigger matcher.
+
+Every trigger family of the routing config (digital_human/routing.py) is
+compiled into ONE prefix-factored (trie) regex, so a single scan of the input classifies it
+against all families at once, however many phrases the lists grow to.
+
+- matching is case-insensitive; spaces inside a phrase match any run
+  of whitespace
+- with word_boundaries (the default) a phrase only matches whole words:
+  "how" matches "how does" but not "show"
+- matches may overlap ("my goal is" yields both "my goal" and "goal is");
+  a phrase at the same position as a longer one it prefixes is reported
+  too ("what is" also yields "what")
+
+Each RoutingConfig compiles its own matcher. The orchestrator runs the
+match once per request and caches it on AgentState.trigger_hits
+(routing.match_state); later agents reuse it.
+"""
+import re
+from typing import Dict, Iterable, List, Tuple
+
+# (phrase, start, end) into the lowercased input
+Hit = Tuple[str, int, int]
+
+_WORD_CHAR = re.compile(r"\w")
+
+
+def _trie_regex(phrases: Iterable[str]) -> str:
+    """
+    Alternation factored on shared prefixes ("what is|what about" ->
+    "what\\s+(?:is|about)"), so each input position walks one trie path
+    instead of trying every phrase. Greedy optional tails prefer the
+    longest phrase.
+    """
+    trie: dict = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def render(node: dict) -> str:
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + render(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "|".join(branches)
+        if "" in node:
+            return f"(?:{body})?"
+        return body if len(branches) == 1 else f"(?:{body})"
+
+    return render(trie)
+
+
+class TriggerMatcher:
+    def __init__(self, families: Dict[str, Iterable[str]], word_boundaries: bool = True):
+        self.word_boundaries = word_boundaries
+        self.families: Dict[str, List[str]] = {}
+        phrase_families: Dict[str, List[str]] = {}
+
+        for family, phrases in families.items():
+            normalized = [" ".join(p.lower().split()) for p in phrases]
+            self.families[family] = [p for p in normalized if p]
+            for phrase in self.families[family]:
+                phrase_families.setdefault(phrase, []).append(family)
+
+        # The regex reports the longest phrase at a position; the shorter
+        # ones it implies are expanded below
+        phrases = sorted(phrase_families, key=len, reverse=True)
+        self._implied = {
+            phrase: [
+                (shorter, phrase_families[shorter])
+                for shorter in phrases
+                if phrase.startswith(shorter) and self._ends_at_boundary(phrase, len(shorter))
+            ]
+            for phrase in phrases
+        }
+
+        self._pattern = None
+        if phrases:
+            alternation = _trie_regex(phrases)
+            if word_boundaries:
+                alternation = rf"(?<!\w)(?:{alternation})(?!\w)"
+            # Zero-width lookahead: every start position is tried, so
+            # overlapping matches are all found in one finditer pass
+            self._pattern = re.compile(rf"(?=({alternation}))")
+
+    def _ends_at_boundary(self, phrase: str, length: int) -> bool:
+        if length == len(phrase) or not self.word_boundaries:
+            return True
+        return not (_WORD_CHAR.match(phrase[length - 1]) and _WORD_CHAR.match(phrase[length]))
+
+    def match(self, text: str) -> Dict[str, List[Hit]]:
+        """
+        family -> [(phrase, start, end), ...] in input order; families
+        without a hit are absent. Positions index text.lower().
+        """
+        hits: Dict[str, List[Hit]] = {}
+        if self._pattern is None or not text:
+            return hits
+
+        for m in self._pattern.finditer(text.lower()):
+            start, matched = m.start(1), m.group(1)
+            longest = " ".join(matched.split())
+            for phrase, families in self._implied[longest]:
+                end = start + self._span(matched, phrase)
+                for family in families:
+                    hits.setdefault(family, []).append((phrase, start, end))
+        return hits
+
+    @staticmethod
+    def _span(matched: str, phrase: str) -> int:
+        # Length of `phrase` (a prefix of `matched`, which may hold extra
+        # whitespace between words) inside `matched`
+        position = 0
+        for word in phrase.split(" "):
+            position = matched.index(word, position) + len(word)
+        return position
@@ -1,8 +1,65 @@
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-import auth, chat
+import admin, auth, chat
+from auth import get_current_user
+from services.memory_sweeper import memory_sweeper
+from services.memory_queue import memory_write_queue
+from digital_human.executors.tool_executor import tool_executor
+from digital_human.agents.responder_agent import cache as response_cache_module
+from digital_human.llm.embeddings import embedding_service
+from digital_human.llm.tokenizer import warm_tokenizer
+from digital_human.integrations import register_async_retriever, register_memory_loader, register_retriever
+from digital_human.routing import ROUTING_CONFIG_PATH, reload_routing, routing_watcher
+from services.memory_service import load_active_memories
+from services.rag_service import aretrieve_documents, retrieve_documents
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # count_tokens runs on the event loop; the tiktoken encoding load
+    # (a download on first use) must not happen there.
+    await run_in_threadpool(warm_tokenizer)
+
+    # The retrieval node searches the user's VectorDBRAG corpus through this
+    register_retriever(retrieve_documents)
+    # (the async graph uses this one: concurrent query embeddings share a batch)
+    register_async_retriever(aretrieve_documents)
+    # ...and recalls the user's stored memories through this (cached per user)
+    register_memory_loader(load_active_memories)
+
+    # Semantic response-cache tier: near-identical questions in the same
+    # context reuse an answer (query embeddings are cached per content)
+    if response_cache_module.RESPONSE_CACHE_ENABLED and response_cache_module.RESPONSE_CACHE_SEMANTIC:
+        response_cache_module.configure_response_cache(
+            response_cache_module.ResponseCache(embed_fn=embedding_service.embed)
+        )
+
+    # Expired-memory cleanup runs here, never on the request path.
+    # Every worker process runs its own sweeper: with several workers, set
+    # MEMORY_SWEEP_ENABLED=0 and run `python -m services.memory_sweeper`
+    # as a single dedicated process instead.
+    if os.getenv("MEMORY_SWEEP_ENABLED", "1") == "1":
+        memory_sweeper.start()
+
+    # Persists the memory actions the chat routes enqueue
+    memory_write_queue.start()
+
+    # Routing config: a broken file fails startup here; later edits are
+    # picked up by the watcher (or POST /admin/routing/reload)
+    if ROUTING_CONFIG_PATH:
+        await run_in_threadpool(reload_routing)
+    routing_watcher.start()
+    yield
+    await routing_watcher.stop()
+    await memory_sweeper.stop()
+    # Flushes pending memory writes before the process exits
+    await memory_write_queue.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS MUST BE HERE (TOP)
 app.add_middleware(
@@ -15,6 +72,7 @@ app.add_middleware(
 )
 
 app.include_router(auth.router)
+app.include_router(admin.router)
 
 
 
@@ -24,6 +82,29 @@ def root():
     return {"message": "Backend is running"}
 
 
+@app.get("/metrics/memory-sweeper")
+def memory_sweeper_metrics(user_id: int = Depends(get_current_user)):
+    return memory_sweeper.metrics
+
+
+@app.get("/metrics/memory-queue")
+def memory_queue_metrics(user_id: int = Depends(get_current_user)):
+    return {**memory_write_queue.metrics, "pending": memory_write_queue.pending}
+
+
+@app.get("/metrics/response-cache")
+def response_cache_metrics(user_id: int = Depends(get_current_user)):
+    cache = response_cache_module.response_cache
+    if cache is None:
+        return {"enabled": False}
+    return {**cache.stats, "enabled": True, "semantic": cache.semantic, "hit_rate": round(cache.hit_rate, 4)}
+
+
+@app.get("/metrics/tools")
+def tool_metrics(user_id: int = Depends(get_current_user)):
+    return {**tool_executor.metrics, "tools": tool_executor.tools}
+
+
 from database import Base, engine
 
 # Create DB tables
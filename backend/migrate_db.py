@@ -0,0 +1,113 @@
+"""Apply in-place schema changes to an existing PostgreSQL database.
+
+`Base.metadata.create_all` only creates missing tables; it never adds
+columns or indexes to tables that already exist. Every statement below
+is idempotent, so this script is safe to re-run after each deploy:
+
+    python migrate_db.py
+
+Fresh databases (and SQLite dev databases) get the same schema from
+`create_all` and do not need this script.
+"""
+import sys
+
+from sqlalchemy import text
+
+from database import engine
+
+# (name, SQL) — applied in order, all in one transaction
+MIGRATIONS = [
+    (
+        "chat_messages history window index",
+        "CREATE INDEX IF NOT EXISTS ix_chat_messages_session_created "
+        "ON chat_messages (session_id, created_at)",
+    ),
+    (
+        "chat_sessions.summary",
+        "ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS summary TEXT",
+    ),
+    (
+        "chat_sessions.summarized_until",
+        "ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS summarized_until TIMESTAMPTZ",
+    ),
+    (
+        "pgvector extension",
+        "CREATE EXTENSION IF NOT EXISTS vector",
+    ),
+    (
+        "vector_db_rag.embedding float8[] -> vector(1536)",
+        """
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'vector_db_rag'
+                  AND column_name = 'embedding'
+                  AND udt_name = '_float8'
+            ) THEN
+                ALTER TABLE vector_db_rag
+                    ALTER COLUMN embedding TYPE vector(1536)
+                    USING embedding::vector(1536);
+            END IF;
+        END $$
+        """,
+    ),
+    (
+        "vector_db_rag user_id index",
+        "CREATE INDEX IF NOT EXISTS ix_vector_db_rag_user_id ON vector_db_rag (user_id)",
+    ),
+    (
+        "vector_db_rag HNSW cosine index",
+        "CREATE INDEX IF NOT EXISTS ix_vector_db_rag_embedding_hnsw "
+        "ON vector_db_rag USING hnsw (embedding vector_cosine_ops) "
+        "WITH (m = 16, ef_construction = 64)",
+    ),
+    (
+        "vector_db_rag full-text GIN index",
+        "CREATE INDEX IF NOT EXISTS ix_vector_db_rag_text_fts ON vector_db_rag "
+        "USING gin (to_tsvector('english', coalesce(metadata ->> 'text', '')))",
+    ),
+    (
+        # Keep the newest active row per (user, type) so the unique index builds
+        "memory_store deactivate duplicate active memories",
+        """
+        UPDATE memory_store m SET is_active = false
+        FROM (
+            SELECT memory_id,
+                   row_number() OVER (
+                       PARTITION BY user_id, memory_type ORDER BY created_at DESC, memory_id
+                   ) AS rn
+            FROM memory_store
+            WHERE is_active
+        ) d
+        WHERE m.memory_id = d.memory_id AND d.rn > 1
+        """,
+    ),
+    (
+        "memory_store unique active (user_id, memory_type) index",
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_memory_store_user_type_active "
+        "ON memory_store (user_id, memory_type) WHERE is_active",
+    ),
+    (
+        "memory_store active-memories lookup index",
+        "CREATE INDEX IF NOT EXISTS ix_memory_store_user_active_expires "
+        "ON memory_store (user_id, is_active, expires_at)",
+    ),
+]
+
+
+def main():
+    if engine.dialect.name != "postgresql":
+        print(f"Nothing to do for {engine.dialect.name}; create_all builds the full schema.")
+        sys.exit(0)
+
+    with engine.begin() as conn:
+        for name, sql in MIGRATIONS:
+            print(f"Applying: {name}")
+            conn.execute(text(sql))
+
+    print("Migrations complete.")
+
+
+if __name__ == "__main__":
+    main()
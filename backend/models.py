@@ -51,9 +51,14 @@ from sqlalchemy import (
     BigInteger,
     ForeignKey,
     func,
-    CheckConstraint
+    CheckConstraint,
+    Index,
+    DDL,
+    JSON,
+    event,
+    text
 )
-from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from pgvector.sqlalchemy import Vector
 from database import Base
@@ -127,6 +132,11 @@ class ChatSession(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     ended_at = Column(DateTime(timezone=True))
 
+    # Rolling summary of messages older than the history window;
+    # summarized_until = created_at of the last folded message
+    summary = Column(Text)
+    summarized_until = Column(DateTime(timezone=True))
+
     user = relationship("User", back_populates="sessions")
     messages = relationship("ChatMessage", back_populates="session", cascade="all, delete")
 
@@ -156,6 +166,8 @@ class ChatMessage(Base):
             "role IN ('user', 'assistant', 'system')",
             name="chat_message_role_check"
         ),
+        # History window: WHERE session_id = ? ORDER BY created_at DESC LIMIT n
+        Index("ix_chat_messages_session_created", "session_id", "created_at"),
     )
 
 
@@ -201,6 +213,21 @@ class MemoryStore(Base):
     # 🔁 ORM relationship
     user = relationship("User", back_populates="memories")
 
+    __table_args__ = (
+        # One active memory per (user, type): the ON CONFLICT target of
+        # memory_service.write_memory. Forgotten rows don't count.
+        Index(
+            "uq_memory_store_user_type_active",
+            "user_id",
+            "memory_type",
+            unique=True,
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active"),
+        ),
+        # get_active_memories: user_id = ? AND is_active AND expires_at > now
+        Index("ix_memory_store_user_active_expires", "user_id", "is_active", "expires_at"),
+    )
+
 
 # =========================
 # VECTOR DATABASE (RAG)
@@ -215,6 +242,20 @@ class MemoryStore(Base):
 #     metadata = Column(JSONB)
 
 #     user = relationship("User", back_populates="vectors")
+EMBEDDING_DIM = 1536  # text-embedding-3-small / ada-002
+
+# Indexed full-text document; queries must use this exact expression
+# (constants inlined, not bound) for Postgres to pick the GIN index
+FTS_DOCUMENT_SQL = "to_tsvector('english', coalesce(metadata ->> 'text', ''))"
+
+# The vector type must exist before create_all builds vector_db_rag
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS vector").execute_if(dialect="postgresql"),
+)
+
+
 class VectorDBRAG(Base):
     __tablename__ = "vector_db_rag"
 
@@ -227,11 +268,30 @@ class VectorDBRAG(Base):
     user_id = Column(
         BigInteger,
         ForeignKey("users.user_id", ondelete="CASCADE"),
-        nullable=False
+        nullable=False,
+        index=True
     )
 
-    embedding = Column(ARRAY(Float), nullable=False)
+    embedding = Column(Vector(EMBEDDING_DIM), nullable=False)
 
-    meta_data = Column("metadata", JSONB)
+    # JSON on SQLite so dev databases (and tests) can hold the table
+    meta_data = Column("metadata", JSONB().with_variant(JSON(), "sqlite"))
 
     user = relationship("User", back_populates="vectors")
+
+    __table_args__ = (
+        # ANN top-k: ORDER BY embedding <=> :query LIMIT k
+        Index(
+            "ix_vector_db_rag_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+        # Lexical half of hybrid retrieval (rag_service.search_lexical)
+        Index(
+            "ix_vector_db_rag_text_fts",
+            text(FTS_DOCUMENT_SQL),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 from models import ChatSession, ChatMessage
+from digital_human.llm.tokenizer import count_tokens
 import uuid
 def get_or_create_session(
     db: Session,
@@ -37,7 +38,7 @@ def save_message(
         session_id=session_id,
         role=role,
         content=content,
-        token_count=token_count
+        token_count=token_count if token_count is not None else count_tokens(content)
     )
     db.add(msg)
     db.commit()
@@ -53,3 +54,43 @@ def get_recent_messages(
         .limit(limit)
         .all()
     )
+
+
+
+def load_history_window(
+    db: Session,
+    session_id,
+    token_budget: int,
+    max_messages: int = 50
+):
+    """
+    Newest-first read (LIMIT max_messages) that stops once token_budget
+    is filled. Returns the window oldest-first.
+
+    Uses the token_count stored at write time; only legacy rows without
+    it are tokenized here.
+    """
+    rows = (
+        db.query(
+            ChatMessage.role,
+            ChatMessage.content,
+            ChatMessage.token_count,
+            ChatMessage.created_at,
+        )
+        .filter(ChatMessage.session_id == session_id)
+        .order_by(ChatMessage.created_at.desc())
+        .limit(max_messages)
+    )
+
+    window = []
+    used = 0
+
+    for row in rows:
+        tokens = row.token_count if row.token_count is not None else count_tokens(row.content)
+        if used + tokens > token_budget:
+            break
+        used += tokens
+        window.append(row)
+
+    window.reverse()
+    return window
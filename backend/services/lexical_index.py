@@ -0,0 +1,135 @@
+"""
+In-process BM25 index over VectorDBRAG chunk text (metadata["text"]).
+
+The lexical half of hybrid retrieval where Postgres full-text search is
+unavailable (SQLite / dev). Mirrors services/vector_index.py: built
+lazily per user, extended by store_embedding, evicted LRU + TTL.
+
+Tokens keep "_", "-" and "." inside words, so identifiers and error
+codes (ERR_CONN_RESET, 0x80070005, v1.2.3) survive as single terms.
+"""
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from digital_human.cache import TTLCache
+from models import VectorDBRAG
+from services.vector_index import RAG_VECTOR_INDEX_MAX_USERS, RAG_VECTOR_INDEX_TTL_SECONDS
+
+_TOKEN = re.compile(r"\w(?:[\w.\-]*\w)?")
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall((text or "").lower())
+
+
+class BM25Index:
+    def __init__(self):
+        self.document_ids: List[Any] = []
+        self.metadata: List[Optional[dict]] = []
+        self.lengths: List[int] = []
+        self.postings: Dict[str, List[tuple]] = defaultdict(list)  # term -> [(doc, tf)]
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.document_ids)
+
+    def add(self, document_id, text: str, metadata: Optional[dict] = None) -> None:
+        counts = Counter(tokenize(text))
+        with self._lock:
+            doc = len(self.document_ids)
+            self.document_ids.append(document_id)
+            self.metadata.append(metadata)
+            self.lengths.append(sum(counts.values()))
+            self._total_length += self.lengths[-1]
+            for term, tf in counts.items():
+                self.postings[term].append((doc, tf))
+
+    def search(self, query: str, k: int = 5) -> List[dict]:
+        terms = set(tokenize(query))
+        with self._lock:
+            n = len(self.document_ids)
+            if n == 0 or not terms:
+                return []
+            avg_length = self._total_length / n
+
+            scores: Dict[int, float] = defaultdict(float)
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc, tf in postings:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[doc] / avg_length)
+                    scores[doc] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+            top = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+            return [
+                {"document_id": self.document_ids[doc], "metadata": self.metadata[doc], "score": score}
+                for doc, score in top
+            ]
+
+
+def _chunk_text(metadata: Optional[dict]) -> str:
+    return (metadata or {}).get("text") or ""
+
+
+class LexicalIndexCache:
+    """
+    LRU (+TTL) of per-user BM25 indexes.
+    """
+
+    def __init__(
+        self,
+        max_users: int = RAG_VECTOR_INDEX_MAX_USERS,
+        ttl_seconds: Optional[float] = RAG_VECTOR_INDEX_TTL_SECONDS,
+    ):
+        self._indexes = TTLCache(max_size=max_users, ttl_seconds=ttl_seconds)
+        self._build_lock = threading.Lock()
+
+    def get(self, db: Session, user_id: int) -> BM25Index:
+        index = self._indexes.get(user_id)
+        if index is not None:
+            return index
+
+        with self._build_lock:
+            index = self._indexes.get(user_id)
+            if index is not None:
+                return index
+
+            rows = db.execute(
+                select(VectorDBRAG.document_id, VectorDBRAG.meta_data)
+                .where(VectorDBRAG.user_id == user_id)
+            ).all()
+
+            index = BM25Index()
+            for row in rows:
+                index.add(row.document_id, _chunk_text(row.meta_data), row.meta_data)
+            self._indexes.set(user_id, index)
+            return index
+
+    def search(self, db: Session, user_id: int, query: str, k: int = 5) -> List[dict]:
+        return self.get(db, user_id).search(query, k)
+
+    def on_store(self, user_id: int, document_id, metadata: Optional[dict]) -> None:
+        index = self._indexes.get(user_id)
+        if index is not None:
+            index.add(document_id, _chunk_text(metadata), metadata)
+
+    def invalidate(self, user_id: int) -> None:
+        self._indexes.delete(user_id)
+
+    def clear(self) -> None:
+        self._indexes.clear()
+
+
+lexical_index = LexicalIndexCache()
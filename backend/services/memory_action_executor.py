@@ -1,13 +1,22 @@
-from memory_service import (
+import logging
+
+from services.memory_service import (
     write_memory,
     update_memory,
-    delete_memory,
-    get_active_memories
+    soft_delete_memory,
+    invalidate_memories
 )
 
-def apply_memory_action(db, user_id: int, action: dict):
+logger = logging.getLogger("memory_action_executor")
+
+
+def apply_memory_action(db, user_id: int, action: dict, commit: bool = True):
+    """
+    Applies one memory_intent ({"action", "key", "value", "confidence"}).
+    "save" upserts: each memory_type holds a single active memory.
+    """
     action_type = action["action"]
-    key = action["key"]
+    key = action.get("key")
     value = action.get("value")
     confidence = action.get("confidence")
 
@@ -17,7 +26,8 @@ def apply_memory_action(db, user_id: int, action: dict):
             user_id=user_id,
             memory_type=key,
             memory_content=value,
-            confidence_score=confidence
+            confidence_score=confidence,
+            commit=commit
         )
 
     elif action_type == "update":
@@ -26,12 +36,50 @@ def apply_memory_action(db, user_id: int, action: dict):
             user_id=user_id,
             memory_type=key,
             new_value=value,
-            confidence_score=confidence
+            confidence_score=confidence,
+            commit=commit
         )
 
     elif action_type == "delete":
         soft_delete_memory(
             db=db,
             user_id=user_id,
-            memory_type=key
+            memory_type=key,
+            commit=commit
         )
+
+    else:
+        raise ValueError(f"Unknown memory action: {action_type!r}")
+
+
+def apply_memory_actions(db, actions: list) -> list:
+    """
+    Applies [(user_id, action), ...] in ONE transaction, in order.
+
+    If the batch fails it is rolled back and replayed action by action,
+    each in its own savepoint, so one bad action (e.g. a NOT NULL
+    violation) does not take the rest of the batch down with it.
+    Returns [(index, error), ...] for the actions that failed.
+    """
+    failed = []
+    try:
+        for user_id, action in actions:
+            apply_memory_action(db, user_id, action, commit=False)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"⚠️ Memory batch failed, applying one by one | size={len(actions)} | error={str(e)}")
+
+        for index, (user_id, action) in enumerate(actions):
+            try:
+                with db.begin_nested():
+                    apply_memory_action(db, user_id, action, commit=False)
+            except Exception as action_error:
+                failed.append((index, action_error))
+        db.commit()
+
+    # Again after the commit: a read between the in-transaction
+    # invalidation and the commit may have re-cached the old rows
+    for user_id in {user_id for user_id, _ in actions}:
+        invalidate_memories(user_id)
+    return failed
@@ -0,0 +1,228 @@
+"""
+Write-behind queue for memory actions.
+
+The chat routes enqueue each turn's memory_intent and return; a
+background worker (started in the app lifespan, see main.py) persists
+them later, so memory writes never add latency to a response.
+
+Pending actions are coalesced per (user_id, memory_type): only the
+latest action for a memory type is kept (last write wins), and a
+"delete" without a type drops everything pending for that user. The
+worker applies up to batch_size actions per transaction; when an action
+in a batch fails, only that action is retried (and dropped after
+max_attempts), the rest of the batch is still written.
+
+Pending actions live in process memory: a crash loses at most the last
+flush_interval_seconds of memory writes. stop() flushes what is left.
+"""
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from database import AsyncSessionLocal
+from services.memory_action_executor import apply_memory_actions
+
+logger = logging.getLogger("memory_queue")
+
+MEMORY_QUEUE_FLUSH_INTERVAL_SECONDS = float(os.getenv("MEMORY_QUEUE_FLUSH_INTERVAL_SECONDS", "1"))
+MEMORY_QUEUE_BATCH_SIZE = int(os.getenv("MEMORY_QUEUE_BATCH_SIZE", "200"))
+# Failed actions are retried this many times before being dropped
+MEMORY_QUEUE_MAX_ATTEMPTS = int(os.getenv("MEMORY_QUEUE_MAX_ATTEMPTS", "3"))
+
+
+class MemoryWriteQueue:
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        flush_interval_seconds: float = MEMORY_QUEUE_FLUSH_INTERVAL_SECONDS,
+        batch_size: int = MEMORY_QUEUE_BATCH_SIZE,
+        max_attempts: int = MEMORY_QUEUE_MAX_ATTEMPTS,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval_seconds = flush_interval_seconds
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+
+        # (user_id, memory_type) -> (action, attempts), oldest first
+        self._pending: OrderedDict = OrderedDict()
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._flush_lock: asyncio.Lock | None = None
+
+        self.metrics = {
+            "enqueued": 0,
+            "coalesced": 0,
+            "applied": 0,
+            "batches": 0,
+            "dropped": 0,
+            "errors": 0,
+            "last_error": None,
+            "last_flush_at": None,
+            "last_flush_ms": None,
+        }
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def clear(self) -> None:
+        """
+        Drops everything pending (tests).
+        """
+        self._pending.clear()
+
+    def enqueue(self, user_id: int, action: dict) -> None:
+        """
+        Non-blocking; call from the event loop.
+        """
+        self.metrics["enqueued"] += 1
+        self._put(user_id, action, attempts=0)
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _put(self, user_id: int, action: dict, attempts: int) -> None:
+        key = (user_id, action.get("key"))
+
+        if action["action"] == "delete" and key[1] is None:
+            # Forget everything: earlier pending writes are moot
+            for pending_key in [k for k in self._pending if k[0] == user_id]:
+                del self._pending[pending_key]
+                self.metrics["coalesced"] += 1
+        elif key in self._pending:
+            del self._pending[key]
+            self.metrics["coalesced"] += 1
+
+        # Re-inserted at the end: applied after anything queued before it
+        self._pending[key] = (action, attempts)
+
+    def _take_batch(self) -> list:
+        batch = []
+        while self._pending and len(batch) < self.batch_size:
+            key, (action, attempts) = self._pending.popitem(last=False)
+            batch.append((key, action, attempts))
+        return batch
+
+    async def flush(self) -> int:
+        """
+        Persists everything pending now, one transaction per batch.
+        Returns the number of actions applied.
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        applied = 0
+        async with self._flush_lock:
+            started = time.perf_counter()
+            # Requeued once the queue is drained, so a failing action is
+            # not retried again within the same flush
+            retries = []
+
+            try:
+                while self._pending:
+                    batch = self._take_batch()
+                    actions = [(user_id, action) for (user_id, _), action, _ in batch]
+                    try:
+                        async with self.session_factory() as db:
+                            failed = await db.run_sync(apply_memory_actions, actions)
+                        self.metrics["batches"] += 1
+                    except asyncio.CancelledError:
+                        # Shutdown mid-batch: hand it to stop()'s final flush
+                        self._restore(batch)
+                        raise
+                    except Exception as e:
+                        self.metrics["errors"] += 1
+                        self.metrics["last_error"] = str(e)
+                        logger.error(f"❌ Memory batch failed | size={len(batch)} | error={str(e)}", exc_info=True)
+                        retries.extend(batch)
+                        break
+
+                    applied += len(batch) - len(failed)
+                    for index, error in failed:
+                        (user_id, key), _, _ = batch[index]
+                        self.metrics["errors"] += 1
+                        self.metrics["last_error"] = str(error)
+                        logger.error(f"❌ Memory action failed | user_id={user_id} | key={key} | error={str(error)}")
+                        retries.append(batch[index])
+            finally:
+                self._requeue(retries)
+
+            self.metrics["applied"] += applied
+            self.metrics["last_flush_at"] = datetime.now(timezone.utc).isoformat()
+            self.metrics["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+        if applied:
+            logger.info(f"🧠 Memory writes flushed | applied={applied} | pending={self.pending}")
+        return applied
+
+    def _restore(self, batch: list) -> None:
+        # Back at the front, unless a newer action superseded it meanwhile
+        for (user_id, key), action, attempts in reversed(batch):
+            if (user_id, key) not in self._pending:
+                self._pending[(user_id, key)] = (action, attempts)
+                self._pending.move_to_end((user_id, key), last=False)
+
+    def _requeue(self, batch: list) -> None:
+        for (user_id, key), action, attempts in batch:
+            if attempts + 1 >= self.max_attempts:
+                self.metrics["dropped"] += 1
+                logger.warning(f"🗑️ Memory action dropped | user_id={user_id} | key={key}")
+                continue
+            # A newer action for the same memory wins over the retry
+            if (user_id, key) not in self._pending:
+                self._put(user_id, action, attempts + 1)
+
+    async def run_forever(self):
+        while True:
+            await self._wakeup.wait()
+
+            # Let writes for the same memory pile up and coalesce
+            if self.pending < self.batch_size:
+                await asyncio.sleep(self.flush_interval_seconds)
+            self._wakeup.clear()
+
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.metrics["errors"] += 1
+                self.metrics["last_error"] = str(e)
+                logger.error(f"❌ Memory queue flush failed | error={str(e)}", exc_info=True)
+
+            if self._pending:
+                # Retries: back off one interval before the next attempt
+                await asyncio.sleep(self.flush_interval_seconds)
+                self._wakeup.set()
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            # Loop-bound primitives are created on the loop that runs the worker
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            if self._pending:
+                self._wakeup.set()
+            self._task = asyncio.create_task(self.run_forever())
+        return self._task
+
+    async def stop(self):
+        """
+        Stops the worker, then flushes what is still pending.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+
+        await self.flush()
+
+
+# Shared instance used by the chat routes and the app lifespan
+memory_write_queue = MemoryWriteQueue()
@@ -1,19 +1,61 @@
+import os
+import uuid
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import event, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from database import SessionLocal
+from digital_human.cache import TTLCache
 from models import MemoryStore
 from datetime import datetime, timedelta, timezone
 
+# --------------------
+# Recall cache: per-user active memories (in-process LRU + TTL)
+# --------------------
+MEMORY_CACHE_MAX_USERS = int(os.getenv("MEMORY_CACHE_MAX_USERS", "10000"))
+# Bounds staleness when another process writes the same user's memories
+MEMORY_CACHE_TTL_SECONDS = float(os.getenv("MEMORY_CACHE_TTL_SECONDS", "300"))
+
+memory_cache = TTLCache(max_size=MEMORY_CACHE_MAX_USERS, ttl_seconds=MEMORY_CACHE_TTL_SECONDS)
+
+
+def invalidate_memories(user_id: int):
+    """
+    Call after ANY write to a user's memory_store rows.
+    """
+    memory_cache.delete(user_id)
+
+
+def _insert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql_insert(MemoryStore)
+    if dialect == "sqlite":
+        return sqlite_insert(MemoryStore)
+    raise NotImplementedError(f"write_memory needs ON CONFLICT support ({dialect})")
+
+
 def write_memory(
     db: Session,
     user_id: int,
     memory_type: str,
     memory_content: str,
     confidence_score: float | None = None,
-    ttl_days: int = 30  # 🔥 default 30 days
+    ttl_days: int = 30,  # 🔥 default 30 days
+    commit: bool = True
 ):
+    """
+    Upsert: ONE statement that inserts the memory, or overwrites the
+    user's active memory of that type (uq_memory_store_user_type_active
+    makes this atomic under concurrent writers).
+
+    commit=False leaves the commit to the caller, which batches several
+    writes into one transaction (services/memory_queue.py).
+    """
     expires_at = datetime.now(timezone.utc) + timedelta(days=ttl_days)
 
-    memory = MemoryStore(
+    stmt = _insert(db).values(
+        memory_id=uuid.uuid4(),
         user_id=user_id,
         memory_type=memory_type,
         memory_content=memory_content,
@@ -21,9 +63,24 @@ def write_memory(
         is_active=True,
         expires_at=expires_at
     )
-    db.add(memory)
-    db.commit()
-    db.refresh(memory)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MemoryStore.user_id, MemoryStore.memory_type],
+        index_where=text("is_active"),
+        set_={
+            "memory_content": stmt.excluded.memory_content,
+            "confidence_score": stmt.excluded.confidence_score,
+            "expires_at": stmt.excluded.expires_at,
+        }
+    ).returning(MemoryStore)
+
+    memory = db.scalars(
+        stmt, execution_options={"populate_existing": True}
+    ).one()
+
+    if commit:
+        db.commit()
+    # Core statements skip the ORM write hooks below
+    invalidate_memories(user_id)
     return memory
 
 # -------------------------
@@ -34,24 +91,28 @@ def update_memory(
     user_id: int,
     memory_type: str,
     new_value: str,
-    confidence_score: float | None = None
+    confidence_score: float | None = None,
+    commit: bool = True
 ):
-    memory = (
-        db.query(MemoryStore)
-        .filter(
+    """
+    Single UPDATE ... RETURNING; None when the user has no active
+    memory of that type.
+    """
+    memory = db.scalars(
+        update(MemoryStore)
+        .where(
             MemoryStore.user_id == user_id,
             MemoryStore.memory_type == memory_type,
             MemoryStore.is_active == True
         )
-        .first()
-    )
+        .values(memory_content=new_value, confidence_score=confidence_score)
+        .returning(MemoryStore),
+        execution_options={"populate_existing": True}
+    ).one_or_none()
 
-    if memory:
-        memory.memory_content = new_value
-        memory.confidence_score = confidence_score
+    if commit:
         db.commit()
-        db.refresh(memory)
-
+    invalidate_memories(user_id)
     return memory
 
 
@@ -61,7 +122,8 @@ def update_memory(
 def soft_delete_memory(
     db: Session,
     user_id: int,
-    memory_type: str | None = None
+    memory_type: str | None = None,
+    commit: bool = True
 ):
     query = db.query(MemoryStore).filter(
         MemoryStore.user_id == user_id,
@@ -77,7 +139,10 @@ def soft_delete_memory(
         synchronize_session=False
     )
 
-    db.commit()
+    if commit:
+        db.commit()
+    # Bulk UPDATE skips the ORM write hooks below
+    invalidate_memories(user_id)
     return updated
 
 
@@ -102,24 +167,84 @@ def get_active_memories(db: Session, user_id: int):
     )
 
 
+def _aware(value: datetime | None) -> datetime | None:
+    # SQLite hands back naive datetimes
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def load_active_memories(user_id: int) -> list[dict]:
+    """
+    Memory loader registered with digital_human.integrations (see main.py):
+    the user's active memories as plain dicts, served from memory_cache.
+
+    Cached entries keep their expiry and are filtered on every read, so
+    a memory expiring while cached is never returned.
+    """
+    memories = memory_cache.get(user_id)
+    if memories is None:
+        with SessionLocal() as db:
+            memories = [
+                {
+                    "memory_type": m.memory_type,
+                    "memory_content": m.memory_content,
+                    "confidence_score": m.confidence_score,
+                    "expires_at": _aware(m.expires_at),
+                }
+                for m in get_active_memories(db, user_id)
+            ]
+        memory_cache.set(user_id, memories)
+
+    now = datetime.now(timezone.utc)
+    return [m for m in memories if m["expires_at"] is None or m["expires_at"] > now]
+
+
 # -------------------------
-# AUTO CLEANUP (optional cron / background task)
+# AUTO CLEANUP (background sweeper: services/memory_sweeper.py)
 # -------------------------
-def cleanup_expired_memories(db: Session):
+def cleanup_expired_memories(db: Session, batch_size: int | None = None):
+    """
+    Deactivates expired memories and commits.
+
+    With batch_size, at most that many rows are touched, so one call is
+    one short, bounded transaction. Returns the number deactivated.
+    """
     now = datetime.now(timezone.utc)
 
-    expired = (
-        db.query(MemoryStore)
-        .filter(
-            MemoryStore.is_active == True,
-            MemoryStore.expires_at.isnot(None),
-            MemoryStore.expires_at <= now
-        )
-        .update(
-            {"is_active": False},
-            synchronize_session=False
+    expired_filter = (
+        MemoryStore.is_active == True,
+        MemoryStore.expires_at.isnot(None),
+        MemoryStore.expires_at <= now
+    )
+
+    query = db.query(MemoryStore)
+
+    if batch_size:
+        batch_ids = (
+            select(MemoryStore.memory_id)
+            .where(*expired_filter)
+            .limit(batch_size)
+            .scalar_subquery()
         )
+        query = query.filter(MemoryStore.memory_id.in_(batch_ids))
+    else:
+        query = query.filter(*expired_filter)
+
+    expired = query.update(
+        {"is_active": False},
+        synchronize_session=False
     )
 
     db.commit()
     return expired
+
+
+# --------------------
+# Invalidation hooks: any ORM write to MemoryStore drops the cached list
+# --------------------
+@event.listens_for(MemoryStore, "after_insert")
+@event.listens_for(MemoryStore, "after_update")
+@event.listens_for(MemoryStore, "after_delete")
+def _invalidate_on_write(mapper, connection, target):
+    invalidate_memories(target.user_id)
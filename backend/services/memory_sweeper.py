@@ -0,0 +1,133 @@
+"""
+Background sweeper for expired memories.
+
+Runs inside the app lifespan (see main.py) or as a standalone worker:
+
+    python -m services.memory_sweeper          # loop forever
+    python -m services.memory_sweeper --once   # single sweep (cron)
+
+Reads never depend on the sweep: get_active_memories already filters
+on expires_at. The sweep only keeps is_active tidy.
+
+Multi-worker deployments (uvicorn --workers N, gunicorn) would start one
+sweeper per process. Set MEMORY_SWEEP_ENABLED=0 for the API workers and
+run this module once as its own process.
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from database import AsyncSessionLocal
+from services.memory_service import cleanup_expired_memories
+
+logger = logging.getLogger("memory_sweeper")
+
+SWEEP_INTERVAL_SECONDS = float(os.getenv("MEMORY_SWEEP_INTERVAL_SECONDS", "300"))
+SWEEP_BATCH_SIZE = int(os.getenv("MEMORY_SWEEP_BATCH_SIZE", "500"))
+SWEEP_MAX_BATCHES = int(os.getenv("MEMORY_SWEEP_MAX_BATCHES", "20"))
+
+
+class MemorySweeper:
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        interval_seconds: float = SWEEP_INTERVAL_SECONDS,
+        batch_size: int = SWEEP_BATCH_SIZE,
+        max_batches: int = SWEEP_MAX_BATCHES,
+    ):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self._task: asyncio.Task | None = None
+
+        self.metrics = {
+            "runs": 0,
+            "batches": 0,
+            "deactivated_total": 0,
+            "last_deactivated": 0,
+            "last_run_at": None,
+            "last_duration_ms": None,
+            "errors": 0,
+            "last_error": None,
+        }
+
+    async def sweep_once(self) -> int:
+        """
+        One sweep: up to max_batches bounded transactions.
+        Stops early once a batch comes back short.
+        """
+        started = time.perf_counter()
+        deactivated = 0
+
+        for _ in range(self.max_batches):
+            async with self.session_factory() as db:
+                count = await db.run_sync(cleanup_expired_memories, self.batch_size)
+
+            self.metrics["batches"] += 1
+            deactivated += count
+
+            if count < self.batch_size:
+                break
+
+        self.metrics["runs"] += 1
+        self.metrics["deactivated_total"] += deactivated
+        self.metrics["last_deactivated"] = deactivated
+        self.metrics["last_run_at"] = datetime.now(timezone.utc).isoformat()
+        self.metrics["last_duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+        logger.info(
+            f"🧹 Memory sweep done | deactivated={deactivated} | duration_ms={self.metrics['last_duration_ms']}"
+        )
+        return deactivated
+
+    async def run_forever(self):
+        while True:
+            try:
+                await self.sweep_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.metrics["errors"] += 1
+                self.metrics["last_error"] = str(e)
+                logger.error(f"❌ Memory sweep failed | error={str(e)}", exc_info=True)
+
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_forever())
+        return self._task
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+# Shared instance used by the app lifespan and the metrics endpoint
+memory_sweeper = MemorySweeper()
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(message)s",
+    )
+
+    if "--once" in sys.argv[1:]:
+        asyncio.run(memory_sweeper.sweep_once())
+    else:
+        asyncio.run(memory_sweeper.run_forever())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Bulk RAG ingestion: chunk -> batched embeddings -> bulk insert.
+
+Unlike rag_service.store_embedding (one INSERT + COMMIT + refresh per
+chunk), documents are streamed through:
+
+- chunking on word boundaries with overlap
+- one embeddings call per EMBED_BATCH_SIZE chunks
+- one transaction per ~COMMIT_EVERY rows, written with COPY on Postgres
+  (psycopg2) or a multi-row executemany elsewhere
+- a checkpoint file of completed document ids, so an interrupted run
+  resumes where it stopped
+
+Transactions always end on a document boundary, so a document is either
+fully stored or retried as a whole. The checkpoint is written after the
+commit: a crash in between re-ingests at most that one transaction.
+
+    python -m services.rag_ingest --user-id 1 --checkpoint ingest.ckpt docs.jsonl notes.md
+
+.jsonl inputs hold one {"id", "text", "metadata"} object per line; any
+other file is one document whose id is its path.
+"""
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from sqlalchemy import insert
+
+from database import SessionLocal
+from models import VectorDBRAG
+from services.vector_index import corpus_presence, vector_index
+from services.lexical_index import lexical_index
+
+logger = logging.getLogger("rag_ingest")
+
+CHUNK_MAX_CHARS = int(os.getenv("RAG_CHUNK_MAX_CHARS", "1200"))
+CHUNK_OVERLAP_CHARS = int(os.getenv("RAG_CHUNK_OVERLAP_CHARS", "200"))
+EMBED_BATCH_SIZE = int(os.getenv("RAG_EMBED_BATCH_SIZE", "256"))
+COMMIT_EVERY = int(os.getenv("RAG_COMMIT_EVERY", "5000"))
+
+
+# --------------------
+# Input
+# --------------------
+def chunk_text(text: str, max_chars: int = CHUNK_MAX_CHARS, overlap: int = CHUNK_OVERLAP_CHARS) -> List[str]:
+    """
+    Splits on whitespace into chunks of at most max_chars (a single longer
+    word becomes its own chunk); consecutive chunks share ~overlap chars.
+    """
+    words = text.split()
+    chunks, current, size = [], [], 0
+
+    for word in words:
+        if current and size + len(word) + 1 > max_chars:
+            chunks.append(" ".join(current))
+
+            # Carry the tail of this chunk into the next one
+            tail, tail_size = [], 0
+            for w in reversed(current):
+                if tail_size + len(w) + 1 > overlap:
+                    break
+                tail.insert(0, w)
+                tail_size += len(w) + 1
+            current, size = tail, tail_size
+
+        current.append(word)
+        size += len(word) + 1
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def read_documents(paths: Iterable[str]) -> Iterator[dict]:
+    for path in paths:
+        if path.endswith(".jsonl"):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        else:
+            with open(path, encoding="utf-8") as f:
+                yield {"id": path, "text": f.read(), "metadata": {"path": path}}
+
+
+def load_checkpoint(path: Optional[str]) -> set:
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+def _append_checkpoint(path: Optional[str], document_ids: List[str]) -> None:
+    if not path or not document_ids:
+        return
+    with open(path, "a", encoding="utf-8") as f:
+        f.writelines(f"{doc_id}\n" for doc_id in document_ids)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# --------------------
+# Output
+# --------------------
+def _copy_rows(db, rows: List[dict]) -> None:
+    """
+    COPY ... FROM STDIN (psycopg2), on the session's own connection so it
+    joins the current transaction.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            row["document_id"],
+            row["user_id"],
+            "[" + ",".join(repr(float(x)) for x in row["embedding"]) + "]",
+            json.dumps(row["meta_data"]),
+        ])
+    buffer.seek(0)
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            "COPY vector_db_rag (document_id, user_id, embedding, metadata) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def write_rows(db, rows: List[dict]) -> None:
+    bind = db.get_bind()
+    if bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2":
+        _copy_rows(db, rows)
+    else:
+        # Multi-row executemany (batched "insertmanyvalues")
+        db.execute(insert(VectorDBRAG), rows)
+
+
+# --------------------
+# Pipeline
+# --------------------
+def ingest_documents(
+    documents: Iterable[dict],
+    user_id: int,
+    embed_fn: Callable[[List[str]], List[List[float]]],
+    session_factory=SessionLocal,
+    checkpoint_path: Optional[str] = None,
+    embed_batch_size: int = EMBED_BATCH_SIZE,
+    commit_every: int = COMMIT_EVERY,
+    max_chars: int = CHUNK_MAX_CHARS,
+    overlap: int = CHUNK_OVERLAP_CHARS,
+) -> dict:
+    """
+    Streams documents into vector_db_rag. embed_fn takes a list of texts
+    and returns their vectors in order (e.g. embedding_service.embed_many).
+
+    Returns run metrics.
+    """
+    done = load_checkpoint(checkpoint_path)
+    metrics = {
+        "documents": 0,
+        "skipped_documents": 0,
+        "chunks": 0,
+        "embed_calls": 0,
+        "transactions": 0,
+        "seconds": 0.0,
+    }
+    started = time.perf_counter()
+
+    pending_texts: List[str] = []   # chunks waiting for an embedding call
+    pending_meta: List[dict] = []
+    rows: List[dict] = []           # embedded, waiting for the next commit
+    row_documents: List[str] = []   # documents complete in `rows`
+
+    def embed_pending():
+        if not pending_texts:
+            return
+        vectors = embed_fn(pending_texts)
+        metrics["embed_calls"] += 1
+        for vector, meta in zip(vectors, pending_meta):
+            rows.append({
+                "document_id": uuid.uuid4(),
+                "user_id": user_id,
+                "embedding": vector,
+                "meta_data": meta,
+            })
+        pending_texts.clear()
+        pending_meta.clear()
+
+    def flush():
+        embed_pending()
+        if not rows:
+            return
+        with session_factory() as db:
+            write_rows(db, rows)
+            db.commit()
+        _append_checkpoint(checkpoint_path, row_documents)
+
+        metrics["transactions"] += 1
+        metrics["chunks"] += len(rows)
+        logger.info(f"📥 Ingested {metrics['chunks']} chunks ({metrics['documents']} documents)")
+        rows.clear()
+        row_documents.clear()
+
+    for document in documents:
+        source_id = str(document["id"])
+        if source_id in done:
+            metrics["skipped_documents"] += 1
+            continue
+
+        base_meta = document.get("metadata") or {}
+        for index, chunk in enumerate(chunk_text(document["text"], max_chars, overlap)):
+            pending_texts.append(chunk)
+            pending_meta.append({**base_meta, "source_id": source_id, "chunk": index, "text": chunk})
+            if len(pending_texts) >= embed_batch_size:
+                embed_pending()
+
+        row_documents.append(source_id)
+        metrics["documents"] += 1
+
+        # Commit only between documents
+        if len(rows) + len(pending_texts) >= commit_every:
+            flush()
+
+    flush()
+
+    # Bulk writes bypass store_embedding's incremental index update
+    vector_index.invalidate(user_id)
+    lexical_index.invalidate(user_id)
+    corpus_presence.invalidate(user_id)
+
+    metrics["seconds"] = time.perf_counter() - started
+    return metrics
+
+
+def main(argv=None):
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(message)s",
+    )
+
+    parser = argparse.ArgumentParser(description="Bulk-ingest documents into vector_db_rag")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--checkpoint", help="file of completed document ids (resume)")
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE)
+    parser.add_argument("--commit-every", type=int, default=COMMIT_EVERY)
+    args = parser.parse_args(argv)
+
+    from digital_human.llm.embeddings import embedding_service
+
+    # Cached by content hash: re-ingesting unchanged chunks costs no API calls
+    metrics = ingest_documents(
+        read_documents(args.paths),
+        user_id=args.user_id,
+        embed_fn=embedding_service.embed_many,
+        checkpoint_path=args.checkpoint,
+        embed_batch_size=args.batch_size,
+        commit_every=args.commit_every,
+    )
+    print(json.dumps(metrics))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
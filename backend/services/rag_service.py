@@ -1,5 +1,44 @@
+import os
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, literal_column, select, text
 from sqlalchemy.orm import Session
-from models import VectorDBRAG
+from database import SessionLocal
+from models import VectorDBRAG, FTS_DOCUMENT_SQL
+from services.vector_index import corpus_presence, vector_index, use_vector_index
+from services.lexical_index import lexical_index
+
+logger = logging.getLogger("rag_service")
+
+# HNSW candidate list per query: higher = better recall, slower search
+RAG_HNSW_EF_SEARCH = int(os.getenv("RAG_HNSW_EF_SEARCH", "64"))
+
+# Reciprocal-rank fusion constant (Cormack et al.: 60)
+RAG_RRF_K = int(os.getenv("RAG_RRF_K", "60"))
+# Candidates fetched from EACH sub-query before fusion
+RAG_HYBRID_CANDIDATES = int(os.getenv("RAG_HYBRID_CANDIDATES", "20"))
+RAG_HYBRID = os.getenv("RAG_HYBRID", "1") == "1"
+
+# The HNSW index covers every user's chunks and user_id is applied AFTER
+# the ef_search candidates are found, so a user with a small corpus can
+# get fewer than k rows. pgvector >= 0.8 fixes this with iterative scans
+# (keep scanning until k rows pass the filter):
+#   auto (default): relaxed_order when the installed pgvector is >= 0.8,
+#                   otherwise off
+#   relaxed_order / strict_order: always (requires pgvector >= 0.8)
+#   off: never
+# Without iterative scans a short result is re-queried exactly (see
+# search_similar), so recall never silently drops.
+RAG_HNSW_ITERATIVE_SCAN = os.getenv("RAG_HNSW_ITERATIVE_SCAN", "auto") or "off"
+if RAG_HNSW_ITERATIVE_SCAN not in ("auto", "off", "relaxed_order", "strict_order"):
+    raise ValueError(f"Invalid RAG_HNSW_ITERATIVE_SCAN: {RAG_HNSW_ITERATIVE_SCAN}")
+
+# engine URL -> iterative scan mode resolved for "auto"
+_iterative_scan_modes: dict = {}
+
+
 def store_embedding(
     db: Session,
     user_id: int,
@@ -14,6 +53,10 @@ def store_embedding(
     db.add(doc)
     db.commit()
     db.refresh(doc)
+
+    vector_index.on_store(user_id, doc.document_id, embedding, metadata)
+    lexical_index.on_store(user_id, doc.document_id, metadata)
+    corpus_presence.on_store(user_id)
     return doc
 def get_user_embeddings(db: Session, user_id: int):
     return (
@@ -21,3 +64,265 @@ def get_user_embeddings(db: Session, user_id: int):
         .filter(VectorDBRAG.user_id == user_id)
         .all()
     )
+
+
+def search_similar_query(user_id: int, query_embedding, k: int = 5, metric: str = "cosine"):
+    """
+    Top-k statement for one user; ORDER BY distance LIMIT k is what lets
+    Postgres answer from the HNSW index instead of scanning the corpus.
+    """
+    if metric == "cosine":
+        distance = VectorDBRAG.embedding.cosine_distance(query_embedding)
+    elif metric == "l2":
+        distance = VectorDBRAG.embedding.l2_distance(query_embedding)
+    else:
+        raise ValueError(f"Unknown metric: {metric}")
+
+    return (
+        select(
+            VectorDBRAG.document_id,
+            VectorDBRAG.meta_data,
+            distance.label("distance"),
+        )
+        .where(VectorDBRAG.user_id == user_id)
+        .order_by(distance)
+        .limit(k)
+    )
+
+
+def _version_tuple(version: str) -> tuple:
+    return tuple(int(part) for part in version.split(".")[:2] if part.isdigit())
+
+
+def hnsw_iterative_scan(db: Session) -> str:
+    """
+    The hnsw.iterative_scan mode for this database (Postgres only);
+    "auto" checks the installed pgvector once per engine.
+    """
+    if RAG_HNSW_ITERATIVE_SCAN != "auto":
+        return RAG_HNSW_ITERATIVE_SCAN
+
+    key = str(db.get_bind().url)
+    if key not in _iterative_scan_modes:
+        version = db.execute(
+            text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+        ).scalar()
+        supported = bool(version) and _version_tuple(version) >= (0, 8)
+        _iterative_scan_modes[key] = "relaxed_order" if supported else "off"
+        if not supported:
+            logger.warning(
+                f"⚠️ pgvector {version} has no iterative HNSW scans (needs >= 0.8): "
+                f"short top-k results are re-queried exactly"
+            )
+    return _iterative_scan_modes[key]
+
+
+def search_similar(
+    db: Session,
+    user_id: int,
+    query_embedding: list[float],
+    k: int = 5,
+    metric: str = "cosine",
+) -> list[dict]:
+    """
+    Returns the k nearest chunks of a user's corpus, nearest first:
+    [{"document_id", "metadata", "distance"}, ...]
+
+    The HNSW index only serves cosine distance (vector_cosine_ops);
+    metric="l2" is exact and scans the user's rows.
+
+    Cosine queries go to the in-process index (services/vector_index.py)
+    on SQLite, and also on Postgres when RAG_VECTOR_INDEX=always.
+    """
+    if metric == "cosine" and use_vector_index(db):
+        return vector_index.search(db, user_id, query_embedding, k)
+
+    statement = search_similar_query(user_id, query_embedding, k, metric)
+    scan = "off"
+    if db.get_bind().dialect.name == "postgresql":
+        scan = hnsw_iterative_scan(db)
+        # SET LOCAL: scoped to this transaction (values are ints / a fixed enum)
+        db.execute(text(f"SET LOCAL hnsw.ef_search = {max(RAG_HNSW_EF_SEARCH, k)}"))
+        if scan != "off":
+            db.execute(text(f"SET LOCAL hnsw.iterative_scan = {scan}"))
+
+    rows = db.execute(statement).all()
+
+    if scan == "off" and metric == "cosine" and len(rows) < k and db.get_bind().dialect.name == "postgresql":
+        # The post-filtered index scan may have run out of this user's
+        # rows: answer exactly from the user_id index instead
+        logger.info(f"🔁 HNSW returned {len(rows)}/{k} rows, re-querying exactly | user_id={user_id}")
+        db.execute(text("SET LOCAL enable_indexscan = off"))
+        rows = db.execute(statement).all()
+
+    results = [
+        {
+            "document_id": row.document_id,
+            "metadata": row.meta_data,
+            "distance": float(row.distance),
+        }
+        for row in rows
+    ]
+    # relaxed_order may return slightly out-of-order rows
+    results.sort(key=lambda r: r["distance"])
+    return results
+
+
+def search_lexical_query(user_id: int, query: str, k: int = 5):
+    """
+    Full-text top-k; the tsvector expression matches the GIN index.
+    """
+    document = literal_column(FTS_DOCUMENT_SQL)
+    tsquery = func.websearch_to_tsquery(literal_column("'english'"), query)
+    rank = func.ts_rank_cd(document, tsquery)
+
+    return (
+        select(VectorDBRAG.document_id, VectorDBRAG.meta_data, rank.label("score"))
+        .where(VectorDBRAG.user_id == user_id)
+        .where(document.op("@@")(tsquery))
+        .order_by(rank.desc())
+        .limit(k)
+    )
+
+
+def search_lexical(db: Session, user_id: int, query: str, k: int = 5) -> list[dict]:
+    """
+    Keyword top-k: [{"document_id", "metadata", "score"}], best first.
+    Postgres full-text search, or in-process BM25 (services/lexical_index.py)
+    wherever the vector index runs in-process too.
+    """
+    if use_vector_index(db):
+        return lexical_index.search(db, user_id, query, k)
+
+    rows = db.execute(search_lexical_query(user_id, query, k)).all()
+    return [
+        {"document_id": row.document_id, "metadata": row.meta_data, "score": float(row.score)}
+        for row in rows
+    ]
+
+
+def reciprocal_rank_fusion(result_lists: list[list[dict]], k: int = RAG_RRF_K) -> list[dict]:
+    """
+    Merges ranked lists by sum(1 / (k + rank)); only ranks matter, so
+    cosine distances and BM25 / ts_rank scores never need calibrating.
+    """
+    fused = {}
+    for results in result_lists:
+        for rank, hit in enumerate(results, start=1):
+            entry = fused.setdefault(hit["document_id"], {**hit, "score": 0.0})
+            entry["score"] += 1.0 / (k + rank)
+
+    return sorted(fused.values(), key=lambda hit: hit["score"], reverse=True)
+
+
+# Sub-queries of one hybrid search run side by side, each on its own session
+_hybrid_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hybrid")
+
+
+def _vector_search(user_id: int, query_embedding: list[float], k: int) -> list[dict]:
+    with SessionLocal() as db:
+        return search_similar(db, user_id, query_embedding, k)
+
+
+def _vector_hits(user_id: int, query: str, k: int) -> list[dict]:
+    from digital_human.llm.embeddings import embedding_service
+
+    return _vector_search(user_id, embedding_service.embed(query), k)
+
+
+async def _avector_hits(user_id: int, query: str, k: int) -> list[dict]:
+    from digital_human.llm.embeddings import embedding_service
+
+    # aembed: concurrent queries share one (micro-batched) API call
+    query_embedding = await embedding_service.aembed(query)
+    return await asyncio.to_thread(_vector_search, user_id, query_embedding, k)
+
+
+def _lexical_hits(user_id: int, query: str, k: int) -> list[dict]:
+    with SessionLocal() as db:
+        return search_lexical(db, user_id, query, k)
+
+
+def hybrid_search(user_id: int, query: str, k: int = 5) -> list[dict]:
+    """
+    Vector (embed + ANN) and lexical search run concurrently, then RRF.
+    """
+    candidates = max(k, RAG_HYBRID_CANDIDATES)
+    vector = _hybrid_executor.submit(_vector_hits, user_id, query, candidates)
+    lexical = _hybrid_executor.submit(_lexical_hits, user_id, query, candidates)
+
+    return reciprocal_rank_fusion([vector.result(), lexical.result()])[:k]
+
+
+async def ahybrid_search(user_id: int, query: str, k: int = 5) -> list[dict]:
+    """
+    Async variant of hybrid_search (the embedding goes through aembed).
+    """
+    candidates = max(k, RAG_HYBRID_CANDIDATES)
+    vector, lexical = await asyncio.gather(
+        _avector_hits(user_id, query, candidates),
+        asyncio.to_thread(_lexical_hits, user_id, query, candidates),
+    )
+
+    return reciprocal_rank_fusion([vector, lexical])[:k]
+
+
+def _has_documents(user_id: int) -> bool:
+    present = corpus_presence.peek(user_id)
+    if present is not None:
+        return present
+    with SessionLocal() as db:
+        return corpus_presence.has_documents(db, user_id)
+
+
+def retrieve_documents(user_id: int, query: str, k: int = 5) -> list[dict]:
+    """
+    Retriever registered with digital_human.integrations (see main.py):
+    returns the user's top-k chunks as [{"content", "metadata", "score"}],
+    best first. Hybrid (RRF) unless RAG_HYBRID=0.
+
+    Users without any chunks return [] before the query is embedded.
+    """
+    if not _has_documents(user_id):
+        return []
+
+    if RAG_HYBRID:
+        hits = hybrid_search(user_id, query, k)
+    else:
+        hits = _distance_scored(_vector_hits(user_id, query, k))
+
+    return _documents(hits)
+
+
+async def aretrieve_documents(user_id: int, query: str, k: int = 5) -> list[dict]:
+    """
+    Async retriever (integrations.register_async_retriever); same results
+    as retrieve_documents.
+    """
+    present = corpus_presence.peek(user_id)
+    if present is None:
+        present = await asyncio.to_thread(_has_documents, user_id)
+    if not present:
+        return []
+
+    if RAG_HYBRID:
+        hits = await ahybrid_search(user_id, query, k)
+    else:
+        hits = _distance_scored(await _avector_hits(user_id, query, k))
+
+    return _documents(hits)
+
+
+def _distance_scored(hits: list[dict]) -> list[dict]:
+    return [{**hit, "score": 1.0 - hit["distance"]} for hit in hits]
+
+
+def _documents(hits: list[dict]) -> list[dict]:
+    return [
+        {
+            "content": (hit["metadata"] or {}).get("text"),
+            "metadata": hit["metadata"],
+            "score": hit["score"],
+        }
+        for hit in hits
+    ]
@@ -0,0 +1,95 @@
+"""
+Rolling conversation summaries.
+
+After each turn, messages that have fallen out of the token-budgeted
+history window are folded into ChatSession.summary. The fold is
+incremental: only messages newer than ChatSession.summarized_until are
+sent, so the summary is never recomputed from scratch.
+"""
+import logging
+from sqlalchemy.orm import Session
+
+from database import AsyncSessionLocal
+from models import ChatSession, ChatMessage
+from constants import HISTORY_TOKEN_BUDGET, HISTORY_MAX_MESSAGES
+from services.chat_services import load_history_window
+from digital_human.agents.summary_agent.agent import asummarize_messages
+
+logger = logging.getLogger("summary")
+
+# Upper bound on messages folded per turn; any backlog is folded next turn
+SUMMARY_MAX_FOLD = 40
+
+# Sessions with a fold in flight (one fold per session at a time)
+_in_flight = set()
+
+
+def messages_to_fold(db: Session, session: ChatSession, limit: int = SUMMARY_MAX_FOLD):
+    """
+    Messages older than the current history window that are not yet
+    part of the summary, oldest first.
+    """
+    window = load_history_window(
+        db, session.session_id, HISTORY_TOKEN_BUDGET, HISTORY_MAX_MESSAGES
+    )
+
+    query = db.query(
+        ChatMessage.role,
+        ChatMessage.content,
+        ChatMessage.created_at,
+    ).filter(ChatMessage.session_id == session.session_id)
+
+    if window:
+        query = query.filter(ChatMessage.created_at < window[0].created_at)
+
+    if session.summarized_until is not None:
+        query = query.filter(ChatMessage.created_at > session.summarized_until)
+
+    return query.order_by(ChatMessage.created_at.asc()).limit(limit).all()
+
+
+async def update_session_summary(session_id, session_factory=AsyncSessionLocal):
+    """
+    Background task run after a turn; never on the response path.
+
+    session_factory is passed by the caller so the fold shares the
+    request path's engine and pool.
+    """
+    if session_id in _in_flight:
+        return
+    _in_flight.add(session_id)
+
+    try:
+        async with session_factory() as db:
+            session = await db.get(ChatSession, session_id)
+            if session is None:
+                return
+
+            pending = await db.run_sync(lambda sync_db: messages_to_fold(sync_db, session))
+            if not pending:
+                return
+
+            # Release the connection while the LLM runs
+            await db.commit()
+
+            summary = await asummarize_messages(
+                session.summary,
+                [{"role": m.role, "content": m.content} for m in pending],
+            )
+
+            session.summary = summary
+            session.summarized_until = pending[-1].created_at
+            await db.commit()
+
+        logger.info(
+            f"📝 Session summary updated | session_id={session_id} | folded={len(pending)}"
+        )
+
+    except Exception as e:
+        logger.error(
+            f"❌ Session summary failed | session_id={session_id} | error={str(e)}",
+            exc_info=True
+        )
+
+    finally:
+        _in_flight.discard(session_id)
@@ -0,0 +1,234 @@
+"""
+In-process per-user vector index for VectorDBRAG rows.
+
+Each user's embeddings live in one contiguous, L2-normalised float32
+matrix, so a top-k query is a single matrix-vector product plus
+argpartition. Indexes are built lazily on the first search, extended
+in place by store_embedding, and evicted LRU (with a TTL that bounds
+staleness when other processes write to the same user).
+
+Serves SQLite / dev deployments, and optionally acts as a hot cache in
+front of pgvector (RAG_VECTOR_INDEX=always).
+"""
+import os
+import threading
+from typing import Any, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from digital_human.cache import TTLCache
+from models import VectorDBRAG
+
+# auto   -> only where pgvector is unavailable (SQLite)
+# always -> also in front of Postgres
+# off    -> never
+RAG_VECTOR_INDEX = os.getenv("RAG_VECTOR_INDEX", "auto")
+RAG_VECTOR_INDEX_MAX_USERS = int(os.getenv("RAG_VECTOR_INDEX_MAX_USERS", "256"))
+RAG_VECTOR_INDEX_TTL_SECONDS = float(os.getenv("RAG_VECTOR_INDEX_TTL_SECONDS", "600"))
+# How long "this user has no chunks" is trusted when another process may
+# be ingesting for them
+RAG_CORPUS_PRESENCE_TTL_SECONDS = float(os.getenv("RAG_CORPUS_PRESENCE_TTL_SECONDS", "60"))
+RAG_CORPUS_PRESENCE_MAX_USERS = int(os.getenv("RAG_CORPUS_PRESENCE_MAX_USERS", "10000"))
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class UserVectorIndex:
+    """
+    Cosine top-k over one user's chunks. Rows are appended into a
+    pre-allocated matrix that doubles when full (amortised O(1) add).
+    """
+
+    def __init__(self, dim: int, capacity: int = 64):
+        self.dim = dim
+        self._matrix = np.empty((max(capacity, 1), dim), dtype=np.float32)
+        self._size = 0
+        self.document_ids: List[Any] = []
+        self.metadata: List[Optional[dict]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add_many(self, document_ids, embeddings, metadata) -> None:
+        rows = _normalize(np.asarray(embeddings, dtype=np.float32).reshape(-1, self.dim))
+        with self._lock:
+            needed = self._size + len(rows)
+            if needed > len(self._matrix):
+                grown = np.empty((max(needed, 2 * len(self._matrix)), self.dim), dtype=np.float32)
+                grown[:self._size] = self._matrix[:self._size]
+                self._matrix = grown
+
+            self._matrix[self._size:needed] = rows
+            self._size = needed
+            self.document_ids.extend(document_ids)
+            self.metadata.extend(metadata)
+
+    def add(self, document_id, embedding, metadata: Optional[dict] = None) -> None:
+        self.add_many([document_id], [embedding], [metadata])
+
+    def search(self, query_embedding, k: int = 5) -> List[dict]:
+        """
+        Same result shape as rag_service.search_similar (cosine distance).
+        """
+        with self._lock:
+            n = self._size
+            matrix = self._matrix[:n]
+            ids, meta = self.document_ids[:n], self.metadata[:n]
+
+        if n == 0 or k <= 0:
+            return []
+
+        query = _normalize(np.asarray(query_embedding, dtype=np.float32))
+        scores = matrix @ query
+
+        k = min(k, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            {
+                "document_id": ids[i],
+                "metadata": meta[i],
+                "distance": float(1.0 - scores[i]),
+            }
+            for i in top
+        ]
+
+
+def load_user_vectors(db: Session, user_id: int):
+    """
+    Columns only (no ORM objects): (document_ids, embeddings, metadata).
+    """
+    rows = db.execute(
+        select(VectorDBRAG.document_id, VectorDBRAG.embedding, VectorDBRAG.meta_data)
+        .where(VectorDBRAG.user_id == user_id)
+    ).all()
+
+    return (
+        [row.document_id for row in rows],
+        [row.embedding for row in rows],
+        [row.meta_data for row in rows],
+    )
+
+
+class VectorIndexCache:
+    """
+    LRU (+TTL) of per-user indexes.
+    """
+
+    def __init__(
+        self,
+        max_users: int = RAG_VECTOR_INDEX_MAX_USERS,
+        ttl_seconds: Optional[float] = RAG_VECTOR_INDEX_TTL_SECONDS,
+    ):
+        self._indexes = TTLCache(max_size=max_users, ttl_seconds=ttl_seconds)
+        self._build_lock = threading.Lock()
+
+    def get(self, db: Session, user_id: int) -> Optional[UserVectorIndex]:
+        index = self._indexes.get(user_id)
+        if index is not None:
+            return index
+
+        # One build per user at a time; others wait and reuse it
+        with self._build_lock:
+            index = self._indexes.get(user_id)
+            if index is not None:
+                return index
+
+            ids, embeddings, metadata = load_user_vectors(db, user_id)
+            if not ids:
+                return None
+
+            index = UserVectorIndex(dim=len(embeddings[0]), capacity=len(ids))
+            index.add_many(ids, embeddings, metadata)
+            self._indexes.set(user_id, index)
+            return index
+
+    def search(self, db: Session, user_id: int, query_embedding, k: int = 5) -> List[dict]:
+        index = self.get(db, user_id)
+        return index.search(query_embedding, k) if index is not None else []
+
+    def on_store(self, user_id: int, document_id, embedding, metadata: Optional[dict]) -> None:
+        """
+        Incremental update; users without a built index are left to
+        the next lazy build.
+        """
+        index = self._indexes.get(user_id)
+        if index is not None:
+            index.add(document_id, embedding, metadata)
+
+    def invalidate(self, user_id: int) -> None:
+        self._indexes.delete(user_id)
+
+    def clear(self) -> None:
+        self._indexes.clear()
+
+    @property
+    def stats(self) -> dict:
+        return self._indexes.stats
+
+
+vector_index = VectorIndexCache()
+
+
+class CorpusPresenceCache:
+    """
+    user_id -> whether the user has any VectorDBRAG rows. Retrieval
+    checks it before embedding the query, so users without a corpus
+    never cost an embedding API call.
+    """
+
+    def __init__(
+        self,
+        max_users: int = RAG_CORPUS_PRESENCE_MAX_USERS,
+        ttl_seconds: Optional[float] = RAG_CORPUS_PRESENCE_TTL_SECONDS,
+    ):
+        self._presence = TTLCache(max_size=max_users, ttl_seconds=ttl_seconds)
+
+    def peek(self, user_id: int) -> Optional[bool]:
+        """
+        Cached flag, or None when it has to be loaded.
+        """
+        return self._presence.get(user_id)
+
+    def has_documents(self, db: Session, user_id: int) -> bool:
+        present = self._presence.get(user_id)
+        if present is None:
+            present = db.execute(
+                select(VectorDBRAG.document_id)
+                .where(VectorDBRAG.user_id == user_id)
+                .limit(1)
+            ).first() is not None
+            self._presence.set(user_id, present)
+        return present
+
+    def on_store(self, user_id: int) -> None:
+        self._presence.set(user_id, True)
+
+    def invalidate(self, user_id: int) -> None:
+        self._presence.delete(user_id)
+
+    def clear(self) -> None:
+        self._presence.clear()
+
+    @property
+    def stats(self) -> dict:
+        return self._presence.stats
+
+
+corpus_presence = CorpusPresenceCache()
+
+
+def use_vector_index(db: Session) -> bool:
+    if RAG_VECTOR_INDEX == "off":
+        return False
+    if RAG_VECTOR_INDEX == "always":
+        return True
+    return db.get_bind().dialect.name != "postgresql"
@@ -0,0 +1,89 @@
+import os
+import asyncio
+import tempfile
+
+# database.py / utils.py read these at import time
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.gettempdir(), "digital_human_test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+# Bind `services` to the backend package now: once digital_human/ is on
+# sys.path (its tests import `graph.*`), digital_human/services.py would
+# shadow it
+import services.memory_service  # noqa: F401
+from database import Base, engine, SessionLocal, ASYNC_DATABASE_URL, async_engine
+from models import User, UserConfig, ChatSession, ChatMessage, MemoryStore, VectorDBRAG
+import auth
+import chat
+import constants
+from services.vector_index import corpus_presence, vector_index
+from services.lexical_index import lexical_index
+from services.memory_service import memory_cache
+from services.memory_queue import memory_write_queue
+
+SQLITE_TABLES = [
+    User.__table__,
+    UserConfig.__table__,
+    ChatSession.__table__,
+    ChatMessage.__table__,
+    MemoryStore.__table__,
+    VectorDBRAG.__table__,
+]
+
+TEST_USER_ID = 1
+
+
+@pytest.fixture
+def db_tables():
+    Base.metadata.create_all(bind=engine, tables=SQLITE_TABLES)
+    constants.USER_CONFIG_CACHE.clear()
+    vector_index.clear()
+    corpus_presence.clear()
+    lexical_index.clear()
+    memory_cache.clear()
+    memory_write_queue.clear()
+
+    db = SessionLocal()
+    # SQLite only autoincrements INTEGER keys, so BIGINT ids are explicit
+    db.add(User(user_id=TEST_USER_ID, email="user@example.com", password_hash="x"))
+    db.add(UserConfig(config_id=TEST_USER_ID, user_id=TEST_USER_ID))
+    db.commit()
+    db.close()
+
+    yield TEST_USER_ID
+
+    Base.metadata.drop_all(bind=engine, tables=SQLITE_TABLES)
+
+
+@pytest.fixture
+def app(db_tables):
+    app = FastAPI()
+    app.include_router(chat.router)
+    app.dependency_overrides[auth.get_current_user] = lambda: TEST_USER_ID
+    return app
+
+
+@pytest.fixture
+def client(app):
+    with TestClient(app) as test_client:
+        yield test_client
+        # Routes use the global async engine; close its pooled aiosqlite
+        # connections (non-daemon threads) on the loop that opened them.
+        test_client.portal.call(async_engine.dispose)
+
+
+@pytest.fixture
+def async_session_factory(db_tables):
+    """
+    Async sessions on a per-test engine. The engine is disposed on
+    teardown so no aiosqlite worker thread outlives the test.
+    """
+    test_engine = create_async_engine(ASYNC_DATABASE_URL)
+    yield async_sessionmaker(bind=test_engine, expire_on_commit=False)
+    asyncio.run(test_engine.dispose())
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import admin
+import auth
+from digital_human import routing
+
+
+@pytest.fixture
+def admin_client(monkeypatch, tmp_path):
+    active = routing.get_routing()
+    path = tmp_path / "routing.json"
+    path.write_text(json.dumps({"version": "w18"}))
+    monkeypatch.setattr(routing, "ROUTING_CONFIG_PATH", str(path))
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+
+    app = FastAPI()
+    app.include_router(admin.router)
+    app.dependency_overrides[auth.get_current_user] = lambda: 1
+    with TestClient(app) as client:
+        yield client, path
+    routing.configure_routing(active)
+
+
+def test_requires_the_admin_token(admin_client, monkeypatch):
+    client, _ = admin_client
+
+    assert client.post("/admin/routing/reload").status_code == 403
+    assert client.post("/admin/routing/reload", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", None)
+    assert client.get("/admin/routing", headers={"X-Admin-Token": ""}).status_code == 403
+
+
+def test_reload_swaps_the_config(admin_client):
+    client, path = admin_client
+    headers = {"X-Admin-Token": "secret"}
+
+    response = client.post("/admin/routing/reload", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["version"] == "w18"
+    assert client.get("/admin/routing", headers=headers).json()["version"] == "w18"
+
+    path.write_text("{broken")
+    assert client.post("/admin/routing/reload", headers=headers).status_code == 422
+    assert routing.get_routing().version == "w18"
+
+
+def test_chat_reports_the_routing_version(client, fake_openai):
+    response = client.post("/chat", json={"message": "hello"})
+
+    assert response.json()["routing_version"] == routing.get_routing().version
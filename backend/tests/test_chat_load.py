@@ -0,0 +1,110 @@
+"""
+Load test: a slow fake LLM must not exhaust a small connection pool.
+
+POST /chat holds a pooled connection only for its two short
+transactions, never for the LLM call in between.
+"""
+import time
+import asyncio
+
+import httpx
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+import chat
+from database import ASYNC_DATABASE_URL
+
+LLM_LATENCY = 0.3
+CONCURRENT_CHATS = 20
+POOL_SIZE = 2
+
+
+async def slow_agents(user_input, chat_history=None, token_budget=4000, stream=False, **kwargs):
+    await asyncio.sleep(LLM_LATENCY)
+    return {"response": f"echo: {user_input}", "memory_intent": None, "rag_used": False}
+
+
+def _small_pool_engine():
+    engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_size=POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=1,
+    )
+    usage = {"checked_out": 0, "peak": 0}
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def on_checkout(*args):
+        usage["checked_out"] += 1
+        usage["peak"] = max(usage["peak"], usage["checked_out"])
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def on_checkin(*args):
+        usage["checked_out"] -= 1
+
+    return engine, usage
+
+
+def test_pool_does_not_saturate_under_slow_llm(app, monkeypatch):
+    engine, usage = _small_pool_engine()
+    monkeypatch.setattr(chat, "AsyncSessionLocal", async_sessionmaker(bind=engine, expire_on_commit=False))
+    monkeypatch.setattr(chat, "arun_digital_human_chat", slow_agents)
+
+    # The post-turn summary fold is DB-only here (nothing falls out of the
+    # window) but would add SQLite write contention to the timing bound.
+    summary_calls = []
+
+    async def record_summary(session_id, session_factory):
+        summary_calls.append(session_factory)
+
+    monkeypatch.setattr(chat, "update_session_summary", record_summary)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            started = time.perf_counter()
+            responses = await asyncio.gather(*(
+                client.post("/chat", json={"message": f"question {i}"})
+                for i in range(CONCURRENT_CHATS)
+            ))
+            elapsed = time.perf_counter() - started
+        await engine.dispose()
+        return responses, elapsed
+
+    responses, elapsed = asyncio.run(run())
+
+    assert [r.status_code for r in responses] == [200] * CONCURRENT_CHATS
+    assert usage["peak"] <= POOL_SIZE
+    assert len(summary_calls) == CONCURRENT_CHATS
+    assert all(factory is chat.AsyncSessionLocal for factory in summary_calls)
+
+    # Holding a connection per chat would serialise the LLM calls:
+    # CONCURRENT_CHATS / POOL_SIZE * LLM_LATENCY = 3s (and time out first).
+    assert elapsed < CONCURRENT_CHATS / POOL_SIZE * LLM_LATENCY / 2
+
+
+def test_holding_connection_across_llm_call_saturates_pool(db_tables):
+    """
+    Baseline for the test above: the old lifecycle (one session kept open
+    across the LLM call) exhausts the same pool.
+    """
+    engine, usage = _small_pool_engine()
+    Session = async_sessionmaker(bind=engine)
+
+    async def old_style_turn():
+        async with Session() as db:
+            await db.execute(select(1))
+            await asyncio.sleep(LLM_LATENCY * 5)  # pool_timeout is 1s
+
+    async def run():
+        results = await asyncio.gather(
+            *(old_style_turn() for _ in range(CONCURRENT_CHATS)),
+            return_exceptions=True,
+        )
+        await engine.dispose()
+        return results
+
+    results = asyncio.run(run())
+
+    assert usage["peak"] == POOL_SIZE
+    assert any(isinstance(r, Exception) for r in results)
@@ -0,0 +1,67 @@
+import json
+import asyncio
+
+import chat
+from database import SessionLocal
+from models import ChatMessage, ChatSession
+from digital_human.graph.state import AgentState
+from digital_human.agents.responder_agent.agent import aresponder_stream
+
+
+def _parse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def _messages(role):
+    db = SessionLocal()
+    try:
+        return [m.content for m in db.query(ChatMessage).filter(ChatMessage.role == role).all()]
+    finally:
+        db.close()
+
+
+def test_stream_forwards_tokens_and_persists_answer(client, fake_openai):
+    fake_openai.reply = "Redis persists data."
+
+    response = client.post("/chat/stream", json={"message": {"content": "Explain Redis"}})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = _parse_events(response.text)
+    assert [e for e, _ in events] == ["meta", "token", "token", "token", "done"]
+    assert "".join(d["content"] for e, d in events if e == "token") == "Redis persists data."
+
+    assert _messages("user") == ["Explain Redis"]
+    assert _messages("assistant") == ["Redis persists data."]
+    assert len(fake_openai.responder_calls()) == 1
+    assert fake_openai.async_completions.streams[0].closed
+
+
+def test_stream_disconnect_closes_upstream_without_persisting(db_tables, fake_openai):
+    user_id = db_tables
+    fake_openai.reply = "a b c"
+
+    db = SessionLocal()
+    session = ChatSession(user_id=user_id, session_title="t")
+    db.add(session)
+    db.commit()
+    session_id = session.session_id
+    db.close()
+
+    state = AgentState(request_id="1", user_input="hi", chat_history=[], token_budget=4000)
+
+    async def consume_then_disconnect():
+        events = chat._stream_events(user_id, session_id, {"stream": aresponder_stream(state)})
+        await events.__anext__()  # meta
+        await events.__anext__()  # first token
+        await events.aclose()
+
+    asyncio.run(consume_then_disconnect())
+
+    assert fake_openai.async_completions.streams[0].closed
+    assert _messages("assistant") == []
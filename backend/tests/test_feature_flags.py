@@ -0,0 +1,54 @@
+import chat
+from constants import USER_CONFIG_CACHE
+from database import SessionLocal
+from models import ChatMessage, ChatSession, UserConfig
+
+
+def _seed_session(user_id):
+    db = SessionLocal()
+    session = ChatSession(user_id=user_id, session_title="t", summary="Earlier: talked about Redis.")
+    db.add(session)
+    db.flush()
+    db.add(ChatMessage(session_id=session.session_id, role="user", content="old question"))
+    db.commit()
+    session_id = str(session.session_id)
+    db.close()
+    return session_id
+
+
+def _set_flag(user_id, **flags):
+    db = SessionLocal()
+    db.query(UserConfig).filter(UserConfig.user_id == user_id).update(flags)
+    db.commit()
+    db.close()
+    USER_CONFIG_CACHE.clear()
+
+
+def _responder_text(fake_openai):
+    messages = fake_openai.responder_calls()[0]["messages"]
+    return " ".join(m["content"] for m in messages)
+
+
+def test_history_is_replayed_when_enabled(client, db_tables, fake_openai, monkeypatch):
+    monkeypatch.setattr(chat, "update_session_summary", lambda *a: None)
+    session_id = _seed_session(db_tables)
+
+    response = client.post("/chat", json={"conversation_id": session_id, "message": "hi"})
+
+    assert response.status_code == 200
+    assert "old question" in _responder_text(fake_openai)
+    assert "Earlier: talked about Redis." in _responder_text(fake_openai)
+
+
+def test_disabled_history_skips_history_and_summary(client, db_tables, fake_openai, monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(chat, "update_session_summary", lambda *a: scheduled.append(a))
+    _set_flag(db_tables, enable_chat_history=False)
+    session_id = _seed_session(db_tables)
+
+    response = client.post("/chat", json={"conversation_id": session_id, "message": "hi"})
+
+    assert response.status_code == 200
+    assert "old question" not in _responder_text(fake_openai)
+    assert "Earlier: talked about Redis." not in _responder_text(fake_openai)
+    assert scheduled == []
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta, timezone
+
+from database import SessionLocal
+from models import ChatSession, ChatMessage
+from services.chat_services import load_history_window
+
+
+def _session_with_messages(user_id, token_counts):
+    db = SessionLocal()
+    session = ChatSession(user_id=user_id, session_title="long chat")
+    db.add(session)
+    db.flush()
+
+    start = datetime.now(timezone.utc) - timedelta(hours=1)
+    for i, tokens in enumerate(token_counts):
+        db.add(ChatMessage(
+            session_id=session.session_id,
+            role="user" if i % 2 == 0 else "assistant",
+            content=f"message {i}",
+            token_count=tokens,
+            created_at=start + timedelta(seconds=i),
+        ))
+    db.commit()
+    return db, session.session_id
+
+
+def test_window_keeps_newest_messages_within_budget(db_tables):
+    db, session_id = _session_with_messages(db_tables, [100] * 10)
+
+    window = load_history_window(db, session_id, token_budget=350)
+
+    assert [m.content for m in window] == ["message 7", "message 8", "message 9"]
+    db.close()
+
+
+def test_window_respects_row_limit(db_tables):
+    db, session_id = _session_with_messages(db_tables, [1] * 10)
+
+    window = load_history_window(db, session_id, token_budget=10_000, max_messages=4)
+
+    assert [m.content for m in window] == ["message 6", "message 7", "message 8", "message 9"]
+    db.close()
+
+
+def test_window_tokenizes_legacy_rows_without_token_count(db_tables):
+    db, session_id = _session_with_messages(db_tables, [None, None, None])
+
+    window = load_history_window(db, session_id, token_budget=10_000)
+
+    assert len(window) == 3
+    db.close()
@@ -0,0 +1,181 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from database import SessionLocal
+from digital_human.llm import embeddings
+from digital_human.llm.embeddings import EmbeddingService, FakeEmbedder
+from services import rag_service
+from services.lexical_index import BM25Index, tokenize
+from services.rag_service import (
+    reciprocal_rank_fusion,
+    search_lexical,
+    search_lexical_query,
+    search_similar,
+    store_embedding,
+)
+
+CORPUS = [
+    "Error ERR_CONN_RESET is raised when the upstream socket closes mid request",
+    "Error ERR_TLS_HANDSHAKE means the certificate chain could not be verified",
+    "To speed up the web app, enable response caching and gzip compression",
+    "Reduce page load time by lazy loading images and deferring scripts",
+    "Kafka partitions are replicated across brokers for durability",
+    "Postgres vacuum reclaims dead tuples and updates planner statistics",
+    "Rotate the API key from the dashboard if it leaks",
+    "Version v2.3.1 fixed the memory leak in the websocket handler",
+]
+
+# (query, index of the relevant chunk)
+QUERIES = [
+    ("ERR_CONN_RESET", 0),
+    ("what does ERR_TLS_HANDSHAKE mean", 1),
+    ("v2.3.1 release notes", 7),
+    ("make my website faster", 2),
+    ("my site is slow to load", 3),
+    ("how is kafka data kept safe", 4),
+]
+
+# Paraphrases an embedding model would place together; the bag-of-words
+# fake only sees them as related after this normalisation
+SYNONYMS = {
+    "website": "web", "site": "web", "faster": "speed", "slow": "speed",
+    "safe": "durability", "kept": "replicated", "load": "page",
+}
+
+
+class ParaphraseEmbedder(FakeEmbedder):
+    def vector(self, text):
+        words = [SYNONYMS.get(word, word) for word in text.lower().split()]
+        return super().vector(" ".join(words))
+
+
+@pytest.fixture
+def corpus(db_tables, monkeypatch):
+    embedder = ParaphraseEmbedder()
+    monkeypatch.setattr(embeddings, "embedding_service", EmbeddingService(embed_fn=embedder, cache_path=None))
+
+    db = SessionLocal()
+    ids = []
+    for text, vector in zip(CORPUS, embedder(CORPUS)):
+        ids.append(store_embedding(db, db_tables, vector, {"text": text}).document_id)
+    db.close()
+    return db_tables, ids, embedder
+
+
+def test_tokenize_keeps_identifiers_whole():
+    assert tokenize("Got ERR_CONN_RESET on v2.3.1 (0x80070005).") == [
+        "got", "err_conn_reset", "on", "v2.3.1", "0x80070005",
+    ]
+
+
+def test_bm25_ranks_exact_code_first():
+    index = BM25Index()
+    for i, text in enumerate(CORPUS):
+        index.add(i, text)
+
+    assert index.search("ERR_TLS_HANDSHAKE", k=3)[0]["document_id"] == 1
+    assert index.search("unrelated words", k=3) == []
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    vector = [{"document_id": "a"}, {"document_id": "b"}, {"document_id": "c"}]
+    lexical = [{"document_id": "b"}, {"document_id": "d"}]
+
+    fused = reciprocal_rank_fusion([vector, lexical], k=60)
+
+    assert [hit["document_id"] for hit in fused] == ["b", "a", "d", "c"]
+    assert fused[0]["score"] == pytest.approx(1 / 62 + 1 / 61)
+
+
+def test_lexical_query_uses_indexed_tsvector_expression():
+    sql = str(search_lexical_query(1, "ERR_CONN_RESET", 5).compile(dialect=postgresql.dialect()))
+
+    assert "to_tsvector('english', coalesce(metadata ->> 'text', ''))" in sql
+    assert "@@ websearch_to_tsquery('english'" in sql
+    assert "ts_rank_cd" in sql
+
+
+def test_store_embedding_updates_lexical_index(corpus):
+    user_id, _, embedder = corpus
+    db = SessionLocal()
+    assert search_lexical(db, user_id, "ERR_DISK_FULL", k=1) == []
+
+    text = "ERR_DISK_FULL appears when the volume has no space left"
+    row = store_embedding(db, user_id, embedder.vector(text), {"text": text})
+
+    assert search_lexical(db, user_id, "ERR_DISK_FULL", k=1)[0]["document_id"] == row.document_id
+    db.close()
+
+
+def _metrics(search, ids):
+    hits, reciprocal_ranks, latencies = 0, [], []
+    for query, relevant in QUERIES:
+        started = time.perf_counter()
+        ranked = [hit["document_id"] for hit in search(query)]
+        latencies.append(time.perf_counter() - started)
+
+        rank = ranked.index(ids[relevant]) + 1 if ids[relevant] in ranked else None
+        hits += rank is not None
+        reciprocal_ranks.append(1 / rank if rank else 0.0)
+
+    return {
+        "recall@3": hits / len(QUERIES),
+        "mrr": sum(reciprocal_ranks) / len(QUERIES),
+        "p50_ms": sorted(latencies)[len(latencies) // 2] * 1000,
+    }
+
+
+def test_hybrid_beats_either_retriever_alone(corpus):
+    user_id, ids, embedder = corpus
+    db = SessionLocal()
+
+    results = {
+        "vector": _metrics(lambda q: search_similar(db, user_id, embedder.vector(q), k=3), ids),
+        "lexical": _metrics(lambda q: search_lexical(db, user_id, q, k=3), ids),
+        "hybrid": _metrics(lambda q: rag_service.hybrid_search(user_id, q, k=3), ids),
+    }
+    db.close()
+
+    for name, metrics in results.items():
+        print(f"{name:8} recall@3={metrics['recall@3']:.2f} mrr={metrics['mrr']:.2f} p50={metrics['p50_ms']:.1f}ms")
+
+    for name in ("vector", "lexical"):
+        assert results["hybrid"]["recall@3"] >= results[name]["recall@3"]
+        assert results["hybrid"]["mrr"] >= results[name]["mrr"]
+    assert results["hybrid"]["recall@3"] == 1.0
+
+
+def test_concurrent_async_retrievals_share_one_embedding_call(corpus):
+    user_id, ids, embedder = corpus
+    calls_before = len(embedder.calls)
+
+    async def retrieve_all():
+        return await asyncio.gather(
+            *(rag_service.aretrieve_documents(user_id, query, k=3) for query, _ in QUERIES)
+        )
+
+    results = asyncio.run(retrieve_all())
+
+    assert len(embedder.calls) == calls_before + 1
+    assert sorted(embedder.calls[-1]) == sorted(query for query, _ in QUERIES)
+    assert results == [rag_service.retrieve_documents(user_id, query, k=3) for query, _ in QUERIES]
+
+
+def test_empty_corpus_skips_the_query_embedding(db_tables, monkeypatch):
+    embedder = ParaphraseEmbedder()
+    monkeypatch.setattr(embeddings, "embedding_service", EmbeddingService(embed_fn=embedder, cache_path=None))
+
+    assert rag_service.retrieve_documents(db_tables, "ERR_CONN_RESET", k=3) == []
+    assert asyncio.run(rag_service.aretrieve_documents(db_tables, "ERR_CONN_RESET", k=3)) == []
+    assert embedder.calls == []
+
+    db = SessionLocal()
+    store_embedding(db, db_tables, embedder([CORPUS[0]])[0], {"text": CORPUS[0]})
+    db.close()
+    embedder.calls.clear()
+
+    assert rag_service.retrieve_documents(db_tables, "ERR_CONN_RESET", k=3)[0]["content"] == CORPUS[0]
+    assert len(embedder.calls) == 1
@@ -0,0 +1,131 @@
+import asyncio
+
+from database import SessionLocal
+from models import MemoryStore
+from services.memory_action_executor import apply_memory_action
+from services.memory_queue import MemoryWriteQueue, memory_write_queue
+
+
+def _save(key, value, confidence=0.9):
+    return {"action": "save", "key": key, "value": value, "confidence": confidence}
+
+
+def _active(user_id):
+    db = SessionLocal()
+    try:
+        rows = db.query(MemoryStore).filter(MemoryStore.user_id == user_id, MemoryStore.is_active == True).all()
+        return {row.memory_type: row.memory_content for row in rows}
+    finally:
+        db.close()
+
+
+def test_coalesces_last_write_wins_per_memory_type(db_tables, async_session_factory):
+    queue = MemoryWriteQueue(async_session_factory)
+    queue.enqueue(db_tables, _save("goal", "learn rust"))
+    queue.enqueue(db_tables, _save("preference", "short answers"))
+    queue.enqueue(db_tables, _save("goal", "learn go"))
+
+    assert queue.pending == 2
+    assert asyncio.run(queue.flush()) == 2
+
+    assert _active(db_tables) == {"goal": "learn go", "preference": "short answers"}
+    assert queue.metrics["coalesced"] == 1
+    assert queue.metrics["batches"] == 1
+
+
+def test_forget_everything_drops_pending_writes(db_tables, async_session_factory):
+    queue = MemoryWriteQueue(async_session_factory)
+    queue.enqueue(db_tables, _save("goal", "learn rust"))
+    asyncio.run(queue.flush())
+
+    queue.enqueue(db_tables, _save("preference", "short answers"))
+    queue.enqueue(db_tables, {"action": "delete", "key": None})
+    queue.enqueue(db_tables, _save("pet", "a cat"))
+
+    assert queue.pending == 2
+    asyncio.run(queue.flush())
+    assert _active(db_tables) == {"pet": "a cat"}
+
+
+def test_one_transaction_per_batch(db_tables, async_session_factory):
+    queue = MemoryWriteQueue(async_session_factory, batch_size=2)
+    for i in range(5):
+        queue.enqueue(db_tables, _save(f"fact_{i}", str(i)))
+
+    asyncio.run(queue.flush())
+
+    assert queue.metrics["batches"] == 3
+    assert len(_active(db_tables)) == 5
+
+
+def test_save_overwrites_the_active_memory(db_tables):
+    db = SessionLocal()
+    apply_memory_action(db, db_tables, _save("goal", "learn rust"))
+    apply_memory_action(db, db_tables, _save("goal", "learn go"))
+    db.close()
+
+    assert _active(db_tables) == {"goal": "learn go"}
+
+
+def test_failed_batches_are_retried_then_dropped(db_tables):
+    def broken_session():
+        raise RuntimeError("db down")
+
+    queue = MemoryWriteQueue(broken_session, max_attempts=2)
+    queue.enqueue(db_tables, _save("goal", "learn rust"))
+
+    asyncio.run(queue.flush())
+    assert queue.pending == 1
+    asyncio.run(queue.flush())
+
+    assert queue.pending == 0
+    assert queue.metrics["errors"] == 2
+    assert queue.metrics["dropped"] == 1
+
+
+def test_worker_persists_in_background_and_flushes_on_stop(db_tables, async_session_factory):
+    async def scenario():
+        queue = MemoryWriteQueue(async_session_factory, flush_interval_seconds=0.01)
+        queue.start()
+        queue.enqueue(db_tables, _save("goal", "learn rust"))
+        for _ in range(100):
+            if queue.metrics["applied"]:
+                break
+            await asyncio.sleep(0.01)
+        applied_by_worker = queue.metrics["applied"]
+
+        queue.enqueue(db_tables, _save("pet", "a cat"))
+        await queue.stop()
+        return applied_by_worker
+
+    assert asyncio.run(scenario()) == 1
+    assert _active(db_tables) == {"goal": "learn rust", "pet": "a cat"}
+
+
+def test_chat_enqueues_memory_intent_without_writing(client, db_tables, fake_openai):
+    response = client.post("/chat", json={"message": "Remember that my goal is learn rust"})
+
+    assert response.status_code == 200
+    assert response.json()["memory_intent"]["key"] == "goal"
+    assert memory_write_queue.pending == 1
+    assert _active(db_tables) == {}
+
+    client.portal.call(memory_write_queue.flush)
+    assert _active(db_tables) == {"goal": "learn rust"}
+
+
+def test_one_failing_action_does_not_drop_its_batch(db_tables, async_session_factory):
+    queue = MemoryWriteQueue(async_session_factory, max_attempts=2)
+    queue.enqueue(db_tables, _save("goal", "learn rust"))
+    queue.enqueue(db_tables, _save("preference", None))  # NOT NULL violation
+    queue.enqueue(db_tables, _save("pet", "a cat"))
+
+    assert asyncio.run(queue.flush()) == 2
+    assert _active(db_tables) == {"goal": "learn rust", "pet": "a cat"}
+    assert queue.pending == 1
+
+    assert asyncio.run(queue.flush()) == 0
+    assert queue.pending == 0
+    assert queue.metrics["errors"] == 2
+    assert queue.metrics["dropped"] == 1
+    assert _active(db_tables) == {"goal": "learn rust", "pet": "a cat"}
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+
+from database import SessionLocal
+from digital_human import integrations
+from services import memory_service
+from services.memory_service import (
+    load_active_memories,
+    memory_cache,
+    soft_delete_memory,
+    update_memory,
+    write_memory,
+)
+
+
+def _write(user_id, memory_type, content, **kwargs):
+    db = SessionLocal()
+    write_memory(db, user_id, memory_type, content, confidence_score=0.9, **kwargs)
+    db.close()
+
+
+def test_active_memories_are_cached_per_user(db_tables, monkeypatch):
+    _write(db_tables, "goal", "learn rust")
+    reads = []
+    original = memory_service.get_active_memories
+    monkeypatch.setattr(memory_service, "get_active_memories", lambda db, uid: reads.append(uid) or original(db, uid))
+
+    first = load_active_memories(db_tables)
+    second = load_active_memories(db_tables)
+
+    assert [m["memory_content"] for m in first] == ["learn rust"]
+    assert second == first
+    assert reads == [db_tables]
+
+
+def test_writes_invalidate_the_cache(db_tables):
+    _write(db_tables, "goal", "learn rust")
+    assert len(load_active_memories(db_tables)) == 1
+
+    _write(db_tables, "preference", "short answers")
+    assert len(load_active_memories(db_tables)) == 2
+
+    db = SessionLocal()
+    update_memory(db, db_tables, "goal", "learn go")
+    assert {m["memory_content"] for m in load_active_memories(db_tables)} == {"learn go", "short answers"}
+
+    soft_delete_memory(db, db_tables, "preference")
+    db.close()
+    assert [m["memory_type"] for m in load_active_memories(db_tables)] == ["goal"]
+
+
+def test_memories_expiring_while_cached_are_dropped(db_tables):
+    _write(db_tables, "goal", "learn rust")
+    assert len(load_active_memories(db_tables)) == 1
+
+    cached = memory_cache.get(db_tables)
+    cached[0]["expires_at"] = datetime.now(timezone.utc) - timedelta(seconds=1)
+
+    assert load_active_memories(db_tables) == []
+
+
+def test_chat_recalls_stored_memories(client, db_tables, fake_openai, monkeypatch):
+    monkeypatch.setattr(integrations, "_memory_loader", load_active_memories)
+    _write(db_tables, "goal", "pass the AWS exam")
+
+    response = client.post("/chat", json={"message": "Plan my week around the AWS exam"})
+
+    assert response.status_code == 200
+    messages = fake_openai.responder_calls()[0]["messages"]
+    assert any("goal: pass the AWS exam" in m["content"] for m in messages)
@@ -0,0 +1,57 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from database import SessionLocal
+from models import MemoryStore
+from services.memory_sweeper import MemorySweeper
+
+
+def _add_memories(user_id, expired: int, live: int):
+    now = datetime.now(timezone.utc)
+    db = SessionLocal()
+    for i in range(expired):
+        db.add(MemoryStore(
+            user_id=user_id,
+            memory_type=f"expired_{i}",
+            memory_content="old",
+            expires_at=now - timedelta(days=1),
+        ))
+    for i in range(live):
+        db.add(MemoryStore(
+            user_id=user_id,
+            memory_type=f"live_{i}",
+            memory_content="fresh",
+            expires_at=now + timedelta(days=1),
+        ))
+    db.commit()
+    db.close()
+
+
+def _active_count():
+    db = SessionLocal()
+    try:
+        return db.query(MemoryStore).filter(MemoryStore.is_active == True).count()
+    finally:
+        db.close()
+
+
+def test_sweep_deactivates_expired_in_bounded_batches(db_tables, async_session_factory):
+    _add_memories(db_tables, expired=7, live=2)
+    sweeper = MemorySweeper(async_session_factory, batch_size=3, max_batches=10)
+
+    deactivated = asyncio.run(sweeper.sweep_once())
+
+    assert deactivated == 7
+    assert _active_count() == 2
+    assert sweeper.metrics["batches"] == 3  # 3 + 3 + 1
+    assert sweeper.metrics["deactivated_total"] == 7
+    assert sweeper.metrics["runs"] == 1
+
+
+def test_sweep_respects_max_batches(db_tables, async_session_factory):
+    _add_memories(db_tables, expired=7, live=0)
+    sweeper = MemorySweeper(async_session_factory, batch_size=2, max_batches=2)
+
+    assert asyncio.run(sweeper.sweep_once()) == 4
+    assert asyncio.run(sweeper.sweep_once()) == 3
+    assert _active_count() == 0
@@ -0,0 +1,102 @@
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateIndex
+
+from database import SessionLocal, engine
+from models import MemoryStore
+from services.memory_service import (
+    get_active_memories,
+    soft_delete_memory,
+    update_memory,
+    write_memory,
+)
+
+
+def _rows(user_id):
+    db = SessionLocal()
+    try:
+        return [
+            (row.memory_type, row.memory_content, row.is_active)
+            for row in db.query(MemoryStore).filter(MemoryStore.user_id == user_id).order_by(MemoryStore.created_at)
+        ]
+    finally:
+        db.close()
+
+
+def test_repeated_writes_keep_one_active_row(db_tables):
+    db = SessionLocal()
+    first = write_memory(db, db_tables, "goal", "learn rust", confidence_score=0.8)
+    second = write_memory(db, db_tables, "goal", "learn go", confidence_score=0.9)
+
+    assert second.memory_id == first.memory_id
+    assert second.memory_content == "learn go"
+    db.close()
+    assert _rows(db_tables) == [("goal", "learn go", True)]
+
+
+def test_forgotten_memories_do_not_block_new_ones(db_tables):
+    db = SessionLocal()
+    write_memory(db, db_tables, "goal", "learn rust")
+    soft_delete_memory(db, db_tables, "goal")
+    write_memory(db, db_tables, "goal", "learn go")
+    db.close()
+
+    assert sorted(_rows(db_tables)) == [("goal", "learn go", True), ("goal", "learn rust", False)]
+
+
+def test_unique_index_rejects_a_second_active_row(db_tables):
+    db = SessionLocal()
+    write_memory(db, db_tables, "goal", "learn rust")
+    db.add(MemoryStore(user_id=db_tables, memory_type="goal", memory_content="dup"))
+
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.close()
+
+
+def test_update_is_a_single_statement_and_reports_misses(db_tables):
+    db = SessionLocal()
+    assert update_memory(db, db_tables, "goal", "learn go") is None
+
+    write_memory(db, db_tables, "goal", "learn rust")
+    updated = update_memory(db, db_tables, "goal", "learn go", confidence_score=0.7)
+
+    assert (updated.memory_content, updated.confidence_score) == ("learn go", 0.7)
+    db.close()
+
+
+def test_active_memories_use_the_composite_index(db_tables):
+    db = SessionLocal()
+    write_memory(db, db_tables, "goal", "learn rust")
+
+    statements = []
+    capture = lambda conn, cursor, sql, params, context, many: statements.append((sql, params))
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        get_active_memories(db, db_tables)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    sql, params = statements[-1]
+    plan = " ".join(str(row) for row in db.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + sql, params))
+    db.close()
+
+    assert "ix_memory_store_user_active_expires" in plan
+
+
+def test_postgres_upsert_targets_the_partial_index():
+    index = next(i for i in MemoryStore.__table__.indexes if i.name == "uq_memory_store_user_type_active")
+    ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+
+    stmt = postgresql.insert(MemoryStore).values(user_id=1, memory_type="goal", memory_content="x")
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MemoryStore.user_id, MemoryStore.memory_type],
+        index_where=text("is_active"),
+        set_={"memory_content": stmt.excluded.memory_content},
+    )
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert ddl.endswith("(user_id, memory_type) WHERE is_active")
+    assert "ON CONFLICT (user_id, memory_type) WHERE is_active DO UPDATE" in sql
@@ -0,0 +1,121 @@
+import time
+
+import numpy as np
+import pytest
+
+from database import SessionLocal
+from models import VectorDBRAG
+from services.rag_ingest import chunk_text, ingest_documents, load_checkpoint
+from services.rag_service import store_embedding
+
+DIM = 1536
+
+
+class CountingEmbedder:
+    def __init__(self, fail_on_call=None):
+        self.calls = []
+        self.fail_on_call = fail_on_call
+        self.rng = np.random.default_rng(0)
+
+    def __call__(self, texts):
+        self.calls.append(len(texts))
+        if self.fail_on_call == len(self.calls):
+            raise RuntimeError("embedding API down")
+        return self.rng.random((len(texts), DIM), dtype=np.float32).tolist()
+
+
+def _documents(n, words=300):
+    return [
+        {"id": f"doc-{i}", "text": " ".join(f"w{i}_{j}" for j in range(words)), "metadata": {"n": i}}
+        for i in range(n)
+    ]
+
+
+def _row_count():
+    db = SessionLocal()
+    try:
+        return db.query(VectorDBRAG).count()
+    finally:
+        db.close()
+
+
+def test_chunks_respect_size_and_overlap():
+    chunks = chunk_text(" ".join(f"word{i}" for i in range(200)), max_chars=100, overlap=20)
+
+    assert all(len(c) <= 100 for c in chunks)
+    assert chunks[1].split()[0] in chunks[0].split()
+
+
+def test_embeds_in_batches_and_commits_per_document_group(db_tables):
+    embedder = CountingEmbedder()
+
+    metrics = ingest_documents(
+        _documents(10), db_tables, embedder,
+        embed_batch_size=16, commit_every=20, max_chars=500, overlap=0,
+    )
+
+    assert metrics["chunks"] == _row_count() == sum(embedder.calls)
+    assert max(embedder.calls) <= 16
+    assert metrics["embed_calls"] == len(embedder.calls)
+    assert metrics["transactions"] < metrics["documents"]
+
+    db = SessionLocal()
+    row = db.query(VectorDBRAG).first()
+    assert row.meta_data["source_id"].startswith("doc-")
+    assert "text" in row.meta_data
+    db.close()
+
+
+def test_interrupted_run_resumes_from_checkpoint(db_tables, tmp_path):
+    checkpoint = str(tmp_path / "ingest.ckpt")
+    documents = _documents(10)
+
+    with pytest.raises(RuntimeError):
+        ingest_documents(
+            documents, db_tables, CountingEmbedder(fail_on_call=4), checkpoint_path=checkpoint,
+            embed_batch_size=4, commit_every=8, max_chars=500, overlap=0,
+        )
+
+    committed = load_checkpoint(checkpoint)
+    assert 0 < len(committed) < 10
+
+    metrics = ingest_documents(
+        documents, db_tables, CountingEmbedder(), checkpoint_path=checkpoint,
+        embed_batch_size=4, commit_every=8, max_chars=500, overlap=0,
+    )
+
+    assert metrics["skipped_documents"] == len(committed)
+    assert load_checkpoint(checkpoint) == {d["id"] for d in documents}
+
+    db = SessionLocal()
+    sources = [r.meta_data["source_id"] for r in db.query(VectorDBRAG).all()]
+    db.close()
+    per_doc = {s: sources.count(s) for s in set(sources)}
+    assert len(per_doc) == 10
+    assert len(set(per_doc.values())) == 1   # no document stored twice
+
+
+def test_bulk_ingest_beats_per_row_inserts(db_tables):
+    embedder = CountingEmbedder()
+
+    # Baseline: store_embedding (INSERT + COMMIT + refresh per chunk)
+    db = SessionLocal()
+    vectors = embedder([f"t{i}" for i in range(100)])
+    start = time.perf_counter()
+    for vector in vectors:
+        store_embedding(db, db_tables, vector, {"text": "x"})
+    per_row = (time.perf_counter() - start) / len(vectors)
+    db.close()
+
+    metrics = ingest_documents(
+        _documents(100, words=100), db_tables, embedder,
+        embed_batch_size=256, commit_every=5000, max_chars=300, overlap=0,
+    )
+    bulk = metrics["seconds"] / metrics["chunks"]
+
+    print(
+        f"\nper-row {per_row * 1000:.2f} ms/chunk, bulk {bulk * 1000:.2f} ms/chunk "
+        f"({metrics['chunks']} chunks, {metrics['embed_calls']} embed calls, "
+        f"{metrics['transactions']} transactions)"
+    )
+    assert bulk < per_row
@@ -0,0 +1,44 @@
+import pytest
+
+from database import SessionLocal
+from digital_human import integrations
+from digital_human.llm import embeddings
+from digital_human.llm.embeddings import EmbeddingService, FakeEmbedder
+from services.rag_service import retrieve_documents, store_embedding
+
+CHUNKS = [
+    "Redis persistence uses RDB snapshots and AOF logs",
+    "Kafka partitions are replicated across brokers",
+    "Postgres vacuum reclaims dead tuples",
+]
+
+
+@pytest.fixture
+def corpus(db_tables, monkeypatch):
+    embedder = FakeEmbedder()
+    monkeypatch.setattr(embeddings, "embedding_service", EmbeddingService(embed_fn=embedder, cache_path=None))
+
+    db = SessionLocal()
+    for text, vector in zip(CHUNKS, embedder(CHUNKS)):
+        store_embedding(db, db_tables, vector, {"text": text, "title": text.split()[0]})
+    db.close()
+    return db_tables
+
+
+def test_retriever_returns_best_chunks_first(corpus):
+    results = retrieve_documents(corpus, "how does redis persistence work", k=2)
+
+    assert results[0]["content"] == CHUNKS[0]
+    assert results[0]["score"] > results[1]["score"]
+    assert retrieve_documents(999, "redis", k=2) == []
+
+
+def test_chat_reports_rag_used(client, corpus, fake_openai, monkeypatch):
+    monkeypatch.setattr(integrations, "_retriever", retrieve_documents)
+
+    response = client.post("/chat", json={"message": "Explain Redis persistence"})
+
+    assert response.status_code == 200
+    assert response.json()["rag_used"] is True
+    messages = fake_openai.responder_calls()[0]["messages"]
+    assert any(CHUNKS[0] in m["content"] for m in messages)
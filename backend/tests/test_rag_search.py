@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from models import VectorDBRAG
+from services import rag_service
+from services.rag_service import search_similar, search_similar_query
+
+
+def _sql(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_top_k_is_pushed_into_postgres():
+    sql = _sql(search_similar_query(7, [0.1] * 3, k=5))
+
+    assert "embedding <=> " in sql
+    assert "WHERE vector_db_rag.user_id = " in sql
+    assert "ORDER BY vector_db_rag.embedding <=> " in sql
+    assert "LIMIT " in sql
+
+
+def test_l2_metric_uses_l2_operator():
+    assert "embedding <-> " in _sql(search_similar_query(7, [0.1] * 3, metric="l2"))
+
+    with pytest.raises(ValueError):
+        search_similar_query(7, [0.1] * 3, metric="dot")
+
+
+def test_embedding_has_hnsw_cosine_index():
+    (index,) = [i for i in VectorDBRAG.__table__.indexes if i.name == "ix_vector_db_rag_embedding_hnsw"]
+    ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+
+    assert "USING hnsw (embedding vector_cosine_ops)" in ddl
+    assert "WITH (m = 16, ef_construction = 64)" in ddl
+
+
+class FakePostgresSession:
+    """
+    Records the SQL sent; the search query returns `results` in turn.
+    """
+
+    def __init__(self, pgvector_version, results, url="postgresql://fake/rag"):
+        self.pgvector_version = pgvector_version
+        self.results = list(results)
+        self.sql = []
+        self.bind = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"), url=url)
+
+    def get_bind(self):
+        return self.bind
+
+    def execute(self, statement):
+        sql = str(statement)
+        self.sql.append(sql)
+        if "pg_extension" in sql:
+            return SimpleNamespace(scalar=lambda: self.pgvector_version)
+        if sql.startswith("SET LOCAL"):
+            return None
+        rows = self.results.pop(0)
+        return SimpleNamespace(all=lambda: rows)
+
+
+def _rows(*distances):
+    return [SimpleNamespace(document_id=i, meta_data={}, distance=d) for i, d in enumerate(distances)]
+
+
+@pytest.fixture
+def auto_scan(monkeypatch):
+    monkeypatch.setattr(rag_service, "RAG_HNSW_ITERATIVE_SCAN", "auto")
+    monkeypatch.setattr(rag_service, "_iterative_scan_modes", {})
+    monkeypatch.setattr(rag_service, "use_vector_index", lambda db: False)
+
+
+def test_iterative_scan_defaults_on_with_pgvector_08(auto_scan):
+    db = FakePostgresSession("0.8.0", [_rows(0.3, 0.1)])
+
+    results = search_similar(db, 7, [0.1] * 3, k=2)
+
+    assert "SET LOCAL hnsw.iterative_scan = relaxed_order" in db.sql
+    # relaxed_order rows come back nearest first
+    assert [r["distance"] for r in results] == [0.1, 0.3]
+
+    search_similar(FakePostgresSession("0.8.0", [_rows(0.1, 0.2)]), 7, [0.1] * 3, k=2)
+    assert rag_service._iterative_scan_modes == {"postgresql://fake/rag": "relaxed_order"}
+
+
+def test_short_result_without_iterative_scan_is_requeried_exactly(auto_scan):
+    db = FakePostgresSession("0.7.4", [_rows(0.2), _rows(0.2, 0.4, 0.5)])
+
+    results = search_similar(db, 7, [0.1] * 3, k=3)
+
+    assert not any("iterative_scan" in sql for sql in db.sql)
+    assert "SET LOCAL enable_indexscan = off" in db.sql
+    assert len(results) == 3
+
+
+def test_full_result_is_not_requeried(auto_scan):
+    db = FakePostgresSession("0.7.4", [_rows(0.2, 0.3)])
+
+    assert len(search_similar(db, 7, [0.1] * 3, k=2)) == 2
+    assert "SET LOCAL enable_indexscan = off" not in db.sql
@@ -0,0 +1,114 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from database import SessionLocal
+from models import ChatSession, ChatMessage
+from services import summary_service
+from services.summary_service import messages_to_fold, update_session_summary
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _add_messages(db, session_id, first: int, count: int):
+    for i in range(first, first + count):
+        db.add(ChatMessage(
+            session_id=session_id,
+            role="user" if i % 2 == 0 else "assistant",
+            content=f"message {i}",
+            token_count=100,
+            created_at=START + timedelta(seconds=i),
+        ))
+    db.commit()
+
+
+def _session(user_id, messages: int):
+    db = SessionLocal()
+    session = ChatSession(user_id=user_id, session_title="long chat")
+    db.add(session)
+    db.flush()
+    _add_messages(db, session.session_id, 0, messages)
+    return db, session
+
+
+def _sent_messages(call):
+    return [line for line in call["messages"][1]["content"].splitlines() if ": message " in line]
+
+
+def test_fold_selects_only_messages_older_than_window(db_tables, monkeypatch):
+    monkeypatch.setattr(summary_service, "HISTORY_TOKEN_BUDGET", 250)
+    db, session = _session(db_tables, 10)
+
+    pending = messages_to_fold(db, session)
+
+    # Window keeps messages 8-9; 0-7 fell out
+    assert [m.content for m in pending] == [f"message {i}" for i in range(8)]
+    db.close()
+
+
+def test_fold_skips_already_summarized_and_respects_limit(db_tables, monkeypatch):
+    monkeypatch.setattr(summary_service, "HISTORY_TOKEN_BUDGET", 250)
+    db, session = _session(db_tables, 10)
+    session.summarized_until = START + timedelta(seconds=3)
+    db.commit()
+
+    pending = messages_to_fold(db, session, limit=2)
+
+    assert [m.content for m in pending] == ["message 4", "message 5"]
+    db.close()
+
+
+def test_summary_is_folded_incrementally(db_tables, monkeypatch, fake_openai, async_session_factory):
+    monkeypatch.setattr(summary_service, "HISTORY_TOKEN_BUDGET", 250)
+    db, session = _session(db_tables, 10)
+    session_id = session.session_id
+
+    fake_openai.reply = "summary v1"
+    asyncio.run(update_session_summary(session_id, async_session_factory))
+
+    first = fake_openai.summary_calls()[-1]
+    assert _sent_messages(first) == [
+        f"{'user' if i % 2 == 0 else 'assistant'}: message {i}" for i in range(8)
+    ]
+
+    # Two more turns push messages 8-9 out of the window
+    _add_messages(db, session_id, 10, 2)
+    fake_openai.reply = "summary v2"
+    asyncio.run(update_session_summary(session_id, async_session_factory))
+
+    second = fake_openai.summary_calls()[-1]
+    assert "summary v1" in second["messages"][1]["content"]
+    assert _sent_messages(second) == ["user: message 8", "assistant: message 9"]
+
+    db.expire_all()
+    stored = db.get(ChatSession, session_id)
+    assert stored.summary == "summary v2"
+    assert stored.summarized_until.replace(tzinfo=timezone.utc) == START + timedelta(seconds=9)
+    db.close()
+
+
+def test_nothing_to_fold_makes_no_llm_call(db_tables, fake_openai, async_session_factory):
+    db, session = _session(db_tables, 3)
+
+    asyncio.run(update_session_summary(session.session_id, async_session_factory))
+
+    assert fake_openai.summary_calls() == []
+    db.close()
+
+
+def test_stored_summary_is_injected_into_next_turn(client, db_tables, fake_openai):
+    db, session = _session(db_tables, 2)
+    session.summary = "The user is preparing for Redis interviews."
+    db.commit()
+    session_id = str(session.session_id)
+    db.close()
+
+    response = client.post("/chat", json={
+        "conversation_id": session_id,
+        "message": {"content": "Explain Redis persistence"},
+    })
+
+    assert response.status_code == 200
+    system_messages = [
+        m["content"] for m in fake_openai.responder_calls()[0]["messages"] if m["role"] == "system"
+    ]
+    assert "Summary of the earlier conversation: The user is preparing for Redis interviews." in system_messages
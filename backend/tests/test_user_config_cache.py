@@ -0,0 +1,57 @@
+import asyncio
+
+import constants
+from constants import get_user_config, aget_user_config, invalidate_user_config
+from database import SessionLocal
+from models import UserConfig
+
+
+def test_config_is_served_from_cache(db_tables):
+    db = SessionLocal()
+    first = get_user_config(db, db_tables)
+
+    # Bypass the ORM hooks: the cached dict must still be returned
+    db.execute(UserConfig.__table__.update().values(enable_rag=False))
+    db.commit()
+
+    assert get_user_config(db, db_tables) == first
+    assert constants.USER_CONFIG_CACHE.stats["hits"] >= 1
+
+    invalidate_user_config(db_tables)
+    assert get_user_config(db, db_tables)["enable_rag"] is False
+    db.close()
+
+
+def test_orm_write_invalidates_cached_config(db_tables):
+    db = SessionLocal()
+    assert get_user_config(db, db_tables)["enable_tool"] is True
+
+    config = db.query(UserConfig).filter(UserConfig.user_id == db_tables).one()
+    config.enable_tool = False
+    db.commit()
+
+    assert get_user_config(db, db_tables)["enable_tool"] is False
+    db.close()
+
+
+def test_cache_is_bounded(db_tables, monkeypatch):
+    backend = constants.InMemoryBackend(max_size=2)
+    monkeypatch.setattr(constants, "USER_CONFIG_CACHE", backend)
+
+    for user_id in range(5):
+        backend.set(str(user_id), {"enable_rag": True})
+
+    assert len(backend.cache) == 2
+
+
+def test_async_loader_shares_the_cache(db_tables, async_session_factory):
+    async def load():
+        async with async_session_factory() as db:
+            return await aget_user_config(db, db_tables)
+
+    first = asyncio.run(load())
+    hits = constants.USER_CONFIG_CACHE.stats["hits"]
+
+    assert asyncio.run(load()) == first
+    assert get_user_config(None, db_tables) == first
+    assert constants.USER_CONFIG_CACHE.stats["hits"] == hits + 2
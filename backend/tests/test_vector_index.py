@@ -0,0 +1,98 @@
+import time
+
+import numpy as np
+
+from database import SessionLocal
+from services import vector_index as vector_index_module
+from services.rag_service import search_similar, store_embedding
+from services.vector_index import UserVectorIndex, VectorIndexCache
+
+DIM = 1536
+
+
+def _unit(seed):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal(DIM).astype(np.float32).tolist()
+
+
+def test_top_k_matches_brute_force():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((500, 32)).astype(np.float32)
+    index = UserVectorIndex(dim=32, capacity=8)  # forces several resizes
+    for i, v in enumerate(vectors):
+        index.add(i, v, {"chunk": i})
+
+    query = rng.standard_normal(32)
+    normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(normed @ (query / np.linalg.norm(query))))[:10]
+
+    results = index.search(query, k=10)
+
+    assert [r["document_id"] for r in results] == expected.tolist()
+    assert results[0]["metadata"] == {"chunk": int(expected[0])}
+    assert results[0]["distance"] <= results[-1]["distance"]
+
+
+def test_search_is_one_batched_product():
+    rng = np.random.default_rng(1)
+    index = UserVectorIndex(dim=256)
+    index.add_many(range(50_000), rng.standard_normal((50_000, 256)), [None] * 50_000)
+    query = rng.standard_normal(256)
+
+    index.search(query, k=10)
+    start = time.perf_counter()
+    index.search(query, k=10)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n50k x 256 top-10: {elapsed * 1000:.1f} ms")
+    assert elapsed < 0.5
+
+
+def _count_loads(monkeypatch):
+    loads = []
+    real = vector_index_module.load_user_vectors
+
+    def counting(db, user_id):
+        loads.append(user_id)
+        return real(db, user_id)
+
+    monkeypatch.setattr(vector_index_module, "load_user_vectors", counting)
+    return loads
+
+
+def test_sqlite_search_builds_lazily_and_updates_on_store(db_tables, monkeypatch):
+    loads = _count_loads(monkeypatch)
+    user_id = db_tables
+    db = SessionLocal()
+    store_embedding(db, user_id, _unit(1), {"text": "redis"})
+    store_embedding(db, user_id, _unit(2), {"text": "kafka"})
+
+    assert search_similar(db, user_id, _unit(1), k=1)[0]["metadata"] == {"text": "redis"}
+
+    # Index is built now; the next write extends it without a reload
+    store_embedding(db, user_id, _unit(3), {"text": "postgres"})
+    results = search_similar(db, user_id, _unit(3), k=3)
+
+    assert results[0]["metadata"] == {"text": "postgres"}
+    assert results[0]["distance"] < 1e-5
+    assert len(results) == 3
+    assert loads == [user_id]
+    db.close()
+
+
+def test_least_recently_used_user_is_evicted(db_tables, monkeypatch):
+    loads = _count_loads(monkeypatch)
+    cache = VectorIndexCache(max_users=1)
+
+    db = SessionLocal()
+    store_embedding(db, 1, _unit(1), {"text": "redis"})
+    store_embedding(db, 2, _unit(2), {"text": "kafka"})
+
+    cache.search(db, 1, _unit(1))
+    cache.search(db, 1, _unit(1))
+    cache.search(db, 2, _unit(2))   # evicts user 1
+    cache.search(db, 1, _unit(1))
+
+    assert loads == [1, 2, 1]
+    assert cache.search(db, 999, _unit(1)) == []
+    db.close()